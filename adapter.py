@@ -1,4 +1,5 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import json
 
 from sandbox import Sandbox
 
@@ -8,17 +9,28 @@ class Adapter:
     Basic MCP Adapter
     Maps:
         - Tool schema <-> MCP tool schema
-        - Invocation envelope <-> JSON RPC / LSP transport
+        - Invocation envelope <-> JSON RPC / LSP transport (see mcp_server.py)
+
+    Tool descriptions are built once and reused; call `refresh()` after
+    registering more operations on the router.
     """
-    # TODO: implement server handshake, resource list, tool call, streaming.
     def __init__(
             self,
             sandbox: Sandbox
     ) -> None:
        self.sandbox = sandbox
+       self._described: Optional[List[Dict[str, Any]]] = None
+       self._mcp_tools: Optional[List[Dict[str, Any]]] = None
+
+    def refresh(self) -> None:
+        self._described = None
+        self._mcp_tools = None
 
     def describe_tools(self) -> List[Dict[str, Any]]:
 
+        if self._described is not None:
+            return self._described
+
         out: List[Dict[str, Any]] = []
         for name in self.sandbox.api_ops_router.list_ops():
 
@@ -32,5 +44,67 @@ class Adapter:
                     "version": getattr(op, "version", "v1"),
                 }
             )
-            
-        return out
\ No newline at end of file
+        
+        self._described = out
+        return out
+    
+    def mcp_tools(self) -> List[Dict[str, Any]]:
+        """
+        `tools/list` entries in MCP shape.
+        """
+        
+        if self._mcp_tools is None:
+            self._mcp_tools = [
+                {
+                    "name": tool["name"],
+                    "description": tool["description"],
+                    "inputSchema": tool["input_schema"] or {"type": "object"},
+                }
+                for tool in self.describe_tools()
+            ]
+        
+        return self._mcp_tools
+    
+    async def call_tool(
+            self,
+            name: str,
+            arguments: Optional[Dict[str, Any]] = None,
+            record: bool = True,
+            agent_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run a `tools/call` through the sandbox and wrap it as an MCP tool result.
+        Sandbox errors (policy, validation, injected failures) are tool errors,
+        reported with `isError` rather than as JSON-RPC errors.
+        """
+        
+        invocation, response = await self.sandbox.ainvoke(
+            name,
+            arguments or {},
+            record=record,
+            agent_id=agent_id,
+        )
+
+        payload: Dict[str, Any] = {
+            "tool_id": invocation.tool_id,
+            "latency_ms": response.latency_ms,
+        }
+        if response.status is not None:
+            payload["status"] = response.status
+        if response.ok:
+            payload["data"] = response.data
+        else:
+            payload["error"] = response.error
+            if response.data is not None:
+                payload["details"] = response.data
+        
+        return {
+            "content": [
+                {
+                    "type": "text",
+                    "text": json.dumps(payload, ensure_ascii=False, default=str),
+                }
+            ],
+            "structuredContent": payload,
+            "isError": not response.ok,
+        }
@@ -1,12 +1,84 @@
-from typing import Dict, List
+from typing import Dict, List, Any, Callable, Optional, Hashable, Tuple
+import re
 
 from type import (
+    JSON,
     Operation,
+    OpenAPINormalized,
+    SignatureSpec,
+)
+from signatures import (
+    Signer,
+    compile_signer,
+)
+from utils import (
+    coerce_param,
+    query_args,
+    shape_key,
+)
+from validation import (
+    ValidatorCompiler,
 )
 
-class APIOperationsRouter:
+# Distinct valid argument sets remembered per operation.
+MAX_VALIDATED_SHAPES = 4096
+
+_PARAM_SEGMENT = re.compile(r"^\{([^{}/]+)\}$")
+_PARAM_IN_SEGMENT = re.compile(r"\{([^{}/]+)\}")
+
+class _RouteNode:
+    """
+    One path segment of the route trie. Children are tried literal first,
+    then mixed segments (`{name}.json`), then a bare `{param}`.
+    """
+
+    __slots__ = ("literals", "patterns", "param", "op_name", "param_names")
+
     def __init__(self) -> None:
+        self.literals: Dict[str, "_RouteNode"] = {}
+        self.patterns: List[Tuple["re.Pattern[str]", "_RouteNode"]] = []
+        self.param: Optional["_RouteNode"] = None
+        self.op_name: Optional[str] = None
+        self.param_names: Tuple[str, ...] = ()
+
+def _split_route(route: str) -> Optional[Tuple[str, List[str], str]]:
+    """
+    "GET /users/{id}?x=1" -> ("GET", ["users", "{id}"], "x=1"); None if not
+    METHOD /path.
+    """
+    
+    method, _, path = route.partition(" ")
+    if not path.startswith("/"):
+        return None
+    
+    path, _, query = path.partition("?")
+    return (
+        method.upper(),
+        [segment for segment in path.split("/") if segment],
+        query,
+    )
+
+class APIOperationsRouter:
+    def __init__(
+            self,
+            open_api_spec: Optional[OpenAPINormalized] = None,
+            default_signature: Optional[SignatureSpec] = None,
+    ) -> None:
         self._ops: Dict[str, Operation] = {}
+
+        # Fixture signers, compiled once per operation; ops without their own
+        # SignatureSpec (and unknown tools) use `default_signature`.
+        self._default_signer = compile_signer(default_signature)
+        self._signers: Dict[str, Signer] = {}
+
+        # Method -> segment trie over path templates, for concrete paths.
+        self._routes: Dict[str, _RouteNode] = {}
+
+        # Param-schema validators, compiled once at registration; `open_api_spec`
+        # resolves any $refs inside the param schemas.
+        self._compiler = ValidatorCompiler(open_api_spec)
+        self._validators: Dict[str, Callable[[Any, str], List[JSON]]] = {}
+        self._validated: Dict[str, Dict[Hashable, None]] = {}
     
     def register_op(self, op: Operation) -> None:
 
@@ -14,6 +86,49 @@ class APIOperationsRouter:
             raise ValueError(f"Operation already registered: {op.name}")
         
         self._ops[op.name] = op
+        self._validators[op.name] = self._compiler.compile(op.param_schema)
+        self._validated[op.name] = {}
+        self._signers[op.name] = compile_signer(op.signature) \
+            if op.signature is not None else self._default_signer
+        self._add_route(op.name)
+    
+    def _add_route(self, name: str) -> None:
+
+        route = _split_route(name)
+        if route is None:
+            return # not an HTTP-style "METHOD /path" name
+        
+        method, segments, _ = route
+        node = self._routes.setdefault(method, _RouteNode())
+        param_names: List[str] = []
+        for segment in segments:
+            bare = _PARAM_SEGMENT.match(segment)
+            if bare:
+                param_names.append(bare.group(1))
+                if node.param is None:
+                    node.param = _RouteNode()
+                node = node.param
+            elif "{" in segment:
+                names = _PARAM_IN_SEGMENT.findall(segment)
+                param_names.extend(names)
+                regex = "".join(
+                    "([^/]+?)" if i % 2 else re.escape(part)
+                    for i, part in enumerate(_PARAM_IN_SEGMENT.split(segment))
+                )
+                for pattern, child in node.patterns:
+                    if pattern.pattern == regex:
+                        node = child
+                        break
+                else:
+                    child = _RouteNode()
+                    node.patterns.append((re.compile(regex), child))
+                    node = child
+            else:
+                node = node.literals.setdefault(segment, _RouteNode())
+        
+        if node.op_name is None:
+            node.op_name = name
+            node.param_names = tuple(param_names)
     
     def get_op(self, name: str) -> Operation:
         
@@ -22,5 +137,128 @@ class APIOperationsRouter:
         
         return self._ops[name]
     
+    def match(self, route: str) -> Tuple[Operation, Dict[str, Any]]:
+        """
+        Operation for a concrete request such as "GET /users/42?limit=5", with
+        its path and query params ({"user_id": 42, "limit": 5}) coerced by the
+        param schema. Literal segments win over parameters; raises KeyError
+        when nothing matches.
+        """
+        
+        split = _split_route(route)
+        root = self._routes.get(split[0]) if split else None
+        found = _walk(root, split[1], 0, []) if root is not None else None
+        if found is None:
+            raise KeyError(f"Unknown operation: {route}")
+        
+        node, values = found
+        op = self._ops[node.op_name]
+        properties = op.param_schema.get("properties") or {}
+        
+        params = query_args(split[2], properties) if split[2] else {}
+        params.update(
+            (name, coerce_param(value, properties.get(name)))
+            for name, value in zip(node.param_names, values)
+        )
+        
+        return (
+            op,
+            params
+        )
+    
+    def route(
+            self,
+            name: str,
+            args: Dict[str, Any],
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Registered name and args for a call: exact names pass through, concrete
+        paths are matched and their path and query params merged under the
+        given args.
+        Unknown names pass through unchanged.
+        """
+        
+        if name in self._ops:
+            return (name, args)
+        
+        try:
+            op, path_params = self.match(name)
+        except KeyError:
+            return (name, args)
+        
+        return (
+            op.name,
+            {**path_params, **args}
+        )
+
     def list_ops(self) -> List[str]:
         return sorted(self._ops.keys())
+    
+    def validate(
+            self,
+            name: str,
+            args: Dict[str, Any],
+    ) -> List[JSON]:
+        """
+        Errors for `args` against the operation's param schema (empty if valid).
+        Flat argument sets that already passed are remembered and skipped.
+        """
+        
+        if name not in self._validators:
+            raise KeyError(f"Unknown operation: {name}")
+        
+        shape = shape_key(args)
+        validated = self._validated[name]
+        if shape is not None and shape in validated:
+            return []
+        
+        errors = self._validators[name](args, "")
+        if not errors and shape is not None:
+            if len(validated) >= MAX_VALIDATED_SHAPES:
+                validated.clear()
+            validated[shape] = None
+        
+        return errors
+    
+    def signature(
+            self,
+            name: str,
+            args: Dict[str, Any],
+    ) -> str:
+        """
+        Fixture signature of a call, honoring the operation's SignatureSpec.
+        """
+        
+        return self._signers.get(name, self._default_signer)(name, args)
+
+def _walk(
+        node: _RouteNode,
+        segments: List[str],
+        index: int,
+        values: List[str],
+) -> Optional[Tuple[_RouteNode, List[str]]]:
+    """
+    Depth-first trie match, backtracking only when a literal branch dead-ends.
+    """
+    
+    if index == len(segments):
+        return (node, values) if node.op_name is not None else None
+    
+    segment = segments[index]
+    child = node.literals.get(segment)
+    if child is not None:
+        found = _walk(child, segments, index + 1, values)
+        if found is not None:
+            return found
+    
+    for pattern, child in node.patterns:
+        m = pattern.fullmatch(segment)
+        if m:
+            found = _walk(child, segments, index + 1, values + list(m.groups()))
+            if found is not None:
+                return found
+    
+    if node.param is not None:
+        return _walk(node.param, segments, index + 1, values + [segment])
+    
+    return None
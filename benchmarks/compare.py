@@ -0,0 +1,107 @@
+from typing import Any, Dict, List
+import argparse
+import dataclasses as dc
+import json
+import sys
+
+JSON = Dict[str, Any]
+
+# Allowed slowdown / growth before a benchmark counts as regressed.
+DEFAULT_TIME_TOLERANCE = 0.25
+DEFAULT_MEMORY_TOLERANCE = 0.10
+
+@dc.dataclass
+class Regression:
+    benchmark: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def __str__(self) -> str:
+        return (
+            f"{self.benchmark}: {self.metric} {self.baseline:.6g} -> "
+            f"{self.current:.6g} ({(self.ratio - 1) * 100:+.1f}%)"
+        )
+
+def compare(
+        results: JSON,
+        baseline: JSON,
+        time_tolerance: float = DEFAULT_TIME_TOLERANCE,
+        memory_tolerance: float = DEFAULT_MEMORY_TOLERANCE,
+) -> List[Regression]:
+    """
+    Benchmarks in both files whose seconds_per_op grew by more than
+    `time_tolerance`, or whose peak_bytes grew by more than `memory_tolerance`.
+    Benchmarks missing from either side are not compared.
+    """
+
+    if results.get("meta", {}).get("scale") != baseline.get("meta", {}).get("scale"):
+        raise ValueError(
+            f"Results are for scale '{results.get('meta', {}).get('scale')}' but the "
+            f"baseline is for '{baseline.get('meta', {}).get('scale')}'."
+        )
+
+    regressions: List[Regression] = []
+    current = results.get("benchmarks") or {}
+    for name, base in sorted((baseline.get("benchmarks") or {}).items()):
+        if name not in current:
+            continue
+
+        for metric, tolerance in (
+            ("seconds_per_op", time_tolerance),
+            ("peak_bytes", memory_tolerance),
+        ):
+            if base.get(metric) is None or current[name].get(metric) is None:
+                continue
+            if current[name][metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    Regression(
+                        benchmark=name,
+                        metric=metric,
+                        baseline=base[metric],
+                        current=current[name][metric],
+                    )
+                )
+
+    return regressions
+
+def load_results(path: str) -> JSON:
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def report(regressions: List[Regression]) -> int:
+    """
+    Print regressions to stderr; the process exit code for them.
+    """
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+
+    return 1 if regressions else 0
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(
+        description="Compare benchmark results against a stored baseline."
+    )
+    parser.add_argument("results", type=str, help="Results JSON from `python -m benchmarks`.")
+    parser.add_argument("baseline", type=str, help="Baseline results JSON.")
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE, help="Allowed seconds_per_op growth (0.25 = 25%%).")
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE, help="Allowed peak_bytes growth.")
+    args = parser.parse_args()
+
+    regressions = compare(
+        load_results(args.results),
+        load_results(args.baseline),
+        time_tolerance=args.time_tolerance,
+        memory_tolerance=args.memory_tolerance,
+    )
+    sys.exit(report(regressions))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional
+import argparse
+import fnmatch
+import json
+import platform
+import sys
+from datetime import (
+    datetime,
+    timezone,
+)
+
+from benchmarks.synthetic_spec import SCALES
+from benchmarks.suite import Corpus, default_benchmarks, measure
+from benchmarks.compare import (
+    DEFAULT_TIME_TOLERANCE,
+    DEFAULT_MEMORY_TOLERANCE,
+    compare,
+    load_results,
+    report,
+)
+
+JSON = Dict[str, Any]
+
+RESULTS_VERSION = 1
+
+def run(
+        scale: str = "default",
+        seed: int = 0,
+        only: Optional[List[str]] = None,
+        repeat: Optional[int] = None,
+        workers: int = 1,
+        memory: bool = True,
+) -> JSON:
+    """
+    Run the suite and return its results document (see README "Benchmarks").
+    `only` keeps benchmarks whose name matches any of the given globs.
+    """
+
+    corpus = Corpus.build(scale=scale, seed=seed)
+    results: JSON = {
+        "version": RESULTS_VERSION,
+        "meta": {
+            "scale": scale,
+            "seed": seed,
+            "workers": workers,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "benchmarks": {},
+    }
+
+    for benchmark in default_benchmarks(corpus, workers=workers):
+        if only and not any(fnmatch.fnmatchcase(benchmark.name, p) for p in only):
+            continue
+
+        result = measure(benchmark, repeat=repeat, memory=memory)
+        results["benchmarks"][benchmark.name] = result
+        print(
+            f"{benchmark.name:<36} {result['seconds_per_op'] * 1e6:>12.1f} us/op"
+            f" {result['ops_per_s']:>12.1f} op/s"
+            + (f" {result['peak_bytes'] / 1024:>10.0f} KiB peak" if "peak_bytes" in result else ""),
+            file=sys.stderr,
+        )
+
+    return results
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(
+        description="Run the sandbox benchmark suite on a synthetic OpenAPI corpus."
+    )
+    parser.add_argument("--scale", type=str, default="default", choices=sorted(SCALES), help="Size of the synthetic spec.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic spec and data.")
+    parser.add_argument("--only", type=str, nargs="*", default=None, help="Glob(s) of benchmark names to run.")
+    parser.add_argument("--repeat", type=int, default=None, help="Timed runs per benchmark (default: per benchmark).")
+    parser.add_argument("--workers", type=int, default=1, help="FixtureGenerator worker processes.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory runs.")
+    parser.add_argument("--out", type=str, default=None, help="Write results JSON here (default: stdout).")
+    parser.add_argument("--baseline", type=str, default=None, help="Fail if results regress against this results JSON.")
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE, help="Allowed seconds_per_op growth (0.25 = 25%%).")
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE, help="Allowed peak_bytes growth.")
+    args = parser.parse_args()
+
+    results = run(
+        scale=args.scale,
+        seed=args.seed,
+        only=args.only,
+        repeat=args.repeat,
+        workers=args.workers,
+        memory=not args.no_memory,
+    )
+
+    payload = json.dumps(results, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+    if args.baseline:
+        sys.exit(
+            report(
+                compare(
+                    results,
+                    load_results(args.baseline),
+                    time_tolerance=args.time_tolerance,
+                    memory_tolerance=args.memory_tolerance,
+                )
+            )
+        )
+
+if __name__ == "__main__":
+    main()
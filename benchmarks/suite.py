@@ -0,0 +1,440 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import dataclasses as dc
+import gc
+import itertools
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from type import (
+    Policy,
+    FaultProfile,
+    Fixture,
+    FixtureMetaData,
+    MockedResponse,
+    OpenAPINormalized,
+    ToolCall,
+)
+from api_ops_router import APIOperationsRouter
+from data_generator import DataGenerator
+from fixture_generator import FixtureGenerator
+from fixtures import FixtureStore
+from recorder import Recorder, SessionLogRecorder
+from sandbox import Sandbox
+from clock import VirtualClock
+from openapi_ops import register_ops_from_openapi, SchemaOnlyDGShim
+
+from benchmarks.synthetic_spec import (
+    SCALES,
+    SHAPES,
+    SHAPE_SCHEMAS,
+    resources_by_shape,
+    synthetic_spec,
+)
+
+JSON = Dict[str, Any]
+
+# (workdir) -> (workload, number of operations it performs)
+Prepare = Callable[[Path], Tuple[Callable[[], Any], int]]
+
+@dc.dataclass
+class Corpus:
+    """
+    The synthetic spec shared by every benchmark of a run.
+    """
+    scale: str
+    seed: int
+    spec: JSON
+    openapi: OpenAPINormalized
+    by_shape: Dict[str, List[int]]
+
+    @classmethod
+    def build(
+            cls,
+            scale: str = "default",
+            seed: int = 0,
+    ) -> "Corpus":
+
+        if scale not in SCALES:
+            raise ValueError(
+                f"Unknown scale '{scale}', expected one of {sorted(SCALES)}."
+            )
+
+        spec = synthetic_spec(seed=seed, **SCALES[scale])
+        return cls(
+            scale=scale,
+            seed=seed,
+            spec=spec,
+            openapi=OpenAPINormalized.from_dict(spec),
+            by_shape=resources_by_shape(SCALES[scale]["resources"]),
+        )
+
+@dc.dataclass
+class Benchmark:
+    name: str
+    prepare: Prepare
+    repeat: int = 5
+
+def _sandbox(
+        corpus: Corpus,
+        workdir: Path,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+) -> Sandbox:
+
+    router = APIOperationsRouter(open_api_spec=corpus.openapi)
+    register_ops_from_openapi(corpus.openapi, router)
+
+    return Sandbox(
+        policy=Policy(),
+        recorder=Recorder(workdir / "recordings"),
+        fault=FaultProfile(seed=corpus.seed),
+        fixtures=FixtureStore(workdir / "fixtures", cache_max_bytes=cache_max_bytes),
+        api_ops_router=router,
+        data_generator=SchemaOnlyDGShim(DataGenerator(seed=corpus.seed or 1), corpus.openapi),
+        clock=VirtualClock(start=0.0),
+    )
+
+def _calls(
+        corpus: Corpus,
+        n: int,
+) -> List[str]:
+    """
+    `n` distinct concrete `GET /rNNNNN/{id}` routes, spread over every shape.
+    """
+
+    resources = list(
+        itertools.chain.from_iterable(zip(*corpus.by_shape.values()))
+    )
+    return [
+        f"GET /r{resources[i % len(resources)]:05d}/{i}"
+        for i in range(n)
+    ]
+
+def _invoke_all(
+        sandbox: Sandbox,
+        calls: List[str],
+) -> Callable[[], None]:
+
+    def run() -> None:
+        for call in calls:
+            invocation, response = sandbox.invoke(call, {})
+            if not response.ok:
+                raise RuntimeError(f"{call} failed: {response.error}")
+
+    return run
+
+def sandbox_cold(
+        corpus: Corpus,
+        n: int = 400,
+) -> Prepare:
+    """
+    Fixture misses: every call synthesizes its response and saves a fixture.
+    """
+
+    def prepare(workdir: Path) -> Tuple[Callable[[], Any], int]:
+        return (
+            _invoke_all(_sandbox(corpus, workdir), _calls(corpus, n)),
+            n
+        )
+
+    return prepare
+
+def sandbox_warm(
+        corpus: Corpus,
+        n: int = 400,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+) -> Prepare:
+    """
+    Fixture hits, served from the LRU cache (or from disk with
+    cache_max_bytes=0).
+    """
+
+    def prepare(workdir: Path) -> Tuple[Callable[[], Any], int]:
+        run = _invoke_all(
+            _sandbox(corpus, workdir, cache_max_bytes),
+            _calls(corpus, n),
+        )
+        # First pass saves the fixtures, second fills the cache.
+        run()
+        run()
+
+        return (
+            run,
+            n
+        )
+
+    return prepare
+
+def generate_shape(
+        corpus: Corpus,
+        shape: str,
+        n: int = 200,
+) -> Prepare:
+    """
+    `DataGenerator.generate` on one response shape, plans already compiled.
+    """
+
+    schema = {"$ref": f"#/components/schemas/{SHAPE_SCHEMAS[shape]}"}
+
+    def prepare(workdir: Path) -> Tuple[Callable[[], Any], int]:
+        generator = DataGenerator(seed=corpus.seed or 1)
+        generator.generate(corpus.openapi, schema)
+
+        def run() -> None:
+            for _ in range(n):
+                generator.generate(corpus.openapi, schema)
+
+        return (
+            run,
+            n
+        )
+
+    return prepare
+
+def fixture_generation(
+        corpus: Corpus,
+        workers: int = 1,
+) -> Prepare:
+    """
+    `FixtureGenerator.generate` over the whole spec; one op per operation.
+    """
+
+    def prepare(workdir: Path) -> Tuple[Callable[[], Any], int]:
+        generator = FixtureGenerator(
+            DataGenerator(seed=corpus.seed or 1),
+            workers=workers,
+        )
+
+        return (
+            lambda: generator.generate(corpus.spec, "bench"),
+            len(corpus.openapi.operations)
+        )
+
+    return prepare
+
+def _fixtures(
+        corpus: Corpus,
+        n: int,
+) -> List[Tuple[str, str, Fixture]]:
+
+    generator = DataGenerator(seed=corpus.seed or 1)
+    out = []
+    for i in range(n):
+        shape = SHAPES[i % len(SHAPES)]
+        out.append(
+            (
+                f"GET /r{i % 100:05d}/{{id}}",
+                f"{i:016x}",
+                Fixture(
+                    ok=True,
+                    data=generator.generate(
+                        corpus.openapi,
+                        {"$ref": f"#/components/schemas/{SHAPE_SCHEMAS[shape]}"},
+                    ),
+                    metadata=FixtureMetaData(
+                        created_at="2025-01-01T00:00:00+00:00",
+                        signature=f"{i:016x}",
+                    ),
+                ),
+            )
+        )
+
+    return out
+
+def store_save(
+        corpus: Corpus,
+        n: int = 400,
+) -> Prepare:
+
+    fixtures = _fixtures(corpus, n)
+
+    def prepare(workdir: Path) -> Tuple[Callable[[], Any], int]:
+        store = FixtureStore(workdir / "fixtures")
+
+        return (
+            lambda: store.save_many(fixtures),
+            n
+        )
+
+    return prepare
+
+def store_load(
+        corpus: Corpus,
+        n: int = 400,
+        cached: bool = False,
+) -> Prepare:
+    """
+    Loads from disk (cached=False) or from a warm LRU cache (cached=True).
+    """
+
+    fixtures = _fixtures(corpus, n)
+    keys = [(tool_name, signature) for tool_name, signature, _ in fixtures]
+
+    def prepare(workdir: Path) -> Tuple[Callable[[], Any], int]:
+        FixtureStore(workdir / "fixtures").save_many(fixtures)
+        store = FixtureStore(
+            workdir / "fixtures",
+            cache_max_bytes=64 * 1024 * 1024 if cached else 0,
+        )
+        if cached:
+            store.load_many(keys)
+
+        def run() -> None:
+            if len(store.load_many(keys)) != n:
+                raise RuntimeError("Fixture store lost fixtures.")
+
+        return (
+            run,
+            n
+        )
+
+    return prepare
+
+def _recordings(
+        corpus: Corpus,
+        n: int,
+) -> List[Tuple[ToolCall, MockedResponse]]:
+
+    generator = DataGenerator(seed=corpus.seed or 1)
+    data = generator.generate(
+        corpus.openapi,
+        {"$ref": "#/components/schemas/Payment"},
+    )
+
+    return [
+        (
+            ToolCall(
+                tool_name=f"GET /r{i % 100:05d}/{{id}}",
+                args={"id": i},
+                tool_id=f"{i:016x}",
+                timestamp=f"{i}",
+            ),
+            MockedResponse(ok=True, data=data, latency_ms=i % 120),
+        )
+        for i in range(n)
+    ]
+
+def recorder_session_log(
+        corpus: Corpus,
+        n: int = 5000,
+) -> Prepare:
+    """
+    SessionLogRecorder, timed until everything is written and closed.
+    """
+
+    records = _recordings(corpus, n)
+
+    def prepare(workdir: Path) -> Tuple[Callable[[], Any], int]:
+        recorder = SessionLogRecorder(workdir / "recordings", session_id="bench")
+
+        def run() -> None:
+            for invocation, response in records:
+                recorder.record(invocation, response)
+            recorder.close()
+
+        return (
+            run,
+            n
+        )
+
+    return prepare
+
+def recorder_files(
+        corpus: Corpus,
+        n: int = 1000,
+) -> Prepare:
+    """
+    The one-file-per-tool_id Recorder.
+    """
+
+    records = _recordings(corpus, n)
+
+    def prepare(workdir: Path) -> Tuple[Callable[[], Any], int]:
+        recorder = Recorder(workdir / "recordings")
+
+        def run() -> None:
+            for invocation, response in records:
+                recorder.record(invocation, response)
+
+        return (
+            run,
+            n
+        )
+
+    return prepare
+
+def default_benchmarks(
+        corpus: Corpus,
+        workers: int = 1,
+) -> List[Benchmark]:
+
+    benchmarks = [
+        Benchmark("sandbox.invoke.cold", sandbox_cold(corpus)),
+        Benchmark("sandbox.invoke.warm", sandbox_warm(corpus)),
+        Benchmark("sandbox.invoke.warm_disk", sandbox_warm(corpus, cache_max_bytes=0)),
+    ]
+    benchmarks.extend(
+        Benchmark(f"data_generator.generate.{shape}", generate_shape(corpus, shape))
+        for shape in SHAPES
+    )
+    benchmarks.extend(
+        [
+            Benchmark("fixture_generator.generate", fixture_generation(corpus, workers), repeat=3),
+            Benchmark("fixture_store.save", store_save(corpus)),
+            Benchmark("fixture_store.load", store_load(corpus)),
+            Benchmark("fixture_store.load_cached", store_load(corpus, cached=True)),
+            Benchmark("recorder.session_log", recorder_session_log(corpus)),
+            Benchmark("recorder.files", recorder_files(corpus)),
+        ]
+    )
+
+    return benchmarks
+
+def measure(
+        benchmark: Benchmark,
+        repeat: Optional[int] = None,
+        memory: bool = True,
+) -> JSON:
+    """
+    Time `repeat` fresh runs of a benchmark, then (with `memory`) one more
+    under tracemalloc for its peak allocation. Timed runs are never traced,
+    since tracing slows allocation-heavy code several times over.
+    """
+
+    timings: List[float] = []
+    ops = 0
+    for _ in range(repeat or benchmark.repeat):
+        with tempfile.TemporaryDirectory(prefix="sandbox-bench-") as workdir:
+            run, ops = benchmark.prepare(Path(workdir))
+            gc.collect()
+
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+
+    result: JSON = {
+        "ops": ops,
+        "repeat": len(timings),
+        "seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        "seconds_per_op": statistics.median(timings) / max(ops, 1),
+        "ops_per_s": max(ops, 1) / statistics.median(timings),
+    }
+
+    if memory:
+        with tempfile.TemporaryDirectory(prefix="sandbox-bench-") as workdir:
+            run, _ = benchmark.prepare(Path(workdir))
+            gc.collect()
+
+            tracemalloc.start()
+            try:
+                run()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        result["peak_bytes"] = peak
+
+    return result
@@ -0,0 +1,260 @@
+from typing import Any, Dict, List
+import random
+
+JSON = Dict[str, Any]
+
+# Response shapes resources cycle through; see `synthetic_spec`.
+SHAPES = ("wide", "deep", "list", "poly")
+
+# Component schema each shape responds with.
+SHAPE_SCHEMAS = {
+    "wide": "Wide",
+    "deep": "Node0",
+    "list": "RowPage",
+    "poly": "Payment",
+}
+
+SCALES: Dict[str, Dict[str, int]] = {
+    "small": {"resources": 50, "ref_depth": 6, "width": 40, "array_items": 50},
+    "default": {"resources": 1000, "ref_depth": 12, "width": 120, "array_items": 200},
+    "large": {"resources": 5000, "ref_depth": 24, "width": 400, "array_items": 1000},
+}
+
+_SCALARS = (
+    {"type": "string", "maxLength": 40},
+    {"type": "string", "format": "date-time"},
+    {"type": "string", "format": "email"},
+    {"type": "integer", "minimum": 0, "maximum": 1_000_000},
+    {"type": "number", "minimum": 0, "maximum": 1000},
+    {"type": "boolean"},
+    {"type": "string", "enum": ["active", "pending", "closed", "void"]},
+)
+
+def _ref(name: str) -> JSON:
+    return {"$ref": f"#/components/schemas/{name}"}
+
+def _components(
+        rng: random.Random,
+        ref_depth: int,
+        width: int,
+        array_items: int,
+) -> JSON:
+
+    schemas: JSON = {}
+
+    # Deep $ref chain: Node0 -> Node1 -> ... -> Node{ref_depth - 1}
+    for i in range(ref_depth):
+        props: JSON = {
+            "id": {"type": "integer"},
+            "label": {"type": "string", "maxLength": 24},
+            "level": {"type": "integer", "minimum": i, "maximum": i},
+        }
+        if i + 1 < ref_depth:
+            props["child"] = _ref(f"Node{i + 1}")
+        schemas[f"Node{i}"] = {
+            "type": "object",
+            "required": sorted(props),
+            "properties": props,
+        }
+
+    # Wide object: `width` mixed scalar fields plus a few nested refs.
+    wide: JSON = {
+        f"field_{i:04d}": dict(rng.choice(_SCALARS))
+        for i in range(width)
+    }
+    wide["owner"] = _ref("Customer")
+    wide["node"] = _ref("Node0")
+    schemas["Wide"] = {
+        "type": "object",
+        "required": sorted(wide),
+        "properties": wide,
+    }
+
+    schemas["Row"] = {
+        "type": "object",
+        "required": ["id", "name", "amount", "tags"],
+        "properties": {
+            "id": {"type": "integer"},
+            "name": {"type": "string", "maxLength": 32},
+            "amount": {"type": "number"},
+            "tags": {
+                "type": "array",
+                "minItems": 0,
+                "maxItems": 4,
+                "items": {"type": "string", "maxLength": 12},
+            },
+        },
+    }
+    schemas["RowPage"] = {
+        "type": "object",
+        "required": ["data", "has_more"],
+        "properties": {
+            "data": {
+                "type": "array",
+                "minItems": array_items,
+                "maxItems": array_items,
+                "items": _ref("Row"),
+            },
+            "has_more": {"type": "boolean"},
+            "next_cursor": {"type": "string", "maxLength": 16},
+        },
+    }
+
+    # allOf composition and oneOf unions.
+    schemas["Base"] = {
+        "type": "object",
+        "required": ["id", "created"],
+        "properties": {
+            "id": {"type": "integer"},
+            "created": {"type": "string", "format": "date-time"},
+        },
+    }
+    schemas["Customer"] = {
+        "allOf": [
+            _ref("Base"),
+            {
+                "type": "object",
+                "required": ["email", "name"],
+                "properties": {
+                    "email": {"type": "string", "format": "email"},
+                    "name": {"type": "string", "maxLength": 40},
+                    "metadata": {
+                        "type": "object",
+                        "additionalProperties": {"type": "string"},
+                    },
+                },
+            },
+        ]
+    }
+    schemas["Card"] = {
+        "type": "object",
+        "required": ["kind", "last4", "exp_month"],
+        "properties": {
+            "kind": {"type": "string", "enum": ["card"]},
+            "last4": {"type": "string", "minLength": 4, "maxLength": 4},
+            "exp_month": {"type": "integer", "minimum": 1, "maximum": 12},
+        },
+    }
+    schemas["Bank"] = {
+        "type": "object",
+        "required": ["kind", "iban"],
+        "properties": {
+            "kind": {"type": "string", "enum": ["bank"]},
+            "iban": {"type": "string", "maxLength": 34},
+        },
+    }
+    schemas["Payment"] = {
+        "allOf": [
+            _ref("Base"),
+            {
+                "type": "object",
+                "required": ["method", "customer"],
+                "properties": {
+                    "method": {"oneOf": [_ref("Card"), _ref("Bank")]},
+                    "customer": _ref("Customer"),
+                    "attempts": {
+                        "type": "array",
+                        "minItems": 1,
+                        "maxItems": 5,
+                        "items": {"oneOf": [_ref("Card"), _ref("Bank")]},
+                    },
+                },
+            },
+        ]
+    }
+
+    return {"schemas": schemas}
+
+def _json_response(schema: JSON) -> JSON:
+    return {
+        "description": "OK",
+        "content": {"application/json": {"schema": schema}},
+    }
+
+def synthetic_spec(
+        resources: int = 1000,
+        ref_depth: int = 12,
+        width: int = 120,
+        array_items: int = 200,
+        seed: int = 0,
+) -> JSON:
+    """
+    Deterministic OpenAPI 3 document for benchmarks.
+
+    Each of `resources` resources gets `GET`/`POST /rNNNNN` and
+    `GET /rNNNNN/{id}` (3 operations, 2 paths) whose response is one of
+    SHAPES in turn: a `width`-field object, a `ref_depth`-long $ref chain, a
+    page of `array_items` rows, or an allOf/oneOf payment. The same
+    arguments always give the same document.
+    """
+
+    rng = random.Random(seed)
+    paths: JSON = {}
+    for i in range(resources):
+        shape = SHAPES[i % len(SHAPES)]
+        item = _ref(SHAPE_SCHEMAS[shape])
+        base = f"/r{i:05d}"
+
+        paths[base] = {
+            "get": {
+                "operationId": f"list_r{i:05d}",
+                "summary": f"List {shape} resources",
+                "parameters": [
+                    {
+                        "name": "limit",
+                        "in": "query",
+                        "schema": {"type": "integer", "minimum": 1, "maximum": 100},
+                    },
+                    {
+                        "name": "starting_after",
+                        "in": "query",
+                        "schema": {"type": "string"},
+                    },
+                ],
+                "responses": {"200": _json_response(_ref("RowPage"))},
+            },
+            "post": {
+                "operationId": f"create_r{i:05d}",
+                "summary": f"Create a {shape} resource",
+                "requestBody": {
+                    "content": {"application/json": {"schema": _ref("Customer")}},
+                },
+                "responses": {"201": _json_response(item)},
+            },
+        }
+        paths[f"{base}/{{id}}"] = {
+            "get": {
+                "operationId": f"get_r{i:05d}",
+                "summary": f"Retrieve a {shape} resource",
+                "parameters": [
+                    {
+                        "name": "id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"},
+                    },
+                ],
+                "responses": {
+                    "200": _json_response(item),
+                    "404": _json_response({"type": "object"}),
+                },
+            },
+        }
+
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Synthetic benchmark API", "version": "1.0.0"},
+        "paths": paths,
+        "components": _components(rng, ref_depth, width, array_items),
+    }
+
+def shape_of(resource: int) -> str:
+    return SHAPES[resource % len(SHAPES)]
+
+def resources_by_shape(resources: int) -> Dict[str, List[int]]:
+
+    out: Dict[str, List[int]] = {shape: [] for shape in SHAPES}
+    for i in range(resources):
+        out[shape_of(i)].append(i)
+
+    return out
@@ -0,0 +1,183 @@
+from typing import Optional, Dict, Any, List, Tuple
+import copy
+import json
+
+from type import (
+    JSON,
+    OpenAPINormalized,
+)
+
+# A string slot that may be shortened: (container, key, length, minLength).
+_StringSlot = Tuple[Any, Any, int, int]
+
+def json_size(value: Any) -> int:
+    """
+    Bytes of `value` as compact JSON.
+    """
+
+    return len(
+        json.dumps(
+            value,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str,
+        ).encode("utf-8")
+    )
+
+def is_free_text(schema: JSON) -> bool:
+
+    return not any(
+        key in schema for key in ("enum", "format", "pattern", "example", "default", "const")
+    )
+
+def _properties(
+        open_api_spec: OpenAPINormalized,
+        schema: JSON,
+) -> JSON:
+    """
+    Property schemas of an object schema, including those merged in by allOf.
+    """
+
+    properties = dict(schema.get("properties") or {})
+    for part in schema.get("allOf") or []:
+        part = open_api_spec.resolve(part)
+        if isinstance(part, dict):
+            properties.update(_properties(open_api_spec, part))
+
+    return properties
+
+def _collect(
+        open_api_spec: OpenAPINormalized,
+        value: Any,
+        schema: Any,
+        strings: List[_StringSlot],
+        arrays: List[Tuple[List[Any], int, int]],
+        depth: int = 0,
+) -> None:
+    """
+    Walk `value` alongside its schema, collecting shrinkable strings and arrays.
+    oneOf/anyOf values are left alone, since their branch is unknown.
+    """
+
+    schema = open_api_spec.resolve(schema) if isinstance(schema, dict) else None
+    if not isinstance(schema, dict):
+        return
+
+    if isinstance(value, dict):
+        properties = _properties(open_api_spec, schema)
+        for name, sub_value in value.items():
+            sub_schema = properties.get(name)
+            if isinstance(sub_value, str):
+                sub_schema = open_api_spec.resolve(sub_schema) if sub_schema else None
+                if isinstance(sub_schema, dict) and is_free_text(sub_schema):
+                    strings.append(
+                        (value, name, len(sub_value), int(sub_schema.get("minLength", 0)))
+                    )
+            else:
+                _collect(open_api_spec, sub_value, sub_schema, strings, arrays, depth + 1)
+
+    elif isinstance(value, list):
+        items = open_api_spec.resolve(schema.get("items") or {})
+        arrays.append((value, int(schema.get("minItems", 0)), depth))
+        for i, item in enumerate(value):
+            if isinstance(item, str):
+                if isinstance(items, dict) and is_free_text(items):
+                    strings.append((value, i, len(item), int(items.get("minLength", 0))))
+            else:
+                _collect(open_api_spec, item, items, strings, arrays, depth + 1)
+
+def _string_cap(
+        strings: List[_StringSlot],
+        excess: int,
+) -> int:
+    """
+    Largest length cap whose trimming saves at least `excess` characters
+    (0 if even trimming everything to minLength falls short).
+    """
+
+    def saving(cap: int) -> int:
+        return sum(
+            length - max(cap, min_len)
+            for _, _, length, min_len in strings
+            if length > max(cap, min_len)
+        )
+
+    low, high = 0, max(length for _, _, length, _ in strings)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if saving(mid) >= excess:
+            low = mid
+        else:
+            high = mid - 1
+
+    return low
+
+def fit_to_budget(
+        open_api_spec: OpenAPINormalized,
+        value: Any,
+        schema: JSON,
+        max_bytes: int,
+) -> Tuple[Any, Optional[Dict[str, int]]]:
+    """
+    Shrink a copy of `value` until its compact JSON fits in `max_bytes`,
+    staying schema-valid: free-text strings are cut toward minLength under a
+    common length cap first, then arrays lose trailing items toward minItems,
+    outermost first. Returns the trimmed copy and truncation stats (None if it
+    already fit). The budget can be missed when minLength/minItems forbid
+    going lower.
+    """
+
+    size = json_size(value)
+    if size <= max_bytes:
+        return (
+            value,
+            None
+        )
+
+    # Plans hand out example/default values by reference; never trim the spec.
+    value = copy.deepcopy(value)
+    stats = {
+        "bytes_before": size,
+        "strings_trimmed": 0,
+        "arrays_trimmed": 0,
+        "items_dropped": 0,
+    }
+
+    strings: List[_StringSlot] = []
+    arrays: List[Tuple[List[Any], int, int]] = []
+    _collect(open_api_spec, value, schema, strings, arrays)
+
+    if strings:
+        cap = _string_cap(strings, size - max_bytes)
+        for container, key, length, min_len in strings:
+            limit = max(cap, min_len)
+            if length > limit:
+                container[key] = container[key][:limit]
+                size -= length - limit
+                stats["strings_trimmed"] += 1
+
+    # Outermost arrays first: dropping one of their items drops a whole
+    # subtree. Arrays are re-collected per depth, so ones inside dropped
+    # items are never counted.
+    depth = 0
+    while size > max_bytes and arrays:
+        level = [(array, min_items) for array, min_items, d in arrays if d == depth]
+        for array, min_items in level:
+            trimmed = False
+            while len(array) > max(min_items, 0) and size > max_bytes:
+                size -= json_size(array.pop()) + (1 if array else 0)
+                stats["items_dropped"] += 1
+                trimmed = True
+            stats["arrays_trimmed"] += trimmed
+        
+        depth += 1
+        arrays = []
+        _collect(open_api_spec, value, schema, [], arrays)
+        arrays = [entry for entry in arrays if entry[2] >= depth]
+
+    stats["bytes_after"] = json_size(value)
+
+    return (
+        value,
+        stats
+    )
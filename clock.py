@@ -0,0 +1,115 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+import asyncio
+import threading
+import time
+
+class Clock(ABC):
+    """
+    Source of time for the sandbox. `sleep` is how simulated latency is spent;
+    `now` is what ends up in `ToolCall.timestamp`.
+    """
+
+    @abstractmethod
+    def now(self) -> float:
+        ...
+    
+    @abstractmethod
+    def sleep(self, seconds: float) -> None:
+        ...
+    
+    @abstractmethod
+    async def asleep(self, seconds: float) -> None:
+        ...
+
+class RealClock(Clock):
+    """
+    Wall-clock time; latency is spent in `time.sleep`.
+    """
+
+    def now(self) -> float:
+        return time.time()
+    
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+    
+    async def asleep(self, seconds: float) -> None:
+        await asyncio.sleep(max(seconds, 0))
+
+class VirtualClock(Clock):
+    """
+    Simulated time: sleeping only advances a counter, nothing blocks.
+    """
+
+    def __init__(
+            self,
+            start: Optional[float] = None,
+    ) -> None:
+        self._now = time.time() if start is None else float(start)
+        self._lock = threading.Lock()
+    
+    def now(self) -> float:
+        return self._now
+    
+    def sleep(self, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        
+        with self._lock:
+            self._now += seconds
+    
+    async def asleep(self, seconds: float) -> None:
+        self.sleep(seconds)
+
+        # Still yield so concurrent callers interleave as they would for real.
+        await asyncio.sleep(0)
+
+class ScaledClock(Clock):
+    """
+    Real time running `speedup` times faster, e.g. speedup=100 turns a
+    100ms latency into a 1ms sleep while timestamps still advance by 100ms.
+    """
+
+    def __init__(
+            self,
+            speedup: float = 100.0,
+            start: Optional[float] = None,
+    ) -> None:
+        if speedup <= 0:
+            raise ValueError("speedup must be positive.")
+        
+        self.speedup = speedup
+        self._start = time.time() if start is None else float(start)
+        self._origin = time.monotonic()
+    
+    def now(self) -> float:
+        return self._start + (time.monotonic() - self._origin) * self.speedup
+    
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds / self.speedup)
+    
+    async def asleep(self, seconds: float) -> None:
+        await asyncio.sleep(max(seconds, 0) / self.speedup)
+
+CLOCKS = {
+    "real": RealClock,
+    "virtual": VirtualClock,
+    "scaled": ScaledClock,
+}
+
+def make_clock(
+        mode: str = "real",
+        speedup: float = 100.0,
+) -> Clock:
+    
+    if mode not in CLOCKS:
+        raise ValueError(
+            f"Unknown clock mode '{mode}', expected one of {sorted(CLOCKS)}."
+        )
+    
+    if mode == "scaled":
+        return ScaledClock(speedup=speedup)
+    
+    return CLOCKS[mode]()
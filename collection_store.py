@@ -0,0 +1,728 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Iterator, Callable, Union
+import base64
+import itertools
+import json
+import threading
+
+from type import (
+    JSON,
+    MockedResponse,
+    Operation,
+    OpenAPINormalized,
+)
+from data_generator import DataGenerator
+from fixture_generator import DEFAULT_ERROR_TEMPLATES
+
+# Items per page when the caller doesn't say.
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 1000
+
+# Query args that drive paging rather than filter items.
+PAGINATION_ARGS = {"page", "per_page", "limit", "cursor"}
+
+SortKey = Tuple[int, Any]
+
+def _schema_fields(
+        open_api_spec: OpenAPINormalized,
+        schema: Any,
+) -> List[str]:
+    """
+    Property names of an object schema, including those merged in by allOf.
+    """
+
+    schema = open_api_spec.resolve(schema)
+    if not isinstance(schema, dict):
+        return []
+
+    fields = list(schema.get("properties") or {})
+    for part in schema.get("allOf") or []:
+        fields.extend(_schema_fields(open_api_spec, part))
+
+    return fields
+
+def sort_key(value: Any) -> SortKey:
+    """
+    Total order over JSON scalars: None < numbers < strings < anything else.
+    """
+
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (bool, int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+
+    return (3, json.dumps(value, sort_keys=True, default=str))
+
+def encode_cursor(position: Any) -> str:
+
+    return base64.urlsafe_b64encode(
+        json.dumps(position, separators=(",", ":")).encode("utf-8")
+    ).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Any:
+    """
+    Inverse of `encode_cursor`; raises ValueError for a malformed cursor.
+    """
+
+    try:
+        return json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+class Collection:
+    """
+    In-memory records of one resource: a primary-key hash index for O(1)
+    get/put/delete, the keys in sorted order for paging, and sorted
+    (value, key) secondary indexes, built on first use of a field as a filter
+    and maintained on every mutation after that.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            primary_key: str = "id",
+            items: Iterable[JSON] = (),
+            next_id: Optional[int] = None,
+    ) -> None:
+        self.name = name
+        self.primary_key = primary_key
+
+        self._items: Dict[Any, JSON] = {}
+        self._order: List[Tuple[SortKey, Any]] = []
+
+        # Item fields seen so far; list args naming one of them filter.
+        self.fields = {primary_key}
+        self._indexes: Dict[str, List[Tuple[SortKey, SortKey, Any]]] = {}
+        self._next_id = next_id or 1
+        self._lock = threading.RLock()
+
+        for item in items:
+            item = dict(item)
+            if item.get(primary_key) in self._items:
+                item[primary_key] = None # duplicate sample rows get fresh keys
+            self.create(item)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _new_id(self) -> int:
+
+        while self._next_id in self._items:
+            self._next_id += 1
+        self._next_id += 1
+
+        return self._next_id - 1
+
+    def _index_add(
+            self,
+            pk: Any,
+            item: JSON,
+    ) -> None:
+
+        for field, index in self._indexes.items():
+            insort(index, (sort_key(item.get(field)), sort_key(pk), pk))
+
+    def _index_remove(
+            self,
+            pk: Any,
+            item: JSON,
+    ) -> None:
+
+        for field, index in self._indexes.items():
+            entry = (sort_key(item.get(field)), sort_key(pk), pk)
+            i = bisect_left(index, entry)
+            if i < len(index) and index[i] == entry:
+                del index[i]
+
+    def _index(self, field: str) -> List[Tuple[SortKey, SortKey, Any]]:
+
+        index = self._indexes.get(field)
+        if index is None:
+            index = sorted(
+                (sort_key(item.get(field)), sort_key(pk), pk)
+                for pk, item in self._items.items()
+            )
+            self._indexes[field] = index
+
+        return index
+
+    def get(self, pk: Any) -> Optional[JSON]:
+        return self._items.get(pk)
+
+    def create(self, item: JSON) -> JSON:
+
+        with self._lock:
+            item = dict(item)
+            pk = item.get(self.primary_key)
+            if pk is None:
+                pk = item[self.primary_key] = self._new_id()
+            elif pk in self._items:
+                raise KeyError(f"{self.name}: duplicate {self.primary_key} {pk!r}")
+            elif isinstance(pk, int) and pk >= self._next_id:
+                self._next_id = pk + 1
+
+            self._items[pk] = item
+            insort(self._order, (sort_key(pk), pk))
+            self._index_add(pk, item)
+            self.fields.update(item)
+
+        return item
+
+    def update(
+            self,
+            pk: Any,
+            fields: JSON,
+            replace: bool = False,
+    ) -> Optional[JSON]:
+        """
+        PATCH (merge `fields`) or PUT (`replace=True`) an item; the primary key
+        never changes. None if there is no such item.
+        """
+
+        with self._lock:
+            current = self._items.get(pk)
+            if current is None:
+                return None
+
+            updated = dict(fields) if replace else {**current, **fields}
+            updated[self.primary_key] = pk
+
+            self._index_remove(pk, current)
+            self._items[pk] = updated
+            self._index_add(pk, updated)
+            self.fields.update(updated)
+
+        return updated
+
+    def delete(self, pk: Any) -> Optional[JSON]:
+
+        with self._lock:
+            item = self._items.pop(pk, None)
+            if item is None:
+                return None
+
+            entry = (sort_key(pk), pk)
+            i = bisect_left(self._order, entry)
+            if i < len(self._order) and self._order[i] == entry:
+                del self._order[i]
+            self._index_remove(pk, item)
+
+        return item
+
+    def list(
+            self,
+            where: Optional[JSON] = None,
+            page: Optional[int] = None,
+            per_page: Optional[int] = None,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None,
+            style: Optional[str] = None,
+    ) -> Tuple[List[JSON], JSON]:
+        """
+        One page of items in primary-key order, plus pagination metadata.
+        Page style (`page`/`per_page`) seeks by offset; cursor style
+        (`limit`/`cursor`) seeks by the last key seen; `style` picks one when
+        the args don't. Either way the work is a bisect plus the page itself.
+        `where` keeps items whose fields equal the given values, through the
+        secondary index of the first field.
+        """
+
+        where = dict(where or {})
+        with self._lock:
+            if where:
+                field, value = next(iter(where.items()))
+                rest = [(f, v) for f, v in where.items() if f != field]
+                index = self._index(field)
+                value_key = sort_key(value)
+                lo = bisect_left(index, (value_key,))
+                hi = bisect_right(index, (value_key, _MAX), lo)
+                keys = [entry[1:] for entry in index[lo:hi]] # (sort key, pk)
+                if rest:
+                    keys = [
+                        entry for entry in keys
+                        if all(self._items[entry[1]].get(f) == v for f, v in rest)
+                    ]
+            else:
+                keys = self._order
+
+            if cursor is not None or limit is not None \
+                    or (style == "cursor" and page is None and per_page is None):
+                size = _page_size(limit)
+                start = 0
+                if cursor is not None:
+                    last = decode_cursor(cursor)
+                    start = bisect_right(keys, (sort_key(last), _MAX))
+
+                chunk = keys[start:start + size]
+                items = [self._items[pk] for _, pk in chunk]
+                has_more = start + size < len(keys)
+                meta = {
+                    "style": "cursor",
+                    "limit": size,
+                    "next_cursor": encode_cursor(chunk[-1][1]) if has_more and chunk else None,
+                }
+            else:
+                size = _page_size(per_page)
+                number = max(int(page or 1), 1)
+                start = (number - 1) * size
+
+                items = [self._items[pk] for _, pk in keys[start:start + size]]
+                meta = {
+                    "style": "page",
+                    "page": number,
+                    "per_page": size,
+                    "total": len(keys),
+                    "next_page": number + 1 if start + size < len(keys) else None,
+                }
+
+        return (
+            items,
+            meta
+        )
+
+class LazyCollection:
+    """
+    A collection of `size` synthetic items that are never materialized:
+    item i (primary key i + 1) is derived from (seed, collection, i) on
+    demand, so any page is computed independently in O(page size). Cursors
+    encode the position (the last key) a page ended at.
+
+    Writes go to a small overlay (updated items, created items, deleted keys),
+    so CRUD workflows stay coherent; filtering would need a full scan and
+    is rejected.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            size: int,
+            make_item: Callable[[int], JSON],
+            primary_key: str = "id",
+            fields: Iterable[str] = (),
+    ) -> None:
+        self.name = name
+        self.size = size
+        self.primary_key = primary_key
+        self._make_item = make_item
+
+        # Item fields (the schema's properties); list args naming one filter.
+        self.fields = {primary_key, *fields}
+
+        self._overrides: Dict[int, JSON] = {}
+        self._created: List[int] = [] # keys past `size`, ascending
+        self._deleted: List[int] = [] # deleted keys <= size, sorted
+        self._deleted_set = set()
+        self._next_id = size + 1
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_schema(
+            cls,
+            name: str,
+            size: int,
+            data_generator: DataGenerator,
+            open_api_spec: OpenAPINormalized,
+            schema: JSON,
+            primary_key: str = "id",
+    ) -> "LazyCollection":
+        """
+        Items generated from `schema` by a generator derived for this collection
+        and reseeded per index, so item i never depends on items before it.
+        """
+
+        generator = data_generator.derive(f"collection:{name}")
+        plan = generator.compile(open_api_spec, schema)
+        lock = threading.Lock()
+
+        def make_item(index: int) -> JSON:
+            with lock:
+                generator.reseed(str(index))
+                item = plan(1)[0]
+            return item if isinstance(item, dict) else {"value": item}
+
+        return cls(
+            name,
+            size,
+            make_item,
+            primary_key=primary_key,
+            fields=_schema_fields(open_api_spec, schema),
+        )
+
+    def __len__(self) -> int:
+        return self.size - len(self._deleted) + len(self._created)
+
+    def _live(self, pk: Any) -> bool:
+
+        if not isinstance(pk, int) or isinstance(pk, bool):
+            return False
+        if pk > self.size:
+            return pk in self._overrides
+
+        return 1 <= pk and pk not in self._deleted_set
+
+    def get(self, pk: Any) -> Optional[JSON]:
+
+        if not self._live(pk):
+            return None
+
+        item = self._overrides.get(pk)
+        if item is None:
+            item = {**self._make_item(pk - 1), self.primary_key: pk}
+
+        return item
+
+    def create(self, item: JSON) -> JSON:
+
+        with self._lock:
+            pk = self._next_id
+            self._next_id += 1
+            item = {**item, self.primary_key: pk}
+            self._overrides[pk] = item
+            self._created.append(pk)
+            self.fields.update(item)
+
+        return item
+
+    def update(
+            self,
+            pk: Any,
+            fields: JSON,
+            replace: bool = False,
+    ) -> Optional[JSON]:
+
+        with self._lock:
+            current = self.get(pk)
+            if current is None:
+                return None
+
+            updated = dict(fields) if replace else {**current, **fields}
+            updated[self.primary_key] = pk
+            self._overrides[pk] = updated
+            self.fields.update(updated)
+
+        return updated
+
+    def delete(self, pk: Any) -> Optional[JSON]:
+
+        with self._lock:
+            item = self.get(pk)
+            if item is None:
+                return None
+
+            self._overrides.pop(pk, None)
+            if pk > self.size:
+                del self._created[bisect_left(self._created, pk)]
+            else:
+                insort(self._deleted, pk)
+                self._deleted_set.add(pk)
+
+        return item
+
+    def _keys_after(self, last: int) -> Iterator[int]:
+        """
+        Live keys greater than `last`, in order.
+        """
+
+        for pk in range(max(last, 0) + 1, self.size + 1):
+            if pk not in self._deleted_set:
+                yield pk
+
+        yield from self._created[bisect_right(self._created, last):]
+
+    def _key_at(self, offset: int) -> int:
+        """
+        The key just before the live item at `offset`, skipping deleted keys.
+        """
+
+        live_base = self.size - len(self._deleted)
+        if offset >= live_base:
+            created = offset - live_base
+            return self._created[created - 1] if created else self.size
+
+        pk = offset + 1
+        while True:
+            shifted = offset + 1 + bisect_right(self._deleted, pk)
+            if shifted == pk:
+                return pk - 1
+            pk = shifted
+
+    def list(
+            self,
+            where: Optional[JSON] = None,
+            page: Optional[int] = None,
+            per_page: Optional[int] = None,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None,
+            style: Optional[str] = None,
+    ) -> Tuple[List[JSON], JSON]:
+        """
+        Same contract as `Collection.list`, computing only the requested page.
+        """
+
+        if where:
+            raise ValueError(
+                f"{self.name}: filtering is not supported on lazy collections."
+            )
+
+        with self._lock:
+            if cursor is not None or limit is not None \
+                    or (style == "cursor" and page is None and per_page is None):
+                size = _page_size(limit)
+                last = 0
+                if cursor is not None:
+                    last = decode_cursor(cursor)
+                    if not isinstance(last, int):
+                        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+                keys = list(itertools.islice(self._keys_after(last), size + 1))
+                meta = {
+                    "style": "cursor",
+                    "limit": size,
+                    "next_cursor": encode_cursor(keys[size - 1]) if len(keys) > size else None,
+                }
+            else:
+                size = _page_size(per_page)
+                number = max(int(page or 1), 1)
+                start = (number - 1) * size
+                total = len(self)
+
+                keys = list(
+                    itertools.islice(self._keys_after(self._key_at(start)), size + 1)
+                ) if start < total else []
+                meta = {
+                    "style": "page",
+                    "page": number,
+                    "per_page": size,
+                    "total": total,
+                    "next_page": number + 1 if start + size < total else None,
+                }
+
+            items = [self.get(pk) for pk in keys[:size]]
+
+        return (
+            items,
+            meta
+        )
+
+class _Max:
+    """
+    Compares above every value, so (key, _MAX) sorts after any (key, pk).
+    """
+
+    def __lt__(self, other: Any) -> bool:
+        return False
+
+    def __gt__(self, other: Any) -> bool:
+        return True
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _Max)
+
+_MAX = _Max()
+
+def _page_size(requested: Optional[int]) -> int:
+
+    if requested is None:
+        return DEFAULT_PAGE_SIZE
+
+    return min(max(int(requested), 1), MAX_PAGE_SIZE)
+
+class CollectionStore:
+    """
+    Named collections plus the mapping from REST-shaped operations onto them:
+        GET    /users            -> list (paged)
+        POST   /users            -> create (201)
+        GET    /users/{user_id}  -> get (404 if missing)
+        PUT    /users/{user_id}  -> replace
+        PATCH  /users/{user_id}  -> merge
+        DELETE /users/{user_id}  -> delete (204)
+    Seed it from a FixtureBundle with `from_bundle`.
+    """
+
+    def __init__(self) -> None:
+        self.collections: Dict[str, Union[Collection, LazyCollection]] = {}
+        self._bindings: Dict[str, Optional[Tuple[str, str, Optional[str]]]] = {}
+
+    @classmethod
+    def from_bundle(
+            cls,
+            bundle: Any,
+            service_name: str = "default",
+            data_generator: Optional[DataGenerator] = None,
+            open_api_spec: Optional[OpenAPINormalized] = None,
+    ) -> "CollectionStore":
+        """
+        Collections from a FixtureBundle. Entries with a "lazy" section (see
+        `FixtureGenerator(collection_size=...)`) become LazyCollections, which
+        need the generator and spec their items are derived from.
+        """
+
+        store = cls()
+        collections = bundle.services[service_name].get("collections") or {}
+        for name, payload in collections.items():
+            lazy = payload.get("lazy")
+            if lazy:
+                if data_generator is None or open_api_spec is None:
+                    raise ValueError(
+                        f"Lazy collection '{name}' needs a data_generator and open_api_spec."
+                    )
+                store.add(
+                    LazyCollection.from_schema(
+                        name,
+                        lazy["size"],
+                        data_generator,
+                        open_api_spec,
+                        lazy["schema"],
+                    )
+                )
+                continue
+
+            next_id = payload.get("next_id")
+            store.add(
+                Collection(
+                    name,
+                    items=payload.get("items") or [],
+                    next_id=next_id if isinstance(next_id, int) else None,
+                )
+            )
+
+        return store
+
+    def add(self, collection: Union[Collection, LazyCollection]) -> None:
+        self.collections[collection.name] = collection
+        self._bindings.clear()
+
+    def binding(self, op_name: str) -> Optional[Tuple[str, str, Optional[str]]]:
+        """
+        (action, collection, path param holding the key) for an operation,
+        or None when the operation isn't served by a collection.
+        """
+
+        if op_name in self._bindings:
+            return self._bindings[op_name]
+
+        method, _, path = op_name.partition(" ")
+        segments = [s for s in path.split("/") if s]
+        binding = None
+
+        if segments and segments[-1] in self.collections:
+            action = {"GET": "list", "POST": "create"}.get(method.upper())
+            if action:
+                binding = (action, segments[-1], None)
+        elif len(segments) >= 2 \
+                and segments[-1].startswith("{") and segments[-1].endswith("}") \
+                and segments[-2] in self.collections:
+            action = {
+                "GET": "get",
+                "PUT": "replace",
+                "PATCH": "patch",
+                "DELETE": "delete",
+            }.get(method.upper())
+            if action:
+                binding = (action, segments[-2], segments[-1][1:-1])
+
+        self._bindings[op_name] = binding
+        return binding
+
+    def handle(
+            self,
+            op: Operation,
+            args: JSON,
+    ) -> Optional[MockedResponse]:
+        """
+        Serve a call from collection state; None if `op` isn't bound to one.
+        Responses carry no latency; the sandbox applies its fault profile.
+        """
+
+        binding = self.binding(op.name)
+        if binding is None:
+            return None
+
+        action, name, key_param = binding
+        collection = self.collections[name]
+        body = args.get("body")
+
+        if action == "list":
+            properties = op.param_schema.get("properties") or {}
+            # Only args naming an item field filter; sort/expand/q params and
+            # parent path params are ignored.
+            where = {
+                k: v for k, v in args.items()
+                if k in collection.fields and k not in PAGINATION_ARGS
+            }
+            try:
+                items, meta = collection.list(
+                    where=where,
+                    page=args.get("page"),
+                    per_page=args.get("per_page"),
+                    limit=args.get("limit"),
+                    cursor=args.get("cursor"),
+                    style="cursor" if {"limit", "cursor"} & set(properties) \
+                        and "page" not in properties else "page",
+                )
+            except ValueError as e:
+                return _error(400, str(e))
+
+            data = items if op.result_schema.get("type") == "array" \
+                else {"items": items, **meta}
+            return MockedResponse(
+                ok=True,
+                data=data,
+                status=200,
+                meta=meta,
+            )
+
+        if action == "create":
+            try:
+                item = collection.create(body if isinstance(body, dict) else {})
+            except KeyError as e:
+                return _error(409, str(e.args[0]))
+
+            return MockedResponse(
+                ok=True,
+                data=item,
+                status=201,
+            )
+
+        pk = args.get(key_param)
+        if action == "get":
+            item = collection.get(pk)
+        elif action == "delete":
+            item = collection.delete(pk)
+        else:
+            item = collection.update(
+                pk,
+                body if isinstance(body, dict) else {},
+                replace=action == "replace",
+            )
+
+        if item is None:
+            return _error(404, f"{name}: no item with {collection.primary_key} {pk!r}.")
+
+        if action == "delete":
+            return MockedResponse(
+                ok=True,
+                status=204,
+            )
+
+        return MockedResponse(
+            ok=True,
+            data=item,
+            status=200,
+        )
+
+def _error(
+        status: int,
+        message: str,
+) -> MockedResponse:
+
+    return MockedResponse(
+        ok=False,
+        data={**DEFAULT_ERROR_TEMPLATES.get(status, {"message": message}), "detail": message},
+        error=message,
+        status=status,
+    )
@@ -1,22 +1,118 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple, List, Iterator
+import hashlib
+import json
 import random
 from datetime import datetime
 
+try:
+    import numpy  # type: ignore
+except ImportError:  # optional, only needed for backend="numpy"
+    numpy = None
+
 from type import (
     JSON,
     OpenAPINormalized,
+    ResponseBudget,
 )
 from utils import (
     resolve_schema,
 )
+from budget import fit_to_budget, is_free_text
+
+# A compiled generation plan: calling it with `n` draws `n` values in bulk.
+Plan = Callable[[int], List[Any]]
+
+MAX_DEPTH = 6
+
+# Number of distinct specs whose plans are kept alive at once.
+MAX_CACHED_SPECS = 8
+
+# Approximate size of the text chunks `stream` yields.
+STREAM_CHUNK_BYTES = 64 * 1024
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+# bytes.translate() tables mapping random bytes onto ALPHABET. Bytes >= 208
+# (the largest multiple of 26 that fits in a byte) are rejected so every
+# letter stays equally likely.
+_ACCEPTED_BYTES = 26 * (256 // 26)
+_LETTER_TABLE = bytes(
+    ord(ALPHABET[b % 26]) for b in range(256)
+)
+_REJECTED_BYTES = bytes(range(_ACCEPTED_BYTES, 256))
+
+BACKENDS = ("python", "numpy")
 
 class DataGenerator:
 
-    def __init__(self, seed: Optional[int]=None) -> None:
+    def __init__(
+            self, 
+            seed: Optional[int]=None,
+            backend: str = "python",
+            budget: Optional[ResponseBudget] = None,
+            ) -> None:
         self.seed = seed if seed else int(
             datetime.now().timestamp()
             )
         self.rng = random.Random(self.seed)
+
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown backend '{backend}', expected one of {BACKENDS}."
+            )
+        if backend == "numpy" and numpy is None:
+            raise RuntimeError(
+                "The numpy backend requires NumPy. "
+                "Install with `pip install numpy` or use backend='python'."
+            )
+        self.backend = backend
+        self.np_rng = numpy.random.default_rng(self.seed) \
+            if backend == "numpy" else None
+
+        # Byte budgets; `last_truncation` reports what the last `generate`
+        # or `stream` call had to cut (None when nothing was).
+        self.budget = budget or ResponseBudget()
+        self.last_truncation: Optional[Dict[str, int]] = None
+        self._clamped = 0
+        self._stream_bytes = 0
+
+        # id(open_api_spec) -> (open_api_spec, {(id(schema), depth): (schema, plan)})
+        self._plans: Dict[int, Tuple[OpenAPINormalized, Dict[Tuple[int, int], Tuple[JSON, Plan]]]] = {}
+    
+    def derive(self, key: str) -> "DataGenerator":
+        """
+        Independent generator seeded from (self.seed, key), with the same
+        backend and budget.
+        """
+        
+        digest = hashlib.blake2b(
+            f"{self.seed}:{key}".encode("utf-8"),
+            digest_size=8,
+        ).digest()
+
+        return DataGenerator(
+            # seed=0 would mean "seed from the clock"
+            seed=int.from_bytes(digest, "big") or 1,
+            backend=self.backend,
+            budget=self.budget,
+        )
+    
+    def reseed(self, key: str) -> None:
+        """
+        Restart this generator's streams from (self.seed, key), in place, so
+        compiled plans keep drawing from them. Lets one generator produce
+        item `key` of a sequence without producing the items before it.
+        """
+        
+        digest = hashlib.blake2b(
+            f"{self.seed}:{key}".encode("utf-8"),
+            digest_size=8,
+        ).digest()
+        seed = int.from_bytes(digest, "big")
+
+        self.rng.seed(seed)
+        if self.np_rng is not None:
+            self.np_rng.bit_generator.state = numpy.random.PCG64(seed).state
     
     def _string(self, fmt: Optional[str]) -> str:
         
@@ -37,25 +133,376 @@ class DataGenerator:
         
         return f"s_{self.rng.randrange(1_000_000)}"
     
+    def _draw_ints(
+            self,
+            low: int,
+            high: int,
+            n: int,
+    ) -> List[int]:
+        
+        if low > high:
+            raise ValueError(f"empty range for randint({low}, {high})")
+        
+        if self.np_rng is not None:
+            return self.np_rng.integers(
+                low, 
+                high, 
+                size=n, 
+                endpoint=True
+                ).tolist()
+        
+        return self.rng.choices(
+            range(low, high + 1), 
+            k=n
+            )
+    
+    def _draw_floats(
+            self,
+            low: float,
+            high: float,
+            n: int,
+    ) -> List[float]:
+        
+        if self.np_rng is not None:
+            return self.np_rng.uniform(
+                low, 
+                high, 
+                size=n
+                ).tolist()
+        
+        span = high - low
+        draw = self.rng.random
+
+        return [low + span * draw() for _ in range(n)]
+    
+    def _draw_bools(self, n: int) -> List[bool]:
+        
+        if self.np_rng is not None:
+            return self.np_rng.integers(
+                0, 
+                2, 
+                size=n
+                ).astype(bool).tolist()
+        
+        bits = self.rng.getrandbits(n) if n else 0
+
+        return [bool(bits >> i & 1) for i in range(n)]
+    
+    def _draw_letters(self, k: int) -> str:
+        
+        if self.np_rng is not None:
+            codes = self.np_rng.integers(
+                0, 
+                26, 
+                size=k, 
+                dtype=numpy.uint8
+                ) + ord("a")
+            return codes.tobytes().decode("ascii")
+        
+        out = b""
+        while len(out) < k:
+            need = k - len(out)
+            out += self.rng.randbytes(
+                need + need // 4 + 8
+                ).translate(
+                    _LETTER_TABLE, 
+                    _REJECTED_BYTES
+                    )
+
+        return out[:k].decode("ascii")
+    
+    def _draw_text(
+            self,
+            min_len: int,
+            max_len: int,
+            n: int,
+    ) -> List[str]:
+        
+        return self._text(self._draw_ints(min_len, max_len, n))
+    
+    def _text(
+            self,
+            lengths: List[int],
+    ) -> List[str]:
+        
+        letters = self._draw_letters(sum(lengths))
+
+        out: List[str] = []
+        offset = 0
+        for length in lengths:
+            out.append(letters[offset:offset + length])
+            offset += length
+        
+        return out
+    
     def generate(
             self,
             open_api_spec: OpenAPINormalized,
             schema: JSON,
             depth: int = 0,
     ) -> Any:
+        
+        self._clamped = 0
+        value = self.compile(
+            open_api_spec=open_api_spec,
+            schema=schema,
+            depth=depth,
+        )(1)[0]
+
+        stats = None
+        if self.budget.max_response_bytes is not None:
+            value, stats = fit_to_budget(
+                open_api_spec,
+                value,
+                schema,
+                self.budget.max_response_bytes,
+            )
+        self.last_truncation = self._truncation(stats)
+
+        return value
+    
+    def _truncation(
+            self,
+            stats: Optional[Dict[str, int]],
+    ) -> Optional[Dict[str, int]]:
+        
+        if self._clamped:
+            stats = {**(stats or {}), "fields_clamped": self._clamped}
+        
+        return stats
+    
+    def generate_many(
+            self,
+            open_api_spec: OpenAPINormalized,
+            schema: JSON,
+            n: int,
+    ) -> List[Any]:
+        """
+        Generate `n` independent values for `schema`, drawing leaf values in bulk.
+        """
+        
+        return self.compile(
+            open_api_spec=open_api_spec,
+            schema=schema,
+        )(n)
+    
+    def stream(
+            self,
+            open_api_spec: OpenAPINormalized,
+            schema: JSON,
+            chunk_bytes: int = STREAM_CHUNK_BYTES,
+    ) -> Iterator[str]:
+        """
+        Generate a value for `schema` as compact JSON text, in chunks of about
+        `chunk_bytes`. Objects and arrays are walked and written member by
+        member, and only scalars and oneOf/allOf branches are built in memory,
+        so peak memory follows nesting depth, not response size.
+
+        Under a response budget, output already written is never revisited:
+        once the budget is spent, arrays stop at minItems and free-text
+        strings are written at minLength, but the text can still end up over
+        `max_response_bytes` (unlike `generate`, which trims after the fact).
+
+        Deterministic per seed, but draws in a different order than
+        `generate`, so the two produce different values.
+        """
+        
+        self._clamped = 0
+        self._stream_bytes = 0
+        self.last_truncation = None
+        
+        buffer: List[str] = []
+        size = 0
+        for part in self._stream_node(
+            open_api_spec=open_api_spec,
+            schema=schema,
+            depth=0,
+            plans=self._plans_for(open_api_spec),
+        ):
+            buffer.append(part)
+            size += len(part)
+            self._stream_bytes += len(part)
+            if size >= chunk_bytes:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+        
+        if buffer:
+            yield "".join(buffer)
+        
+        self.last_truncation = self._truncation(self.last_truncation)
+    
+    def _stream_node(
+            self,
+            open_api_spec: OpenAPINormalized,
+            schema: Any,
+            depth: int,
+            plans: Dict[Tuple[int, int], Tuple[JSON, Plan]],
+    ) -> Iterator[str]:
+        
+        node = resolve_schema(
+            open_api_spec=open_api_spec, 
+            schema=schema,
+            ) if isinstance(schema, dict) else schema
+        
+        structural = isinstance(node, dict) \
+            and depth <= MAX_DEPTH \
+                and not any(k in node for k in ("example", "default", "enum"))
+        t = node.get("type") if structural else None
+        if isinstance(t, list):
+            t = next((x for x in t if x != "null"), None)
+        
+        if structural and (t == "object" or (not t and "properties" in node)):
+            yield "{"
+            first = True
+            for name, sub_schema in (node.get("properties") or {}).items():
+                yield ("" if first else ",") + json.dumps(name, ensure_ascii=False) + ":"
+                first = False
+                yield from self._stream_node(
+                    open_api_spec=open_api_spec,
+                    schema=sub_schema,
+                    depth=depth + 1,
+                    plans=plans,
+                )
+            
+            properties = node.get("properties") or {}
+            for name in sorted(set(node.get("required") or [])):
+                if name not in properties:
+                    yield ("" if first else ",") + json.dumps(name, ensure_ascii=False) + ":" \
+                        + json.dumps(self.generate_sensible_default())
+                    first = False
+            yield "}"
+            return
+        
+        if structural and t == "array":
+            min_items = int(node.get("minItems", 1))
+            max_items = int(node.get("maxItems", max(1, min_items + 2)))
+            length = self._draw_ints(min_items, min(max_items, min_items + 2), 1)[0]
+            
+            limit = self.budget.max_response_bytes
+            yield "["
+            for i in range(length):
+                if limit is not None and i >= min_items and self._stream_bytes >= limit:
+                    # Over budget: stop at minItems, counting the cut.
+                    stats = self.last_truncation or {}
+                    stats["arrays_trimmed"] = stats.get("arrays_trimmed", 0) + 1
+                    stats["items_dropped"] = stats.get("items_dropped", 0) + length - i
+                    self.last_truncation = stats
+                    break
+                if i:
+                    yield ","
+                yield from self._stream_node(
+                    open_api_spec=open_api_spec,
+                    schema=node.get("items", {"type": "string"}),
+                    depth=depth + 1,
+                    plans=plans,
+                )
+            yield "]"
+            return
+        
+        limit = self.budget.max_response_bytes
+        if limit is not None and self._stream_bytes >= limit \
+                and t == "string" and is_free_text(node):
+            # Over budget: shortest valid string, counting the cut.
+            min_len = int(node.get("minLength", 1))
+            if int(node.get("maxLength", max(8, min_len))) > min_len:
+                stats = self.last_truncation or {}
+                stats["strings_trimmed"] = stats.get("strings_trimmed", 0) + 1
+                self.last_truncation = stats
+            yield json.dumps(self._draw_text(min_len, min_len, 1)[0], ensure_ascii=False)
+            return
+        
+        value = self._compile(
+            open_api_spec=open_api_spec,
+            schema=schema,
+            depth=depth,
+            plans=plans,
+        )(1)[0]
+        yield json.dumps(value, ensure_ascii=False, default=str)
+    
+    def compile(
+            self,
+            open_api_spec: OpenAPINormalized,
+            schema: JSON,
+            depth: int = 0,
+    ) -> Plan:
+        """
+        Turn `schema` into a reusable generation plan (a tree of closures).
+
+        Plans are cached per (spec, schema) identity, so schemas must not be
+        mutated once they have been generated from. Each node draws the values
+        for a whole batch at once, column by column.
+        """
+        
+        return self._compile(
+            open_api_spec=open_api_spec,
+            schema=schema,
+            depth=depth,
+            plans=self._plans_for(open_api_spec),
+        )
+    
+    def _plans_for(
+            self,
+            open_api_spec: OpenAPINormalized,
+    ) -> Dict[Tuple[int, int], Tuple[JSON, Plan]]:
+        
+        spec_key = id(open_api_spec)
+        entry = self._plans.get(spec_key)
+        if entry is None or entry[0] is not open_api_spec:
+            if len(self._plans) >= MAX_CACHED_SPECS:
+                self._plans.pop(next(iter(self._plans)))
+            entry = (open_api_spec, {})
+            self._plans[spec_key] = entry
+        
+        return entry[1]
+    
+    def _compile(
+            self,
+            open_api_spec: OpenAPINormalized,
+            schema: Any,
+            depth: int,
+            plans: Dict[Tuple[int, int], Tuple[JSON, Plan]],
+    ) -> Plan:
+        
+        key = (id(schema), depth)
+        cached = plans.get(key)
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+        
+        plan = self._compile_node(
+            open_api_spec=open_api_spec,
+            schema=schema,
+            depth=depth,
+            plans=plans,
+        )
+        # Keep a reference to the schema so its id() cannot be recycled.
+        plans[key] = (schema, plan)
+        
+        return plan
+    
+    def _compile_node(
+            self,
+            open_api_spec: OpenAPINormalized,
+            schema: Any,
+            depth: int,
+            plans: Dict[Tuple[int, int], Tuple[JSON, Plan]],
+    ) -> Plan:
         if not isinstance(schema, dict):
-            return None
-        if depth > 6:
-            return None
+            return lambda n: [None] * n
+        if depth > MAX_DEPTH:
+            return lambda n: [None] * n
         
         if "example" in schema:
-            return schema["example"]
+            example = schema["example"]
+            return lambda n: [example] * n
         if "default" in schema:
-            return schema["default"]
+            default = schema["default"]
+            return lambda n: [default] * n
         if "enum" in schema \
             and isinstance(schema["enum"], list) \
                 and schema["enum"]:
-            return self.rng.choice(schema["enum"])
+            enum = schema["enum"]
+            return lambda n: self.rng.choices(enum, k=n)
         
         if "$ref" in schema:
             schema = resolve_schema(
@@ -63,6 +510,17 @@ class DataGenerator:
                 schema=schema
                 )
         
+        def child(sub_schema: Any) -> Plan:
+            return self._compile(
+                open_api_spec=open_api_spec,
+                schema=resolve_schema(
+                    open_api_spec=open_api_spec,
+                    schema=sub_schema,
+                ),
+                depth=depth+1,
+                plans=plans,
+            )
+        
         t = schema.get("type")
         if isinstance(t, list):
             t = next(
@@ -70,87 +528,91 @@ class DataGenerator:
                 "null"
                 )
             if t == "null":
-                return None
+                return lambda n: [None] * n
 
-        if not t and "oneOf" in schema:
-            choice = self.rng.choice(
-                schema["oneOf"]
-            )
-            return self.generate(
-                open_api_spec=open_api_spec,
-                schema=resolve_schema(
-                    open_api_spec,
-                    choice,
-                ),
-                depth=depth+1
-            )
-        
-        if not t and "anyOf" in schema:
-            choice = self.rng.choice(
-                schema["anyOf"]
-            )
-            return self.generate(
-                open_api_spec=open_api_spec,
-                schema=resolve_schema(
-                    open_api_spec,
-                    choice,
-                ),
-                depth=depth+1
-            )
+        if not t and ("oneOf" in schema or "anyOf" in schema):
+            branches = [
+                child(choice) 
+                for choice in schema.get("oneOf", schema.get("anyOf"))
+                ]
+
+            def one_of(n: int) -> List[Any]:
+                picks = self._draw_ints(0, len(branches) - 1, n)
+                
+                # Generate each branch once for all the rows that picked it.
+                rows: Dict[int, List[int]] = {}
+                for row, pick in enumerate(picks):
+                    rows.setdefault(pick, []).append(row)
+                
+                out: List[Any] = [None] * n
+                for pick, positions in rows.items():
+                    for row, value in zip(
+                        positions, 
+                        branches[pick](len(positions))
+                        ):
+                        out[row] = value
+                
+                return out
+            
+            return one_of
         
         if not t and "allOf" in schema:
-            accumulator: JSON = {}
-            for part in schema["allOf"]:
-                resolved = resolve_schema(
-                    open_api_spec=open_api_spec,
-                    schema=part,
-                )
-                example = self.generate(
-                    open_api_spec=open_api_spec,
-                    schema=resolved,
-                    depth=depth+1
-                )
-                if isinstance(example, dict):
-                    accumulator.update(example)
+            parts = [
+                child(part) for part in schema["allOf"]
+                ]
+
+            def all_of(n: int) -> List[JSON]:
+                columns = [part(n) for part in parts]
 
-            return accumulator
+                out: List[JSON] = []
+                for row in range(n):
+                    accumulator: JSON = {}
+                    for column in columns:
+                        example = column[row]
+                        if isinstance(example, dict):
+                            accumulator.update(example)
+                    out.append(accumulator)
+                
+                return out
+            
+            return all_of
         
         if t == "object" or ("properties" in schema):
-            properties = schema.get(
-                "properties", 
-                {}
-                )
-            required = set(
-                schema.get(
-                    "required", 
-                    []
-                    )
-                )
-            output: JSON = {}
-            for name, sub_property in properties.items():
-                resolved = resolve_schema(
-                    open_api_spec=open_api_spec, 
-                    schema=sub_property
-                    )
-                output[name] = self.generate(
-                    open_api_spec=open_api_spec, 
-                    schema=resolved, 
-                    depth=depth+1
-                    )
-                
+            properties = [
+                (name, child(sub_property))
+                for name, sub_property in schema.get(
+                    "properties", 
+                    {}
+                    ).items()
+            ]
             # Ensure required keys present even if properties missing
-            for name in required:
-                output.setdefault(
-                    name, 
-                    self.generate_sensible_default()
-                    )
+            missing_required = [
+                name for name in set(
+                    schema.get(
+                        "required", 
+                        []
+                        )
+                    ) 
+                if name not in schema.get("properties", {})
+            ]
+
+            def obj(n: int) -> List[JSON]:
+                out: List[JSON] = [{} for _ in range(n)]
+                for name, plan in properties:
+                    for output, value in zip(out, plan(n)):
+                        output[name] = value
+                
+                for output in out:
+                    for name in missing_required:
+                        output[name] = self.generate_sensible_default()
+                
+                return out
             
-            return output
+            return obj
         
         if t == "array":
-            items = resolve_schema(
-                open_api_spec=open_api_spec, 
-                schema=schema.get(
+            items = child(
+                schema.get(
                     "items", 
                     {
                         "type": "string"
@@ -164,18 +626,23 @@ class DataGenerator:
                 max(1, min_items + 2)
                 )
                 )
-            length = self.rng.randint(
-                min_items, 
-                min(max_items, min_items + 2)
-                )
+            max_length = min(max_items, min_items + 2)
+
+            def array(n: int) -> List[List[Any]]:
+                lengths = self._draw_ints(min_items, max_length, n)
+                
+                # One batch of items for every array in this batch.
+                values = items(sum(lengths))
+
+                out: List[List[Any]] = []
+                offset = 0
+                for length in lengths:
+                    out.append(values[offset:offset + length])
+                    offset += length
+                
+                return out
             
-            return [
-                self.generate(
-                open_api_spec=open_api_spec, 
-                schema=items, 
-                depth=depth + 1
-                ) for _ in range(length)
-                ]
+            return array
 
         if t == "string" or (
             t is None and "properties" not in schema \
@@ -187,30 +654,39 @@ class DataGenerator:
 
             pattern = schema.get("pattern")
             if pattern:
-                return f"match:{pattern}"
+                value = f"match:{pattern}"
+                return lambda n: [value] * n
             if fmt:
-                return self._string(fmt)
+                return lambda n: [self._string(fmt) for _ in range(n)]
             
-            n = self.rng.randint(min_len, max_len)
-
-            alphabet = "abcdefghijklmnopqrstuvwxyz"
-
-            return "".join(self.rng.choice(alphabet) for _ in range(n))
+            cap = self.budget.max_field_bytes
+            if cap is not None and max_len > max(cap, min_len):
+                clamped_len = max(cap, min_len)
+                
+                def clamped(n: int) -> List[str]:
+                    # Lengths as without the cap; only the cut ones count.
+                    lengths = self._draw_ints(min_len, max_len, n)
+                    self._clamped += sum(length > clamped_len for length in lengths)
+                    return self._text([min(length, clamped_len) for length in lengths])
+                
+                return clamped
+            
+            return lambda n: self._draw_text(min_len, max_len, n)
 
         if t == "integer":
             low = int(schema.get("minimum", 0))
             high = int(schema.get("maximum", max(low, 1000)))
-            return int(self.rng.randint(low, high))
+            return lambda n: self._draw_ints(low, high, n)
 
         if t == "number":
             low = float(schema.get("minimum", 0.0))
             high = float(schema.get("maximum", max(low, 1000.0)))
-            return float(self.rng.uniform(low, high))
+            return lambda n: self._draw_floats(low, high, n)
 
         if t == "boolean":
-            return bool(self.rng.getrandbits(1))
+            return self._draw_bools
         
-        return self.generate_sensible_default()
+        return lambda n: [self.generate_sensible_default() for _ in range(n)]
     
     def generate_sensible_default(
             self,
@@ -224,4 +700,4 @@ class DataGenerator:
         
         return int(
             self.rng.randint(1, 10_000)
-            )
\ No newline at end of file
+            )
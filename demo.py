@@ -18,132 +18,27 @@ rich_traceback(show_locals=False)
 console = Console()
 
 from utils import safe_mkdir
-from type import Policy, Operation, OpenAPINormalized
+from type import Policy, OpenAPINormalized, SignatureSpec, ResponseBudget
 from fixtures import FixtureStore
-from recorder import Recorder
+from sqlite_fixtures import SQLiteFixtureStore
+from fixture_pack import PackedFixtureStore
+from recorder import Recorder, SessionLogRecorder
 from api_ops_router import APIOperationsRouter
 from data_generator import DataGenerator
 from fixture_generator import FixtureGenerator
 from sandbox import Sandbox
 from adapter import Adapter
+from replay import ReplayIndex
+from collection_store import CollectionStore
+from clock import CLOCKS, make_clock
+from spec_loader import load_spec
+from openapi_ops import register_ops_from_openapi, SchemaOnlyDGShim
 
 
-def read_spec_file(path: str | Path) -> Dict[str, Any]:
-    p = Path(path)
-    if not p.exists():
-        raise FileNotFoundError(f"Spec not found: {p}")
-
-    raw = p.read_text(encoding="utf-8").strip()
-    if not raw:
-        raise ValueError(f"Spec file is empty: {p}")
-
-    # Try JSON first, then YAML
-    try:
-        return json.loads(raw)
-    except json.JSONDecodeError:
-        pass
-
-    try:
-        import yaml  # type: ignore
-    except Exception as e:
-        raise RuntimeError(
-            "Spec is not valid JSON, and PyYAML is not installed. "
-            "Install with `pip install pyyaml` or provide JSON."
-        ) from e
-
-    try:
-        return yaml.safe_load(raw) or {}
-    except Exception as e:
-        raise RuntimeError(f"Failed to parse YAML spec: {p}") from e
-
-
-def _extract_result_schema(op: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    responses = op.get("responses") or {}
-    # Pick the lowest 2xx code, else 200 semantics
-    two_xx = []
-    for k in responses.keys():
-        if isinstance(k, int) and 200 <= k < 300:
-            two_xx.append(k)
-        elif isinstance(k, str) and k.isdigit():
-            ki = int(k)
-            if 200 <= ki < 300:
-                two_xx.append(ki)
-    target = str(min(two_xx)) if two_xx else "200"
-
-    content = (responses.get(target) or {}).get("content") or {}
-    if "application/json" in content:
-        return (content["application/json"] or {}).get("schema")
-
-    for mt, body in content.items():
-        if isinstance(mt, str) and mt.endswith("+json"):
-            sch = (body or {}).get("schema")
-            if sch:
-                return sch
-    for mt, body in content.items():
-        if isinstance(mt, str) and "json" in mt:
-            sch = (body or {}).get("schema")
-            if sch:
-                return sch
-    return None
-
-
-def _build_param_schema(op: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Coalesce path/query/header params + JSON body into a single input schema
-    for demo purposes. This keeps MCP-ish shape: a single object args.
-    """
-    props: Dict[str, Any] = {}
-    required: List[str] = []
-
-    # parameters[]
-    for param in op.get("parameters", []) or []:
-        name = param.get("name") or "param"
-        schema = (param.get("schema") or {"type": "string"})
-        props[name] = schema
-        if param.get("required"):
-            required.append(name)
-
-    # requestBody (JSON only, demo)
-    rb = op.get("requestBody") or {}
-    rb_content = rb.get("content") or {}
-    rb_json = (rb_content.get("application/json") or {}).get("schema")
-    if rb_json:
-        props["body"] = rb_json
-        if rb.get("required", False):
-            required.append("body")
-
-    out: Dict[str, Any] = {"type": "object", "properties": props}
-    if required:
-        out["required"] = sorted(set(required))
-    return out
-
-
-def register_ops_from_openapi(
-    openapi: OpenAPINormalized, router: APIOperationsRouter
-) -> None:
-    paths = openapi.paths or {}
-    for path, methods in paths.items():
-        if not isinstance(methods, dict):
-            continue
-        for method, op in methods.items():
-            m = str(method).upper()
-            if m not in {"GET", "POST", "PUT", "PATCH", "DELETE"}:
-                continue
-
-            name = f"{m} {path}"
-            desc = op.get("description") or op.get("summary") or ""
-            param_schema = _build_param_schema(op)
-            result_schema = _extract_result_schema(op) or {"type": "object"}
-
-            router.register_op(
-                Operation(
-                    name=name,
-                    param_schema=param_schema,
-                    result_schema=result_schema,
-                    description=desc,
-                    version=str(op.get("x-version", "v1")),
-                )
-            )
+def read_spec_file(
+    path: str | Path, cache_dir: Optional[str | Path] = ".spec_cache"
+) -> Dict[str, Any]:
+    return load_spec(path, cache_dir=cache_dir)
 
 
 def pick_demo_ops(all_ops: List[str], limit: int = 2) -> List[str]:
@@ -167,16 +62,6 @@ def synth_args_for_path(op_name: str) -> Dict[str, Any]:
     return args
 
 
-class SchemaOnlyDGShim:
-
-    def __init__(self, inner: DataGenerator, openapi: OpenAPINormalized) -> None:
-        self._inner = inner
-        self._openapi = openapi
-
-    def generate(self, schema: Dict[str, Any]) -> Any:
-        return self._inner.generate(self._openapi, schema)
-
-
 def main():
     parser = argparse.ArgumentParser(
         description="Agent Sandbox demo (rich logs, full stack)."
@@ -187,6 +72,12 @@ def main():
         default="examples/simple_openapi.yaml",
         help="Path to OpenAPI spec (JSON or YAML).",
     )
+    parser.add_argument(
+        "--spec-cache",
+        type=str,
+        default=".spec_cache",
+        help="Directory for parsed-spec cache entries ('' disables the cache).",
+    )
     parser.add_argument(
         "--service-name",
         type=str,
@@ -199,11 +90,28 @@ def main():
         default="recordings",
         help="Where to write call transcripts.",
     )
+    parser.add_argument(
+        "--session-log",
+        action="store_true",
+        help="Append every call to a JSONL session log instead of one file per signature.",
+    )
     parser.add_argument(
         "--fixtures-dir",
         type=str,
         default=None,
-        help="(Optional) root directory for fixture store if your FixtureStore supports it.",
+        help="(Optional) root directory for the file-system fixture store.",
+    )
+    parser.add_argument(
+        "--fixtures-db",
+        type=str,
+        default=None,
+        help="(Optional) SQLite file to keep fixtures in instead of a directory tree.",
+    )
+    parser.add_argument(
+        "--fixtures-pack",
+        type=str,
+        default=None,
+        help="(Optional) read-only fixture pack built by fixture_pack.py.",
     )
     parser.add_argument(
         "--seed", type=int, default=42, help="Seed for data/chaos determinism."
@@ -214,12 +122,89 @@ def main():
         default=0.0,
         help="Injected failure rate (0.0 to 1.0) via FaultProfile.error_rate.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to generate the FixtureBundle.",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        help="(Optional) fixture manifest; only operations whose schemas changed are regenerated.",
+    )
+    parser.add_argument(
+        "--fault-profile",
+        type=str,
+        default=None,
+        help="(Optional) FixtureBundle profile (e.g. happy-path, chaos-10) to fit lognormal latency from.",
+    )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        default=None,
+        help="(Optional) recordings directory or JSONL session log to answer calls from.",
+    )
+    parser.add_argument(
+        "--clock",
+        type=str,
+        choices=sorted(CLOCKS),
+        default="real",
+        help="How simulated latency is spent: real sleeps, a virtual counter, or scaled sleeps.",
+    )
+    parser.add_argument(
+        "--collections",
+        action="store_true",
+        help="Serve CRUD-shaped operations from stateful collections seeded by the bundle.",
+    )
+    parser.add_argument(
+        "--stream-fixtures",
+        action="store_true",
+        help="Pre-write every operation's success fixture by streaming it straight to the store.",
+    )
+    parser.add_argument(
+        "--collection-size",
+        type=int,
+        default=None,
+        help="Describe collections lazily with this many items, generated page by page.",
+    )
+    parser.add_argument(
+        "--max-response-bytes",
+        type=int,
+        default=None,
+        help="Byte budget per generated response (strings, then arrays, are trimmed).",
+    )
+    parser.add_argument(
+        "--max-field-bytes",
+        type=int,
+        default=None,
+        help="Byte cap per free-text string field (never below minLength).",
+    )
+    parser.add_argument(
+        "--rate-limit-per-min",
+        type=int,
+        default=None,
+        help="Per-tool token-bucket rate limit; throttled calls get a 429 with retry_after.",
+    )
+    parser.add_argument(
+        "--ignore-args",
+        type=str,
+        default="",
+        help="Comma-separated arg paths (e.g. 'request_id,body.*.trace_id') left out of fixture signatures.",
+    )
+    parser.add_argument(
+        "--clock-speedup",
+        type=float,
+        default=100.0,
+        help="Speed-up factor for --clock=scaled.",
+    )
     args = parser.parse_args()
 
     console.print(Panel.fit("[b]Agent Sandbox Demo[/b]"))
 
     console.print(Rule("[cyan]1) Load OpenAPI Spec[/cyan]"))
-    spec = read_spec_file(args.spec)
+    spec = read_spec_file(args.spec, cache_dir=args.spec_cache or None)
     openapi = OpenAPINormalized.from_dict(spec)
     console.print(
         Panel.fit(
@@ -231,7 +216,11 @@ def main():
     )
 
     console.print(Rule("[cyan]2) Register Operations[/cyan]"))
-    router = APIOperationsRouter()
+    ignored = [p for p in args.ignore_args.split(",") if p]
+    router = APIOperationsRouter(
+        open_api_spec=openapi,
+        default_signature=SignatureSpec(ignore=ignored) if ignored else None,
+    )
     register_ops_from_openapi(openapi, router)
 
     tools = router.list_ops()
@@ -243,8 +232,14 @@ def main():
     console.print(tbl)
 
     console.print(Rule("[cyan]3) Policy + Recorder[/cyan]"))
-    policy = Policy(allowed_tools=tools)  # allow everything we registered
-    recorder = Recorder(output_dir=args.recordings_dir)  # Sandbox will call it
+    policy = Policy(
+        allowed_tools=tools,  # allow everything we registered
+        rate_limit_per_min=args.rate_limit_per_min,
+    )
+    if args.session_log:
+        recorder = SessionLogRecorder(output_dir=args.recordings_dir)
+    else:
+        recorder = Recorder(output_dir=args.recordings_dir)  # Sandbox will call it
     console.print(
         Panel.fit(
             f"Allowed tools: {len(tools)}\nRecordings dir: {Path(args.recordings_dir).resolve()}",
@@ -253,9 +248,15 @@ def main():
     )
 
     console.print(Rule("[cyan]4) Data • Fixtures • Chaos[/cyan]"))
-    dg = DataGenerator(seed=args.seed)
-    fg = FixtureGenerator(dg)
-    bundle = fg.generate(spec=spec, service_name=args.service_name)
+    dg = DataGenerator(
+        seed=args.seed,
+        budget=ResponseBudget(
+            max_response_bytes=args.max_response_bytes,
+            max_field_bytes=args.max_field_bytes,
+        ),
+    )
+    fg = FixtureGenerator(dg, workers=args.workers, collection_size=args.collection_size)
+    bundle = fg.generate(spec=spec, service_name=args.service_name, manifest_path=args.manifest)
     console.print(Panel.fit("Generated a FixtureBundle (summary below).", title="FixtureGenerator"))
     console.print(
         f"[dim]services[/dim]: {list(bundle.services.keys())} • "
@@ -265,10 +266,22 @@ def main():
 
     dg_shim = SchemaOnlyDGShim(dg, openapi)
 
-    fixtures = FixtureStore()
+    if args.fixtures_pack:
+        fixtures = PackedFixtureStore(args.fixtures_pack)
+    elif args.fixtures_db:
+        fixtures = SQLiteFixtureStore(args.fixtures_db)
+    else:
+        fixtures = FixtureStore(args.fixtures_dir or "fixtures")
+
+    if args.stream_fixtures and not fixtures.read_only:
+        written = fg.stream_to_store(spec, fixtures, signature=router.signature)
+        console.print(f"[dim]streamed fixtures[/dim]: {written}")
 
     from type import FaultProfile
-    fault = FaultProfile(seed=args.seed, min_latency_ms=30, max_latency_ms=180, error_rate=args.chaos)
+    if args.fault_profile:
+        fault = FaultProfile.from_profile(bundle.profiles[args.fault_profile], seed=args.seed)
+    else:
+        fault = FaultProfile(seed=args.seed, min_latency_ms=30, max_latency_ms=180, error_rate=args.chaos)
 
     sandbox = Sandbox(
         policy=policy,
@@ -277,6 +290,11 @@ def main():
         fixtures=fixtures,
         api_ops_router=router,
         data_generator=dg_shim,
+        clock=make_clock(args.clock, speedup=args.clock_speedup),
+        replay=ReplayIndex(args.replay) if args.replay else None,
+        collections=CollectionStore.from_bundle(
+            bundle, args.service_name, data_generator=dg, open_api_spec=openapi
+        ) if args.collections else None,
     )
 
     # ---------- MCP Adapter view ----------
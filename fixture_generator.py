@@ -1,4 +1,8 @@
-from typing import Optional, Tuple, List, Any
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Tuple, List, Any, Union, Dict, Callable
+import dataclasses as dc
+import json
 from datetime import (
     datetime,
     timezone,
@@ -6,13 +10,20 @@ from datetime import (
 
 from utils import (
     resolve_schema,
+    ref_closure,
+    safe_mkdir,
+    stable_hash,
 )
 from type import (
     JSON,
+    Fixture,
     FixtureBundle,
+    FixtureMetaData,
     OpenAPINormalized,
+    ResponseBudget,
 )
 from data_generator import DataGenerator
+from fixtures import BaseFixtureStore
 
 # Common auth/error packs any enterprise API tends to exhibit.
 DEFAULT_ERROR_TEMPLATES = {
@@ -25,29 +36,91 @@ DEFAULT_ERROR_TEMPLATES = {
             500: {"message": "Internal Server Error", "error": "server_error"},
         }
 
+MANIFEST_VERSION = 2 # 2: collection hints carry the item schema
+
+# Per-process state for pool workers: (parent generator, normalized spec).
+_WORKER_STATE: Optional[Tuple["FixtureGenerator", OpenAPINormalized]] = None
+
+def _init_worker(
+        seed: int,
+        backend: str,
+        now: datetime,
+        spec: JSON,
+        budget: Optional[ResponseBudget] = None,
+) -> None:
+    
+    global _WORKER_STATE
+
+    generator = FixtureGenerator(
+        DataGenerator(seed=seed, backend=backend, budget=budget)
+    )
+    generator.now = now
+
+    _WORKER_STATE = (
+        generator,
+        OpenAPINormalized.from_dict(spec),
+    )
+
+def _build_in_worker(
+        task: Tuple[str, str],
+) -> Tuple[str, JSON, Optional[JSON]]:
+    
+    generator, open_api_spec = _WORKER_STATE
+    path, method = task
+
+    return generator._build_operation(
+        open_api_spec,
+        path,
+        method,
+    )
+
 class FixtureGenerator:
     """
     Generate seeded, spec-true fixtures from an OpenAPI dict.
+
+    Each operation draws from its own generator seeded from (bundle seed,
+    operation key), so operations are independent of each other and can be
+    built by `workers` processes; the bundle is identical for any worker count.
+
+    With a `manifest_path`, each operation's fixtures are stored alongside a
+    fingerprint of its schema closure, and later runs only rebuild operations
+    whose fingerprint changed.
     """
 
     # TODO: Add Postman/HAR ingestion to complement OpenAPI.
     # TODO: Learn behaviors from real traces to augment synthetic examples.
     # TODO: Emit per-operation latency distributions derived from SLAs.
 
-    def __init__(self, data_generator: DataGenerator) -> None:
+    def __init__(
+            self, 
+            data_generator: DataGenerator,
+            workers: int = 1,
+            collection_size: Optional[int] = None,
+            ) -> None:
         self.now = datetime.now(timezone.utc)
 
         self.default_error_templates = DEFAULT_ERROR_TEMPLATES
 
         self.data_generator = data_generator
+        self.workers = workers
+
+        # When set, collections are described lazily with this many items
+        # instead of being built (see `_synthesize_collections`).
+        self.collection_size = collection_size
+
+        # Operation keys (re)built by the last `generate` call.
+        self.rebuilt_operations: List[str] = []
     
     def generate(
             self,
             spec: JSON,
             service_name: str = "default",
+            manifest_path: Optional[Union[str, Path]] = None,
             ) -> FixtureBundle:
         
         open_api_spec = OpenAPINormalized.from_dict(spec)
+        manifest = self._load_manifest(manifest_path) \
+            if manifest_path else None
         services: JSON = {
             service_name: {
                 "operations": {},
@@ -57,9 +130,18 @@ class FixtureGenerator:
         }
 
         op_fixtures, collection_hints = self._build_operation_fixtures(
-            open_api_spec
+            open_api_spec,
+            manifest,
         )
-        collections = self._synthesize_collections(
+        if manifest_path:
+            self._save_manifest(
+                manifest_path, 
+                manifest
+                )
+        collections = FixtureGenerator(
+            self.data_generator.derive("collections"),
+            collection_size=self.collection_size,
+        )._synthesize_collections(
             collection_hints
         )
 
@@ -96,70 +178,330 @@ class FixtureGenerator:
     
     def _build_operation_fixtures(
             self,
-            open_api_spec: OpenAPINormalized
+            open_api_spec: OpenAPINormalized,
+            manifest: Optional[JSON] = None,
     ) -> Tuple[JSON, List[JSON]]:
         
+        tasks: List[Tuple[str, str]] = [
+            (path, method) 
+            for _, path, method, _ in open_api_spec.operations
+        ]
+        
+        results: Dict[str, Tuple[str, JSON, Optional[JSON]]] = {}
+        fingerprints: Dict[str, str] = {}
+        if manifest is not None:
+            previous = manifest["operations"]
+            for path, method in tasks:
+                key = f"{method.upper()} {path}"
+                fingerprints[key] = self.operation_fingerprint(
+                    open_api_spec,
+                    path,
+                    method,
+                )
+
+                entry = previous.get(key)
+                if entry and entry["fingerprint"] == fingerprints[key]:
+                    results[key] = (
+                        key,
+                        entry["fixtures"],
+                        entry["collection_hint"],
+                    )
+        
+        pending = [
+            (path, method) for path, method in tasks 
+            if f"{method.upper()} {path}" not in results
+        ]
+        if self.workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(
+                    self.data_generator.seed,
+                    self.data_generator.backend,
+                    self.now,
+                    open_api_spec.raw,
+                    self.data_generator.budget,
+                ),
+            ) as pool:
+                built = list(
+                    pool.map(
+                        _build_in_worker,
+                        pending,
+                        chunksize=max(1, len(pending) // (self.workers * 4)),
+                    )
+                )
+        else:
+            built = [
+                self._build_operation(
+                    open_api_spec,
+                    path,
+                    method,
+                ) for path, method in pending
+            ]
+        
+        self.rebuilt_operations = [result[0] for result in built]
+        for result in built:
+            results[result[0]] = result
+        
+        # Merge in spec order, whichever worker built each operation.
         ops: JSON = {}
         collection_hints: List[JSON] = []
+        for path, method in tasks:
+            key, fixtures, hint = results[f"{method.upper()} {path}"]
+            ops[key] = fixtures
+            if hint:
+                collection_hints.append(hint)
+        
+        if manifest is not None:
+            manifest["operations"] = {
+                key: {
+                    "fingerprint": fingerprints[key],
+                    "fixtures": results[key][1],
+                    "collection_hint": results[key][2],
+                } for key in ops
+            }
+                
+        return (
+            ops,
+            collection_hints,
+        )
+    
+    def operation_fingerprint(
+            self,
+            open_api_spec: OpenAPINormalized,
+            path: str,
+            method: str,
+    ) -> str:
+        """
+        Hash of everything an operation's fixtures depend on: the operation
+        itself, every component it references (transitively), the seed and
+        whether the spec declares security schemes, plus the data backend and
+        response budget when they differ from the defaults (so manifests
+        written with the defaults stay valid).
+        """
+        
+        op = open_api_spec.paths[path][method]
+        budget = self.data_generator.budget
+        extra = [dc.asdict(budget)] if budget != ResponseBudget() else []
+        if self.data_generator.backend != "python":
+            extra.append(self.data_generator.backend)
+
+        return stable_hash(
+            MANIFEST_VERSION,
+            self.data_generator.seed,
+            f"{method.upper()} {path}",
+            op,
+            sorted(
+                ref_closure(
+                    open_api_spec.raw, 
+                    op,
+                    targets=open_api_spec.refs,
+                    ).items()
+            ),
+            self._infer_auth_required(open_api_spec),
+            *extra,
+        )
+    
+    def _load_manifest(
+            self,
+            manifest_path: Union[str, Path],
+    ) -> JSON:
+        
+        path = Path(manifest_path)
+        empty = {
+            "version": MANIFEST_VERSION,
+            "operations": {},
+        }
+        if not path.exists():
+            return empty
+        
+        with path.open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        
+        if manifest.get("version") != MANIFEST_VERSION:
+            return empty
+        
+        # JSON object keys are strings; error fixtures are keyed by int status.
+        for entry in manifest["operations"].values():
+            errors = entry["fixtures"]["errors"]
+            entry["fixtures"]["errors"] = {
+                int(code): body for code, body in errors.items()
+            }
+        
+        return manifest
+    
+    def _save_manifest(
+            self,
+            manifest_path: Union[str, Path],
+            manifest: JSON,
+    ) -> Path:
+        
+        path = Path(manifest_path)
+        safe_mkdir(path.parent)
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(
+                manifest,
+                f,
+                ensure_ascii=False,
+            )
+        tmp_path.replace(path)
 
-        for path, methods in open_api_spec.paths.items():
-            if not isinstance(methods, dict):
+        return path
+    
+    def prepopulate_store(
+            self,
+            bundle: FixtureBundle,
+            store: BaseFixtureStore,
+            service_name: str = "default",
+            operations: Optional[List[str]] = None,
+            signature: Callable[[str, Dict[str, Any]], str] = stable_hash,
+    ) -> int:
+        """
+        Save each operation's success fixture under its no-argument signature.
+        Pass `operations=self.rebuilt_operations` to only refresh what changed,
+        and `signature=router.signature` when ops carry a SignatureSpec.
+        """
+        
+        op_fixtures = bundle.services[service_name]["operations"]
+        keys = op_fixtures.keys() if operations is None else operations
+
+        return store.save_many(
+            (
+                key,
+                signature(key, {}),
+                Fixture(
+                    ok=True,
+                    data=op_fixtures[key]["success"]["body"],
+                    metadata=FixtureMetaData(
+                        created_at=bundle.metadata["generated_at"],
+                        signature=signature(key, {}),
+                        seed=str(bundle.metadata["seed"]),
+                        truncation=op_fixtures[key]["success"].get("truncation"),
+                    ),
+                ),
+            ) for key in keys
+        )
+    
+    def stream_to_store(
+            self,
+            spec: JSON,
+            store: BaseFixtureStore,
+            operations: Optional[List[str]] = None,
+            signature: Callable[[str, Dict[str, Any]], str] = stable_hash,
+    ) -> int:
+        """
+        Write each operation's success fixture straight into `store`, streaming
+        the body from `DataGenerator.stream` into `store.save_stream`, so no
+        response is ever held whole; for specs whose bodies are too large to
+        go through `generate` + `prepopulate_store`. Bodies are seeded per
+        operation like `generate`'s but drawn in stream order, so they differ
+        from the bundle's.
+        """
+        
+        open_api_spec = OpenAPINormalized.from_dict(spec)
+        count = 0
+        for key, path, method, op in open_api_spec.operations:
+            if operations is not None and key not in operations:
                 continue
+            
+            generator = self.data_generator.derive(key)
+            responses = op.get("responses", {})
+            schema = self._extract_json_schema(
+                open_api_spec,
+                responses.get(
+                    str(self._get_success_status(responses=responses)),
+                    {},
+                ),
+            )
+            chunks = generator.stream(open_api_spec, schema) if schema \
+                else iter([json.dumps(generator.generate_sensible_default())])
+
+            store.save_stream(
+                tool_name=key,
+                signature=signature(key, {}),
+                chunks=chunks,
+                metadata=FixtureMetaData(
+                    created_at=self.now.isoformat(),
+                    signature=signature(key, {}),
+                    seed=str(self.data_generator.seed),
+                ),
+            )
+            count += 1
+        
+        return count
+    
+    def _build_operation(
+            self,
+            open_api_spec: OpenAPINormalized,
+            path: str,
+            method: str,
+    ) -> Tuple[str, JSON, Optional[JSON]]:
+        """
+        Fixtures for one operation, drawn from a generator seeded by its key.
+        """
+        
+        op = open_api_spec.paths[path][method]
+        method_upper = method.upper()
+        key = f"{method_upper} {path}"
+        op_id = op.get("operationId") or key # for sparse specs, we synthesize an op ID.
 
-            for method, op in methods.items():
-                method_upper = method.upper()
-                if method_upper not in {
-                    "GET",
-                    "POST",
-                    "PUT", 
-                    "PATCH", 
-                    "DELETE",
-                }:
-                    continue
-                
-                key = f"{method_upper} {path}"
-                op_id = op.get("operationId") or key # for sparse specs, we synthesize an op ID.
-
-                success_response_body, isSuccess = self._synthesize_success(
-                    open_api_spec,
-                    op,
-                )
-                erroneous_response_bodies = self._synthesize_errors(
-                    open_api_spec,
-                    op,
-                )
+        generator = FixtureGenerator(
+            self.data_generator.derive(key)
+        )
+        generator.now = self.now
 
-                ops[key] = {
-                    "operation_id": op_id,
-                    "success": {
-                        "status": isSuccess, 
-                        "body": success_response_body
-                        },
-                    "errors": erroneous_response_bodies,
-                    "pagination": self._infer_pagination_meta(op),
-                    "auth_required": self._infer_auth_required(open_api_spec),
-                }
+        success_response_body, isSuccess = generator._synthesize_success(
+            open_api_spec,
+            op,
+        )
+        truncation = generator.data_generator.last_truncation
+        erroneous_response_bodies = generator._synthesize_errors(
+            open_api_spec,
+            op,
+        )
 
-                if method_upper == "GET" and isinstance(
-                    success_response_body, 
-                    list
-                    ):
-                    seg = path.rstrip("/").split("/")[-1]
-
-                    if seg \
-                        and seg.endswith("s") \
-                        and "{" not in seg:
-                        
-                        collection_hints.append(
-                            {
-                                "collection": seg, 
-                                "sample": success_response_body
-                            }
-                        )
+        fixtures = {
+            "operation_id": op_id,
+            "success": {
+                "status": isSuccess, 
+                "body": success_response_body
+                },
+            "errors": erroneous_response_bodies,
+            "pagination": self._infer_pagination_meta(op, open_api_spec),
+            "auth_required": self._infer_auth_required(open_api_spec),
+        }
+        if truncation:
+            fixtures["success"]["truncation"] = truncation
+
+        hint = None
+        if method_upper == "GET" and isinstance(
+            success_response_body, 
+            list
+            ):
+            seg = path.rstrip("/").split("/")[-1]
+
+            if seg \
+                and seg.endswith("s") \
+                and "{" not in seg:
                 
+                schema = self._extract_json_schema(
+                    open_api_spec,
+                    op.get("responses", {}).get(str(isSuccess), {}),
+                ) or {}
+                hint = {
+                    "collection": seg, 
+                    "sample": success_response_body,
+                    "item_schema": open_api_spec.resolve(
+                        schema.get("items") or {}
+                        ),
+                }
+        
         return (
-            ops,
-            collection_hints,
+            key,
+            fixtures,
+            hint,
         )
             
     def _synthesize_success(
@@ -265,6 +607,11 @@ class FixtureGenerator:
             response_or_params: JSON,
     ) -> Optional[JSON]:
         
+        # Responses may themselves be refs, e.g. #/components/responses/NotFound
+        response_or_params = open_api_spec.resolve(response_or_params)
+        if not isinstance(response_or_params, dict):
+            return None
+        
         content = response_or_params.get("content", {})
         if not content:
             return None
@@ -304,6 +651,20 @@ class FixtureGenerator:
         output: JSON = {}
         for hint in hints:
             name = hint["collection"]
+            if self.collection_size is not None:
+                # Described, not built: items are derived per index on demand
+                # (collection_store.LazyCollection).
+                output[name] = {
+                    "items": [],
+                    "lazy": {
+                        "size": self.collection_size,
+                        "schema": hint.get("item_schema") or {"type": "object"},
+                    },
+                    "cursor": None,
+                    "next_id": self.collection_size + 1,
+                }
+                continue
+
             sample = hint.get("sample") or []
             items = []
             template = sample[0] if sample else {}
@@ -334,11 +695,16 @@ class FixtureGenerator:
     def _infer_pagination_meta(
             self,
             op: JSON,
+            open_api_spec: Optional[OpenAPINormalized] = None,
     ) -> Optional[JSON]:
         params = op.get(
             "parameters",
             []
         )
+        if open_api_spec:
+            params = [
+                open_api_spec.resolve(param) for param in params
+            ]
         names = {
             param.get("name") \
             for param in params \
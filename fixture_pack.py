@@ -0,0 +1,217 @@
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Union, Optional, Tuple, Iterator
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+from fixtures import (
+    BaseFixtureStore,
+    FixtureStore,
+)
+from type import (
+    Fixture,
+)
+
+# File layout (little-endian):
+#   header:   magic(8) | count(u32) | reserved(u32)
+#   index:    count x [ key digest(16) | payload offset(u64) | payload length(u32) | pad(4) ]
+#             sorted by digest, offsets are absolute
+#   payloads: compact JSON {"tool": ..., "signature": ..., "fixture": {...}}
+MAGIC = b"FXPACK01"
+HEADER = struct.Struct("<8sII")
+ENTRY = struct.Struct("<16sQI4x")
+DIGEST_SIZE = 16
+
+def _key_digest(
+        tool_name: str,
+        signature: str,
+) -> bytes:
+    
+    return hashlib.blake2b(
+        f"{tool_name}\0{signature}".encode("utf-8"),
+        digest_size=DIGEST_SIZE,
+    ).digest()
+
+def compile_fixture_pack(
+        source: BaseFixtureStore,
+        output_path: Union[str, Path],
+) -> int:
+    """
+    Pack every fixture of `source` into one immutable file for
+    `PackedFixtureStore`. Payloads are spooled to a temporary file first, so
+    memory use is bounded by the index rather than the fixtures.
+    """
+    
+    output_path = Path(output_path)
+    output_path.parent.mkdir(
+        parents=True,
+        exist_ok=True,
+    )
+
+    entries = []
+    with tempfile.TemporaryFile() as payloads:
+        offset = 0
+        for tool_name, signature, fixture in source.iter_fixtures():
+            payload = json.dumps(
+                {
+                    "tool": tool_name,
+                    "signature": signature,
+                    "fixture": fixture.to_json(),
+                },
+                separators=(",", ":"),
+                ensure_ascii=False,
+                sort_keys=True,
+            ).encode("utf-8")
+            payloads.write(payload)
+
+            entries.append(
+                (_key_digest(tool_name, signature), offset, len(payload))
+            )
+            offset += len(payload)
+        
+        entries.sort()
+        base = HEADER.size + ENTRY.size * len(entries)
+
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        with tmp_path.open("wb") as out:
+            out.write(HEADER.pack(MAGIC, len(entries), 0))
+            for digest, payload_offset, length in entries:
+                out.write(ENTRY.pack(digest, base + payload_offset, length))
+            
+            payloads.seek(0)
+            shutil.copyfileobj(payloads, out)
+        
+        os.replace(tmp_path, output_path)
+    
+    return len(entries)
+
+class PackedFixtureStore(BaseFixtureStore):
+    """
+    Read-only fixture store over a file built by `compile_fixture_pack`.
+
+    The file is memory-mapped and payloads are decoded only when looked up,
+    so forked workers share the page cache instead of each holding their own
+    parsed copy of every fixture.
+    """
+
+    read_only = True
+
+    def __init__(
+            self,
+            path: Union[str, Path] = "fixtures.pack",
+            executor: Optional[Executor] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.executor = executor
+
+        with self.path.open("rb") as f:
+            self._mm = mmap.mmap(
+                f.fileno(),
+                0,
+                access=mmap.ACCESS_READ,
+            )
+        
+        magic, self.count, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"Not a fixture pack: {self.path}")
+    
+    def _digest_at(self, i: int) -> bytes:
+        start = HEADER.size + i * ENTRY.size
+
+        return self._mm[start:start + DIGEST_SIZE]
+    
+    def _payload_at(self, i: int) -> dict:
+        _, offset, length = ENTRY.unpack_from(
+            self._mm, 
+            HEADER.size + i * ENTRY.size
+            )
+        
+        return json.loads(self._mm[offset:offset + length])
+    
+    def load(
+            self,
+            tool_name: str,
+            signature: str
+    ) -> Optional[Fixture]:
+        
+        digest = _key_digest(tool_name, signature)
+
+        # Leftmost binary search over the sorted digests.
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._digest_at(mid) < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        
+        # Digests are 128-bit, but still confirm the key on the payload.
+        while lo < self.count and self._digest_at(lo) == digest:
+            payload = self._payload_at(lo)
+            if payload["tool"] == tool_name and payload["signature"] == signature:
+                return Fixture.load_from_json(
+                    fixture=payload["fixture"]
+                )
+            lo += 1
+        
+        return None
+    
+    def save(
+            self,
+            tool_name: str,
+            signature: str,
+            fixture: Fixture,
+    ) -> Path:
+        raise PermissionError(f"Fixture pack is read-only: {self.path}")
+    
+    def iter_fixtures(self) -> Iterator[Tuple[str, str, Fixture]]:
+        
+        for i in range(self.count):
+            payload = self._payload_at(i)
+            yield (
+                payload["tool"],
+                payload["signature"],
+                Fixture.load_from_json(
+                    fixture=payload["fixture"]
+                ),
+            )
+    
+    def close(self) -> None:
+        self._mm.close()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile a fixture directory into a read-only, memory-mappable pack."
+    )
+    parser.add_argument(
+        "--src",
+        type=str,
+        default="fixtures",
+        help="Root of the directory-layout fixture store.",
+    )
+    parser.add_argument(
+        "--out",
+        type=str,
+        default="fixtures.pack",
+        help="Pack file to write (replaced atomically).",
+    )
+    args = parser.parse_args()
+
+    if not Path(args.src).is_dir():
+        raise FileNotFoundError(f"Fixture directory not found: {args.src}")
+    
+    count = compile_fixture_pack(
+        source=FixtureStore(args.src, cache_max_bytes=0),
+        output_path=args.out,
+    )
+    print(f"Packed {count} fixtures from {args.src} into {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,295 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import Union, Optional
+from typing import Union, Optional, Tuple, Dict, Iterable, Iterator, List, Any
+import dataclasses as dc
 import json
+import threading
+import time
 
 from utils import (
     safe_mkdir,
+    run_blocking,
+    stream_envelope,
+    write_chunks,
 )
 from type import (
     Fixture,
+    FixtureCacheStats,
+    FixtureMetaData,
 )
 
-class FixtureStore:
+@dc.dataclass
+class _CacheEntry:
+    payload: str # the fixture's JSON text; decoded afresh on every hit
+    mtime_ns: int
+    size: int
+    checked_at: float
+
+class FixtureCache:
+    """
+    LRU cache of fixture JSON text, bounded by the on-disk size of the cached files.
+
+    Entries remember the file's mtime/size; `FixtureStore` re-stats an entry once
+    it is older than `revalidate_after_s`, so edited or replaced files are picked
+    up while hot fixtures are served without touching the file system.
+    """
+
+    def __init__(
+            self,
+            max_bytes: int = 64 * 1024 * 1024,
+            revalidate_after_s: float = 1.0,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.revalidate_after_s = revalidate_after_s
+
+        self._entries: "OrderedDict[Tuple[str, str], _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = FixtureCacheStats()
+    
+    def get(
+            self,
+            key: Tuple[str, str],
+    ) -> Optional[_CacheEntry]:
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            
+            return entry
+    
+    def put(
+            self,
+            key: Tuple[str, str],
+            entry: _CacheEntry,
+    ) -> None:
+        
+        with self._lock:
+            self._discard(key)
+            if entry.size > self.max_bytes:
+                return
+            
+            self._entries[key] = entry
+            self._bytes += entry.size
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._stats.evictions += 1
+    
+    def invalidate(
+            self,
+            key: Tuple[str, str],
+    ) -> None:
+        
+        with self._lock:
+            if self._discard(key):
+                self._stats.invalidations += 1
+    
+    def clear(self) -> None:
+        
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def count(
+            self,
+            hit: bool,
+    ) -> None:
+        
+        with self._lock:
+            if hit:
+                self._stats.hits += 1
+            else:
+                self._stats.misses += 1
+    
+    def stats(self) -> FixtureCacheStats:
+        
+        with self._lock:
+            return dc.replace(
+                self._stats,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+    
+    def _discard(
+            self,
+            key: Tuple[str, str],
+    ) -> bool:
+        
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        
+        self._bytes -= entry.size
+
+        return True
+
+FixtureKey = Tuple[str, str] # (tool_name, signature)
+
+def _decode(payload: str) -> Fixture:
+    return Fixture.load_from_json(
+        fixture=json.loads(payload)
+    )
+
+class BaseFixtureStore(ABC):
+    """
+    Interface shared by fixture backends. Subclasses implement `load`, `save`
+    and `iter_fixtures`; the bulk and async variants have generic fallbacks
+    that backends may override with something faster.
+    """
+
+    executor: Optional[Executor] = None
+
+    # Read-only stores are never written to by the sandbox.
+    read_only: bool = False
+
+    @abstractmethod
+    def load(
+            self,
+            tool_name: str,
+            signature: str
+    ) -> Optional[Fixture]:
+        ...
+    
+    @abstractmethod
+    def save(
+            self,
+            tool_name: str,
+            signature: str,
+            fixture: Fixture,
+    ) -> Path:
+        ...
+    
+    @abstractmethod
+    def iter_fixtures(self) -> Iterator[Tuple[str, str, Fixture]]:
+        """
+        Yield every stored (tool_name, signature, fixture).
+        """
+    
+    def save_stream(
+            self,
+            tool_name: str,
+            signature: str,
+            chunks: Iterable[str],
+            ok: bool = True,
+            error: Optional[str] = None,
+            latency_ms: int = 0,
+            metadata: Optional[FixtureMetaData] = None,
+    ) -> Any:
+        """
+        Save a fixture whose `data` arrives as JSON text chunks (see
+        `DataGenerator.stream`). This default joins and parses the chunks;
+        stores that write files stream them straight to disk instead.
+        """
+        
+        return self.save(
+            tool_name=tool_name,
+            signature=signature,
+            fixture=Fixture(
+                ok=ok,
+                data=json.loads("".join(chunks)),
+                error=error,
+                latency_ms=latency_ms,
+                metadata=metadata,
+            ),
+        )
+    
+    def load_many(
+            self,
+            keys: Iterable[FixtureKey],
+    ) -> Dict[FixtureKey, Fixture]:
+        """
+        Load several fixtures at once; missing keys are left out of the result.
+        """
+        
+        out: Dict[FixtureKey, Fixture] = {}
+        for tool_name, signature in keys:
+            fixture = self.load(
+                tool_name=tool_name,
+                signature=signature,
+            )
+            if fixture:
+                out[(tool_name, signature)] = fixture
+        
+        return out
+    
+    def save_many(
+            self,
+            fixtures: Iterable[Tuple[str, str, Fixture]],
+    ) -> int:
+        
+        count = 0
+        for tool_name, signature, fixture in fixtures:
+            self.save(
+                tool_name=tool_name,
+                signature=signature,
+                fixture=fixture,
+            )
+            count += 1
+        
+        return count
+    
+    async def aload(
+            self,
+            tool_name: str,
+            signature: str
+    ) -> Optional[Fixture]:
+        
+        return await run_blocking(
+            self.load,
+            tool_name=tool_name,
+            signature=signature,
+            executor=self.executor,
+        )
+    
+    async def asave(
+            self,
+            tool_name: str,
+            signature: str,
+            fixture: Fixture,
+    ) -> Path:
+        
+        return await run_blocking(
+            self.save,
+            tool_name=tool_name,
+            signature=signature,
+            fixture=fixture,
+            executor=self.executor,
+        )
+
+class FixtureStore(BaseFixtureStore):
     """
     File-system backed fixtures organized as:
         fixtures/{tool_name}/{signature}.json
     
     Plug-and-play: users can drop JSON files in the right folder and the sandbox will
     serve them without writing handlers or having real creds.
+
+    Fixture files are kept in a size-bounded LRU cache (disable with
+    cache_max_bytes=0) and decoded on every load, so each caller gets its own
+    copy and may mutate it freely.
     """
 
     def __init__(
             self, 
-            root: Union[str, Path] = "fixtures"
+            root: Union[str, Path] = "fixtures",
+            executor: Optional[Executor] = None,
+            cache_max_bytes: int = 64 * 1024 * 1024,
+            revalidate_after_s: float = 1.0,
             ):
         self.root = safe_mkdir(root)
+
+        # Where aload/asave run their blocking file I/O (defaults to the shared pool).
+        self.executor = executor
+
+        self.cache = FixtureCache(
+            max_bytes=cache_max_bytes,
+            revalidate_after_s=revalidate_after_s,
+        ) if cache_max_bytes > 0 else None
     
     def _make_tool_dir(self, tool_name: str) -> Path:
         return (
@@ -45,17 +312,49 @@ class FixtureStore:
             signature: str
     ) -> Optional[Fixture]:
         
-        fixture_path = self.get_path_for_fixture(
-            tool_name=tool_name,
-            signature=signature,
-        )
-        if not fixture_path.exists():
+        key = (tool_name, signature)
+        now = time.monotonic()
+
+        entry = self.cache.get(key) if self.cache else None
+        if entry and now - entry.checked_at < self.cache.revalidate_after_s:
+            self.cache.count(hit=True)
+            return _decode(entry.payload)
+        
+        # Reads never create directories; only `save` does.
+        fixture_path = self.root / tool_name / f"{signature}.json"
+        try:
+            st = fixture_path.stat()
+        except FileNotFoundError:
+            if self.cache:
+                self.cache.invalidate(key)
+                self.cache.count(hit=False)
             return None
         
-        with fixture_path.open("r", encoding="utf-8") as f:
-            return Fixture.load_from_json(
-                fixture=json.load(f)
+        if entry \
+            and entry.mtime_ns == st.st_mtime_ns \
+                and entry.size == st.st_size:
+            entry.checked_at = now
+            self.cache.count(hit=True)
+            return _decode(entry.payload)
+        
+        payload = fixture_path.read_text(encoding="utf-8")
+        fixture = _decode(payload)
+        
+        if self.cache:
+            if entry:
+                self.cache.invalidate(key)
+            self.cache.count(hit=False)
+            self.cache.put(
+                key,
+                _CacheEntry(
+                    payload=payload,
+                    mtime_ns=st.st_mtime_ns,
+                    size=st.st_size,
+                    checked_at=now,
+                )
             )
+        
+        return fixture
     
     def save(
             self,
@@ -68,13 +367,104 @@ class FixtureStore:
             tool_name=tool_name,
             signature=signature,
         )
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(
-                fixture.to_json(),
-                f,
-                indent=2,
-                ensure_ascii=False,
-                sort_keys=True,
+        payload = json.dumps(
+            fixture.to_json(),
+            indent=2,
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        path.write_text(payload, encoding="utf-8")
+        
+        if self.cache:
+            st = path.stat()
+            self.cache.put(
+                (tool_name, signature),
+                _CacheEntry(
+                    payload=payload,
+                    mtime_ns=st.st_mtime_ns,
+                    size=st.st_size,
+                    checked_at=time.monotonic(),
+                )
             )
         
         return path
+    
+    def save_stream(
+            self,
+            tool_name: str,
+            signature: str,
+            chunks: Iterable[str],
+            ok: bool = True,
+            error: Optional[str] = None,
+            latency_ms: int = 0,
+            metadata: Optional[FixtureMetaData] = None,
+    ) -> Path:
+        """
+        Write the fixture file chunk by chunk; the data is never parsed or held
+        whole. The file is compact rather than indented, and the cached entry
+        is dropped so the next `load` reads the new file.
+        """
+        
+        path = write_chunks(
+            self.get_path_for_fixture(
+                tool_name=tool_name,
+                signature=signature,
+            ),
+            stream_envelope(
+                {
+                    "ok": ok,
+                    "error": error,
+                    "latency_ms": latency_ms,
+                    "metadata": dc.asdict(metadata) if metadata else None,
+                },
+                "data",
+                chunks,
+            ),
+        )
+        
+        if self.cache:
+            self.cache.invalidate((tool_name, signature))
+        
+        return path
+    
+    def iter_fixtures(self) -> Iterator[Tuple[str, str, Fixture]]:
+        
+        for path in sorted(self.root.rglob("*.json")):
+            tool_name = path.parent.relative_to(self.root).as_posix()
+
+            with path.open("r", encoding="utf-8") as f:
+                fixture = Fixture.load_from_json(
+                    fixture=json.load(f)
+                )
+
+            yield (
+                tool_name,
+                path.stem,
+                fixture,
+            )
+    
+    def cache_stats(self) -> FixtureCacheStats:
+        
+        return self.cache.stats() if self.cache else FixtureCacheStats()
+
+def migrate_fixtures(
+        source: BaseFixtureStore,
+        destination: BaseFixtureStore,
+        batch_size: int = 500,
+) -> int:
+    """
+    Copy every fixture from `source` into `destination`; returns the count.
+    """
+    
+    migrated = 0
+    batch: List[Tuple[str, str, Fixture]] = []
+    for item in source.iter_fixtures():
+        batch.append(item)
+        if len(batch) >= batch_size:
+            migrated += destination.save_many(batch)
+            batch = []
+    
+    if batch:
+        migrated += destination.save_many(batch)
+    
+    return migrated
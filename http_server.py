@@ -0,0 +1,352 @@
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import unquote
+import argparse
+import asyncio
+import json
+import math
+
+from api_ops_router import APIOperationsRouter
+from fixture_generator import DEFAULT_ERROR_TEMPLATES
+from sandbox import Sandbox
+from type import MockedResponse
+from utils import query_args
+
+# Request head and body limits, in bytes.
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+# Seconds an idle keep-alive connection is held open.
+KEEP_ALIVE_TIMEOUT_S = 15.0
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    204: "No Content",
+    400: "Bad Request",
+    401: "Unauthorized",
+    403: "Forbidden",
+    404: "Not Found",
+    409: "Conflict",
+    411: "Length Required",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    501: "Not Implemented",
+}
+
+class HTTPError(Exception):
+
+    def __init__(
+            self,
+            status: int,
+            message: str,
+    ) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class SandboxHTTPServer:
+    """
+    Local HTTP/1.1 front-end for a Sandbox (stdlib asyncio, keep-alive).
+
+    `METHOD /path?query` is matched through the router's route trie; args are
+    the query string and path params coerced by the param schema, plus the
+    JSON request body under "body" (the shape `openapi_ops._build_param_schema`
+    gives operations). Calls go through `Sandbox.ainvoke`, so injected latency
+    is a non-blocking sleep, and the response status is the sandbox's:
+    200, 403 (policy), 404 (unknown op), 422 (invalid args), 429 (rate
+    limited, with Retry-After) or 500 (injected failure).
+    """
+
+    def __init__(
+            self,
+            sandbox: Sandbox,
+            record: bool = False,
+            agent_header: str = "x-agent-id",
+    ) -> None:
+        self.sandbox = sandbox
+        self.router: APIOperationsRouter = sandbox.api_ops_router
+        self.record = record
+        self.agent_header = agent_header.lower()
+
+    async def start(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 8080,
+    ) -> asyncio.base_events.Server:
+
+        return await asyncio.start_server(
+            self._serve_connection,
+            host,
+            port,
+            limit=MAX_HEADER_BYTES,
+        )
+
+    async def _serve_connection(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+    ) -> None:
+
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"),
+                        KEEP_ALIVE_TIMEOUT_S,
+                    )
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    writer.write(_encode(413, {"error": "Request head too large."}, keep_alive=False))
+                    return
+
+                try:
+                    method, target, version, headers = _parse_head(head)
+                    body = await self._read_body(reader, headers)
+                except HTTPError as e:
+                    writer.write(_encode(e.status, {"error": e.message}, keep_alive=False))
+                    return
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" \
+                    else connection == "keep-alive"
+
+                status, payload, extra = await self.handle(method, target, headers, body)
+                writer.write(_encode(status, payload, keep_alive, extra))
+                await writer.drain()
+
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            return
+        finally:
+            writer.close()
+
+    async def _read_body(
+            self,
+            reader: asyncio.StreamReader,
+            headers: Dict[str, str],
+    ) -> bytes:
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(411, "Chunked request bodies are not supported; send Content-Length.")
+
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length.")
+
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large.")
+        if length <= 0:
+            return b""
+
+        try:
+            return await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            raise HTTPError(400, "Truncated request body.")
+
+    async def handle(
+            self,
+            method: str,
+            target: str,
+            headers: Dict[str, str],
+            body: bytes,
+    ) -> Tuple[int, Any, List[Tuple[str, str]]]:
+        """
+        (status, JSON payload, extra headers) for one request.
+        """
+
+        path, _, query = target.partition("?")
+        try:
+            op, path_params = self.router.match(f"{method} {unquote(path)}")
+        except KeyError:
+            return (
+                404,
+                {
+                    **DEFAULT_ERROR_TEMPLATES[404],
+                    "detail": f"No operation for {method} {path}.",
+                },
+                []
+            )
+
+        args = query_args(query, op.param_schema.get("properties") or {})
+        args.update(path_params)
+
+        if body:
+            try:
+                args["body"] = json.loads(body)
+            except ValueError:
+                return (
+                    400,
+                    {"error": "Request body is not valid JSON."},
+                    []
+                )
+
+        try:
+            invocation, response = await self.sandbox.ainvoke(
+                op.name,
+                args,
+                record=self.record,
+                agent_id=headers.get(self.agent_header),
+            )
+        except Exception as e:
+            return (
+                500,
+                {
+                    **DEFAULT_ERROR_TEMPLATES[500],
+                    "detail": f"{type(e).__name__}: {e}",
+                },
+                []
+            )
+
+        status, payload = _status_and_payload(response)
+        extra = [
+            ("X-Sandbox-Tool-Id", invocation.tool_id),
+            ("X-Sandbox-Latency-Ms", str(response.latency_ms)),
+        ]
+        if response.meta and response.meta.get("next_cursor"):
+            extra.append(("X-Next-Cursor", response.meta["next_cursor"]))
+        if response.meta and response.meta.get("total") is not None:
+            extra.append(("X-Total-Count", str(response.meta["total"])))
+        if status == 429 and isinstance(response.data, dict):
+            extra.append(
+                ("Retry-After", str(math.ceil(response.data.get("retry_after", 1))))
+            )
+
+        return (
+            status,
+            payload,
+            extra
+        )
+
+def _status_and_payload(response: MockedResponse) -> Tuple[int, Any]:
+
+    if response.ok:
+        return (
+            response.status or 200,
+            response.data
+        )
+
+    status = response.status or 500
+    if response.data is not None:
+        return (
+            status,
+            response.data
+        )
+
+    return (
+        status,
+        {
+            **DEFAULT_ERROR_TEMPLATES.get(status, {}),
+            "detail": response.error,
+        }
+    )
+
+def _parse_head(head: bytes) -> Tuple[str, str, str, Dict[str, str]]:
+
+    try:
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line.")
+
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise HTTPError(400, "Malformed header line.")
+        headers[name.strip().lower()] = value.strip()
+
+    return (
+        method.upper(),
+        target,
+        version,
+        headers
+    )
+
+def _encode(
+        status: int,
+        payload: Any,
+        keep_alive: bool = True,
+        extra: Optional[List[Tuple[str, str]]] = None,
+) -> bytes:
+
+    body = b"" if status == 204 else json.dumps(
+        payload,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    ).encode("utf-8")
+
+    head = [
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        "Connection: keep-alive" if keep_alive else "Connection: close",
+    ]
+    head.extend(f"{name}: {value}" for name, value in extra or [])
+
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+def main() -> None:
+
+    from type import Policy, OpenAPINormalized, FaultProfile
+    from data_generator import DataGenerator
+    from fixtures import FixtureStore
+    from recorder import SessionLogRecorder
+    from clock import CLOCKS, make_clock
+    from spec_loader import load_spec
+    from openapi_ops import register_ops_from_openapi, SchemaOnlyDGShim
+
+    parser = argparse.ArgumentParser(
+        description="Serve a sandboxed OpenAPI spec over local HTTP/1.1."
+    )
+    parser.add_argument("--spec", type=str, required=True, help="Path to OpenAPI spec (JSON or YAML).")
+    parser.add_argument("--spec-cache", type=str, default=".spec_cache", help="Parsed-spec cache directory ('' disables it).")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to bind.")
+    parser.add_argument("--port", type=int, default=8080, help="Port to bind.")
+    parser.add_argument("--fixtures-dir", type=str, default="fixtures", help="Root of the file-system fixture store.")
+    parser.add_argument("--recordings-dir", type=str, default="recordings", help="Where the session log is written.")
+    parser.add_argument("--record", action="store_true", help="Record every call to the session log.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for data/chaos determinism.")
+    parser.add_argument("--chaos", type=float, default=0.0, help="Injected error rate.")
+    parser.add_argument("--clock", type=str, default="real", choices=sorted(CLOCKS), help="How simulated latency is spent.")
+    parser.add_argument("--clock-speedup", type=float, default=100.0, help="Speed-up factor for --clock=scaled.")
+    parser.add_argument("--rate-limit-per-min", type=int, default=None, help="Per-tool rate limit.")
+    args = parser.parse_args()
+
+    openapi = OpenAPINormalized.from_dict(
+        load_spec(args.spec, cache_dir=args.spec_cache or None)
+    )
+    router = APIOperationsRouter(open_api_spec=openapi)
+    register_ops_from_openapi(openapi, router)
+
+    recorder = SessionLogRecorder(output_dir=args.recordings_dir)
+    sandbox = Sandbox(
+        policy=Policy(rate_limit_per_min=args.rate_limit_per_min),
+        recorder=recorder,
+        fault=FaultProfile(seed=args.seed, error_rate=args.chaos),
+        fixtures=FixtureStore(args.fixtures_dir),
+        api_ops_router=router,
+        data_generator=SchemaOnlyDGShim(DataGenerator(seed=args.seed), openapi),
+        clock=make_clock(args.clock, speedup=args.clock_speedup),
+    )
+
+    async def serve() -> None:
+        server = await SandboxHTTPServer(sandbox, record=args.record).start(args.host, args.port)
+        async with server:
+            await server.serve_forever()
+
+    with recorder:
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
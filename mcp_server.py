@@ -0,0 +1,345 @@
+from typing import Optional, Dict, Any, Set, Union, List
+import argparse
+import asyncio
+import json
+import os
+import stat
+import sys
+
+from adapter import Adapter
+
+PROTOCOL_VERSION = "2025-06-18"
+# Versions whose tools/list and tools/call shapes this server speaks.
+SUPPORTED_PROTOCOL_VERSIONS = (PROTOCOL_VERSION, "2025-03-26", "2024-11-05")
+SERVER_INFO = {"name": "agent-sandbox", "version": "0.1.0"}
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+class RPCError(Exception):
+
+    def __init__(
+            self,
+            code: int,
+            message: str,
+    ) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+class MCPServer:
+    """
+    Long-lived MCP server speaking newline-delimited JSON-RPC 2.0 (the MCP
+    stdio transport) on top of an Adapter.
+
+    Every request runs as its own task (up to `max_concurrency` at once), so a
+    slow `tools/call` never blocks the ones behind it; responses are written
+    as they complete, in any order, and matched by the client through `id`.
+    """
+
+    def __init__(
+            self,
+            adapter: Adapter,
+            agent_id: Optional[str] = None,
+            record: bool = True,
+            max_concurrency: int = 64,
+    ) -> None:
+        self.adapter = adapter
+        self.agent_id = agent_id
+        self.record = record
+        self.initialized = False
+
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._write_lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def handle(
+            self,
+            message: Any,
+    ) -> Optional[Union[Dict[str, Any], list]]:
+        """
+        Response for one decoded JSON-RPC message or batch (None for notifications).
+        """
+
+        if isinstance(message, list):
+            if not message:
+                return _error(None, INVALID_REQUEST, "Empty batch.")
+
+            responses = await asyncio.gather(
+                *(self.handle(item) for item in message)
+            )
+            return [r for r in responses if r is not None] or None
+
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0" \
+                or not isinstance(message.get("method"), str):
+            return _error(
+                message.get("id") if isinstance(message, dict) else None,
+                INVALID_REQUEST,
+                "Invalid JSON-RPC request.",
+            )
+
+        is_notification = "id" not in message
+        request_id = message.get("id")
+        try:
+            result = await self.dispatch(
+                message["method"],
+                message.get("params") or {},
+            )
+        except RPCError as e:
+            return None if is_notification else _error(request_id, e.code, e.message)
+        except Exception as e:
+            return None if is_notification else _error(request_id, INTERNAL_ERROR, str(e))
+
+        if is_notification:
+            return None
+
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": result,
+        }
+
+    async def dispatch(
+            self,
+            method: str,
+            params: Dict[str, Any],
+    ) -> Any:
+
+        if method == "initialize":
+            self.initialized = True
+            requested = params.get("protocolVersion")
+            return {
+                "protocolVersion": requested if requested in SUPPORTED_PROTOCOL_VERSIONS \
+                    else PROTOCOL_VERSION,
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": SERVER_INFO,
+            }
+
+        if method.startswith("notifications/"):
+            return None
+
+        if method == "ping":
+            return {}
+
+        if method == "tools/list":
+            return {"tools": self.adapter.mcp_tools()}
+
+        if method == "tools/call":
+            name = params.get("name")
+            arguments = params.get("arguments") or {}
+            if not isinstance(name, str) or not isinstance(arguments, dict):
+                raise RPCError(
+                    INVALID_PARAMS,
+                    "tools/call needs a string 'name' and object 'arguments'.",
+                )
+
+            return await self.adapter.call_tool(
+                name,
+                arguments,
+                record=self.record,
+                agent_id=self.agent_id,
+            )
+
+        raise RPCError(METHOD_NOT_FOUND, f"Method not found: {method}")
+
+    async def serve(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+    ) -> None:
+        """
+        Read messages until EOF, answering each one as soon as it is done.
+        """
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+
+            await self._slots.acquire()
+            task = asyncio.ensure_future(self._answer(line, writer))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _answer(
+            self,
+            line: bytes,
+            writer: asyncio.StreamWriter,
+    ) -> None:
+
+        try:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                response = _error(None, PARSE_ERROR, "Parse error.")
+            else:
+                response = await self.handle(message)
+
+            if response is None:
+                return
+
+            data = json.dumps(
+                response,
+                separators=(",", ":"),
+                ensure_ascii=False,
+                default=str,
+            ).encode("utf-8") + b"\n"
+
+            async with self._write_lock:
+                writer.write(data)
+                await writer.drain()
+        finally:
+            self._slots.release()
+
+    async def serve_stdio(self) -> None:
+        """
+        Serve on stdin/stdout. Pipes, ttys and sockets get non-blocking
+        transports; regular files (e.g. `< requests.jsonl > out.jsonl`) are
+        read and written from worker threads instead.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        reader = asyncio.StreamReader(limit=2**24)
+        if _is_pipe_like(sys.stdin):
+            await loop.connect_read_pipe(
+                lambda: asyncio.StreamReaderProtocol(reader),
+                sys.stdin,
+            )
+        else:
+            loop.run_in_executor(None, _feed_blocking, loop, reader, sys.stdin.buffer)
+
+        if _is_pipe_like(sys.stdout):
+            transport, protocol = await loop.connect_write_pipe(
+                asyncio.streams.FlowControlMixin,
+                sys.stdout,
+            )
+            writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        else:
+            writer = _BlockingWriter(sys.stdout.buffer)
+
+        await self.serve(reader, writer)
+
+def _is_pipe_like(stream: Any) -> bool:
+
+    try:
+        mode = os.fstat(stream.fileno()).st_mode
+    except (AttributeError, OSError, ValueError):
+        return False
+
+    return stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode) or stat.S_ISCHR(mode)
+
+def _feed_blocking(
+        loop: asyncio.AbstractEventLoop,
+        reader: asyncio.StreamReader,
+        source: Any,
+) -> None:
+    """
+    Copy lines from a blocking file into `reader` (runs on a worker thread).
+    """
+
+    try:
+        for line in iter(source.readline, b""):
+            loop.call_soon_threadsafe(reader.feed_data, line)
+    finally:
+        loop.call_soon_threadsafe(reader.feed_eof)
+
+class _BlockingWriter:
+    """
+    The `write`/`drain` part of a StreamWriter over a blocking file; the
+    writes happen on a worker thread in `drain`.
+    """
+
+    def __init__(self, sink: Any) -> None:
+        self._sink = sink
+        self._pending: List[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self._pending.append(data)
+
+    async def drain(self) -> None:
+
+        data, self._pending = b"".join(self._pending), []
+        if data:
+            await asyncio.to_thread(self._write, data)
+
+    def _write(self, data: bytes) -> None:
+        self._sink.write(data)
+        self._sink.flush()
+
+def _error(
+        request_id: Any,
+        code: int,
+        message: str,
+) -> Dict[str, Any]:
+
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": code, "message": message},
+    }
+
+def main() -> None:
+
+    from type import Policy, OpenAPINormalized, FaultProfile
+    from api_ops_router import APIOperationsRouter
+    from data_generator import DataGenerator
+    from fixtures import FixtureStore
+    from recorder import SessionLogRecorder
+    from sandbox import Sandbox
+    from clock import CLOCKS, make_clock
+    from spec_loader import load_spec
+    from openapi_ops import register_ops_from_openapi, SchemaOnlyDGShim
+
+    parser = argparse.ArgumentParser(
+        description="Serve a sandboxed OpenAPI spec as MCP tools over stdio."
+    )
+    parser.add_argument("--spec", type=str, required=True, help="Path to OpenAPI spec (JSON or YAML).")
+    parser.add_argument("--spec-cache", type=str, default=".spec_cache", help="Parsed-spec cache directory ('' disables it).")
+    parser.add_argument("--fixtures-dir", type=str, default="fixtures", help="Root of the file-system fixture store.")
+    parser.add_argument("--recordings-dir", type=str, default="recordings", help="Where the session log is written.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for data/chaos determinism.")
+    parser.add_argument("--chaos", type=float, default=0.0, help="Injected error rate.")
+    parser.add_argument("--clock", type=str, default="real", choices=sorted(CLOCKS), help="How simulated latency is spent.")
+    parser.add_argument("--clock-speedup", type=float, default=100.0, help="Speed-up factor for --clock=scaled.")
+    parser.add_argument("--rate-limit-per-min", type=int, default=None, help="Per-tool rate limit.")
+    parser.add_argument("--agent-id", type=str, default=None, help="Agent id used for per-agent rate limits.")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="Requests handled at once.")
+    args = parser.parse_args()
+
+    openapi = OpenAPINormalized.from_dict(
+        load_spec(args.spec, cache_dir=args.spec_cache or None)
+    )
+    router = APIOperationsRouter(open_api_spec=openapi)
+    register_ops_from_openapi(openapi, router)
+
+    recorder = SessionLogRecorder(output_dir=args.recordings_dir)
+    sandbox = Sandbox(
+        policy=Policy(rate_limit_per_min=args.rate_limit_per_min),
+        recorder=recorder,
+        fault=FaultProfile(seed=args.seed, error_rate=args.chaos),
+        fixtures=FixtureStore(args.fixtures_dir),
+        api_ops_router=router,
+        data_generator=SchemaOnlyDGShim(DataGenerator(seed=args.seed), openapi),
+        clock=make_clock(args.clock, speedup=args.clock_speedup),
+    )
+
+    server = MCPServer(
+        Adapter(sandbox),
+        agent_id=args.agent_id,
+        max_concurrency=args.max_concurrency,
+    )
+    with recorder:
+        asyncio.run(server.serve_stdio())
+
+if __name__ == "__main__":
+    main()
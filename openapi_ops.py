@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from type import Operation, OpenAPINormalized
+from api_ops_router import APIOperationsRouter
+from data_generator import DataGenerator
+from signatures import signature_spec_from_json
+
+
+def _extract_result_schema(
+    op: Dict[str, Any], openapi: Optional[OpenAPINormalized] = None
+) -> Optional[Dict[str, Any]]:
+    resolve = openapi.resolve if openapi else (lambda node: node)
+    responses = op.get("responses") or {}
+    # Pick the lowest 2xx code, else 200 semantics
+    two_xx = []
+    for k in responses.keys():
+        if isinstance(k, int) and 200 <= k < 300:
+            two_xx.append(k)
+        elif isinstance(k, str) and k.isdigit():
+            ki = int(k)
+            if 200 <= ki < 300:
+                two_xx.append(ki)
+    target = str(min(two_xx)) if two_xx else "200"
+
+    content = (resolve(responses.get(target)) or {}).get("content") or {}
+    if "application/json" in content:
+        return (content["application/json"] or {}).get("schema")
+
+    for mt, body in content.items():
+        if isinstance(mt, str) and mt.endswith("+json"):
+            sch = (body or {}).get("schema")
+            if sch:
+                return sch
+    for mt, body in content.items():
+        if isinstance(mt, str) and "json" in mt:
+            sch = (body or {}).get("schema")
+            if sch:
+                return sch
+    return None
+
+
+def _build_param_schema(
+    op: Dict[str, Any], openapi: Optional[OpenAPINormalized] = None
+) -> Dict[str, Any]:
+    """
+    Coalesce path/query/header params + JSON body into a single input schema
+    for demo purposes. This keeps MCP-ish shape: a single object args.
+    Parameter and requestBody $refs are resolved when `openapi` is given.
+    """
+    resolve = openapi.resolve if openapi else (lambda node: node)
+    props: Dict[str, Any] = {}
+    required: List[str] = []
+
+    # parameters[]
+    for param in op.get("parameters", []) or []:
+        param = resolve(param)
+        name = param.get("name") or "param"
+        schema = (param.get("schema") or {"type": "string"})
+        props[name] = schema
+        if param.get("required"):
+            required.append(name)
+
+    # requestBody (JSON only, demo)
+    rb = resolve(op.get("requestBody")) or {}
+    rb_content = rb.get("content") or {}
+    rb_json = (rb_content.get("application/json") or {}).get("schema")
+    if rb_json:
+        props["body"] = rb_json
+        if rb.get("required", False):
+            required.append("body")
+
+    out: Dict[str, Any] = {"type": "object", "properties": props}
+    if required:
+        out["required"] = sorted(set(required))
+    return out
+
+
+def register_ops_from_openapi(
+    openapi: OpenAPINormalized, router: APIOperationsRouter
+) -> None:
+    for name, path, method, op in openapi.operations:
+        desc = op.get("description") or op.get("summary") or ""
+        param_schema = _build_param_schema(op, openapi)
+        result_schema = _extract_result_schema(op, openapi) or {"type": "object"}
+
+        router.register_op(
+            Operation(
+                name=name,
+                param_schema=param_schema,
+                result_schema=result_schema,
+                description=desc,
+                version=str(op.get("x-version", "v1")),
+                signature=signature_spec_from_json(op.get("x-sandbox-signature")),
+            )
+        )
+
+
+class SchemaOnlyDGShim:
+
+    def __init__(self, inner: DataGenerator, openapi: OpenAPINormalized) -> None:
+        self._inner = inner
+        self._openapi = openapi
+
+    def generate(self, schema: Dict[str, Any]) -> Any:
+        return self._inner.generate(self._openapi, schema)
+
+    @property
+    def last_truncation(self) -> Optional[Dict[str, int]]:
+        return self._inner.last_truncation
@@ -1,5 +1,12 @@
-from typing import Union
+from concurrent.futures import Executor
+from typing import Union, Optional, Any, Iterable, Iterator
 from pathlib import Path
+import atexit
+import json
+import os
+import queue
+import threading
+import time
 
 from type import (
     ToolCall,
@@ -8,14 +15,21 @@ from type import (
 )
 from utils import (
     safe_mkdir,
+    run_blocking,
+    stream_envelope,
+    write_chunks,
 )
 
 class Recorder:
     def __init__(
             self,
             output_dir: Union[str, Path] = "recordings",      
+            executor: Optional[Executor] = None,
     ):
         self.output_dir = safe_mkdir(output_dir)
+
+        # Where arecord runs its blocking file I/O (defaults to the shared pool).
+        self.executor = executor
     
     def record(
             self,
@@ -31,4 +45,386 @@ class Recorder:
             timestamp=invocation.timestamp
         )
 
-        return recording.save(self.output_dir)
\ No newline at end of file
+        return recording.save(self.output_dir)
+    
+    async def arecord(
+            self,
+            invocation: ToolCall,
+            response: MockedResponse,
+    ) -> Path:
+        
+        return await run_blocking(
+            self.record,
+            invocation=invocation,
+            response=response,
+            executor=self.executor,
+        )
+    
+    def record_stream(
+            self,
+            invocation: ToolCall,
+            chunks: Iterable[str],
+            response: Optional[MockedResponse] = None,
+    ) -> Path:
+        """
+        Record a call whose response data arrives as JSON text chunks (see
+        `DataGenerator.stream`); `response` carries everything but the data.
+        The recording is written chunk by chunk, in the `Recording` layout.
+        """
+        
+        return write_chunks(
+            safe_mkdir(self.output_dir) / f"{invocation.tool_id}.json",
+            _recording_chunks(invocation, chunks, response),
+        )
+
+def _recording_chunks(
+        invocation: ToolCall,
+        chunks: Iterable[str],
+        response: Optional[MockedResponse] = None,
+) -> Iterator[str]:
+    """
+    JSON text of a `Recording`, with the response data taken from `chunks`.
+    """
+    
+    envelope = (response or MockedResponse(ok=True)).to_json()
+    envelope.pop("data")
+
+    return stream_envelope(
+        {
+            "id": invocation.tool_id,
+            "tool": invocation.tool_name,
+            "args": invocation.args,
+            "time": invocation.timestamp,
+        },
+        "response",
+        stream_envelope(envelope, "data", chunks),
+    )
+
+class _Stream:
+    """
+    Queue item: one session log line given as JSON text chunks. The writer
+    thread writes them as they come and sets `done`; `error` is what the
+    chunks raised, in which case the partial line is removed.
+    """
+
+    def __init__(self, chunks: Iterable[str]) -> None:
+        self.chunks = chunks
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+class _Flush:
+    """
+    Queue marker: the writer flushes everything before it and sets `done`.
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+_STOP = object()
+
+class SessionLogRecorder(Recorder):
+    """
+    Appends every call to a JSONL session log instead of writing one file per
+    tool_id, so repeated calls with the same signature are all kept.
+
+    `record` only enqueues; a background thread serializes and writes. Output
+    goes to {session_id}-{segment:05d}.jsonl files, rotated once a segment
+    reaches `segment_max_bytes`. The file is flushed (and optionally fsync'ed)
+    whenever `flush_every_records`, `flush_every_bytes` or `flush_interval_s`
+    is reached, and everything pending is written on `close()`/exit.
+
+    Records are serialized after `record` returns, so callers must not mutate
+    args or response data they have handed over.
+    """
+
+    def __init__(
+            self,
+            output_dir: Union[str, Path] = "recordings",
+            session_id: Optional[str] = None,
+            max_queue: int = 10_000,
+            flush_every_records: int = 100,
+            flush_every_bytes: int = 1024 * 1024,
+            flush_interval_s: float = 1.0,
+            segment_max_bytes: int = 64 * 1024 * 1024,
+            fsync: bool = False,
+            executor: Optional[Executor] = None,
+    ):
+        super().__init__(
+            output_dir=output_dir,
+            executor=executor,
+        )
+        self.session_id = session_id or f"session-{int(time.time())}-{os.getpid()}"
+        self.flush_every_records = flush_every_records
+        self.flush_every_bytes = flush_every_bytes
+        self.flush_interval_s = flush_interval_s
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync = fsync
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._segment = 0
+        self._file = None
+        self._segment_bytes = 0
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+        self._open_segment()
+
+        self._writer = threading.Thread(
+            target=self._run,
+            name=f"recorder-{self.session_id}",
+            daemon=True,
+        )
+        self._writer.start()
+        atexit.register(self.close)
+    
+    @property
+    def segment_path(self) -> Path:
+        return self.output_dir / f"{self.session_id}-{self._segment:05d}.jsonl"
+    
+    def record(
+            self,
+            invocation: ToolCall,
+            response: MockedResponse,
+    ) -> Path:
+        """
+        Queue the call for writing; returns the segment it is expected to land in.
+        """
+        
+        self._raise_if_failed()
+        if self._closed:
+            raise RuntimeError("SessionLogRecorder is closed.")
+        
+        self._put(
+            Recording(
+                tool_id=invocation.tool_id,
+                tool_name=invocation.tool_name,
+                args=invocation.args,
+                response=response,
+                timestamp=invocation.timestamp
+            )
+        )
+
+        return self.segment_path
+    
+    def record_stream(
+            self,
+            invocation: ToolCall,
+            chunks: Iterable[str],
+            response: Optional[MockedResponse] = None,
+    ) -> Path:
+        """
+        Hand the chunks (single-line JSON text, as `DataGenerator.stream`
+        yields) to the background thread, which writes them into the log as
+        they are produced, and wait until the line is written. The
+        chunks are consumed on that thread while the caller blocks, so a
+        `DataGenerator.stream` generator is never used from two threads.
+        """
+        
+        self._raise_if_failed()
+        if self._closed:
+            raise RuntimeError("SessionLogRecorder is closed.")
+        
+        item = _Stream(
+            _recording_chunks(invocation, chunks, response)
+        )
+        self._put(item)
+        while not item.done.wait(timeout=0.1):
+            if not self._writer.is_alive():
+                break
+        
+        self._raise_if_failed()
+        if not item.done.is_set():
+            raise RuntimeError("Session log writer stopped before the recording was written.")
+        if item.error is not None:
+            raise item.error
+
+        return self.segment_path
+    
+    async def arecord(
+            self,
+            invocation: ToolCall,
+            response: MockedResponse,
+    ) -> Path:
+        
+        try:
+            self._raise_if_failed()
+            if self._closed:
+                raise RuntimeError("SessionLogRecorder is closed.")
+
+            self._queue.put_nowait(
+                Recording(
+                    tool_id=invocation.tool_id,
+                    tool_name=invocation.tool_name,
+                    args=invocation.args,
+                    response=response,
+                    timestamp=invocation.timestamp
+                )
+            )
+        except queue.Full:
+            # Back-pressure: wait for room without blocking the event loop.
+            return await super().arecord(
+                invocation=invocation,
+                response=response,
+            )
+        
+        return self.segment_path
+    
+    def flush(self) -> None:
+        """
+        Block until everything recorded so far has been written out.
+        """
+        
+        if self._closed:
+            return
+        
+        marker = _Flush()
+        self._put(marker)
+        while not marker.done.wait(timeout=0.1):
+            if not self._writer.is_alive():
+                break
+        
+        self._raise_if_failed()
+    
+    def close(self) -> None:
+        
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        
+        try:
+            self._put(_STOP)
+        except RuntimeError:
+            pass # the writer is gone; nothing left to stop
+        self._writer.join()
+        atexit.unregister(self.close)
+
+        self._raise_if_failed()
+    
+    def __enter__(self) -> "SessionLogRecorder":
+        return self
+    
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+    
+    def _put(self, item: Any) -> None:
+        """
+        Queue an item, waiting for room only while the writer is alive, so a
+        dead writer with a full queue raises instead of hanging the caller.
+        """
+        
+        while True:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                self._raise_if_failed()
+                if not self._writer.is_alive():
+                    raise RuntimeError("Session log writer stopped.")
+    
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Session log writer failed.") from self._error
+    
+    def _open_segment(self) -> None:
+        
+        self._file = self.segment_path.open("ab")
+        self._segment_bytes = self._file.tell()
+    
+    def _flush_file(self) -> None:
+        
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+    
+    def _rotate(self) -> None:
+        
+        self._flush_file()
+        self._file.close()
+        self._segment += 1
+        self._open_segment()
+    
+    def _write_stream(self, item: _Stream) -> int:
+        """
+        Write one streamed line; bytes written (0 if the chunks failed).
+        """
+        
+        start = self._file.tell()
+        written = 0
+        try:
+            for text in item.chunks:
+                data = text.encode("utf-8")
+                self._file.write(data)
+                written += len(data)
+        except Exception as e:
+            self._file.flush()
+            self._file.truncate(start)
+            item.error = e
+            return 0
+        
+        self._file.write(b"\n")
+        return written + 1
+    
+    def _run(self) -> None:
+        
+        pending_records = 0
+        pending_bytes = 0
+        deadline = time.monotonic() + self.flush_interval_s
+
+        try:
+            while True:
+                timeout = max(deadline - time.monotonic(), 0)
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+                
+                if isinstance(item, Recording):
+                    line = json.dumps(
+                        item.to_json(),
+                        separators=(",", ":"),
+                        ensure_ascii=False,
+                        sort_keys=True,
+                        default=str,
+                    ).encode("utf-8") + b"\n"
+
+                    if self._segment_bytes \
+                        and self._segment_bytes + len(line) > self.segment_max_bytes:
+                        self._rotate()
+                    
+                    self._file.write(line)
+                    self._segment_bytes += len(line)
+                    pending_records += 1
+                    pending_bytes += len(line)
+                
+                if isinstance(item, _Stream):
+                    # Size unknown up front: rotate only once the segment is full.
+                    if self._segment_bytes >= self.segment_max_bytes:
+                        self._rotate()
+                    
+                    written = self._write_stream(item)
+                    self._segment_bytes += written
+                    pending_records += written > 0
+                    pending_bytes += written
+                    item.done.set()
+                
+                if item is _STOP \
+                    or isinstance(item, _Flush) \
+                        or pending_records >= self.flush_every_records \
+                            or pending_bytes >= self.flush_every_bytes \
+                                or time.monotonic() >= deadline:
+                    if pending_records:
+                        self._flush_file()
+                    pending_records = 0
+                    pending_bytes = 0
+                    deadline = time.monotonic() + self.flush_interval_s
+                
+                if isinstance(item, _Flush):
+                    item.done.set()
+                if item is _STOP:
+                    break
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._file.close()
@@ -0,0 +1,181 @@
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Union, Optional, Tuple, Dict, List, Iterable
+import json
+import sys
+import threading
+
+from type import (
+    MockedResponse,
+    Recording,
+)
+from utils import (
+    run_blocking,
+)
+
+# Index entries pack (file number, byte offset) into one int.
+_OFFSET_BITS = 48
+
+class ReplayIndex:
+    """
+    Index over recorded calls, keyed by (tool_name, signature).
+
+    Sources are recording directories (per-call *.json files and/or *.jsonl
+    session logs) or individual files. Files are streamed once to build the
+    index, which only keeps file positions; responses are read back from disk
+    on lookup. When a key was recorded several times the recordings are
+    served in order, repeating the last one once they run out.
+    """
+
+    def __init__(
+            self,
+            sources: Union[str, Path, Iterable[Union[str, Path]]] = "recordings",
+            strict: bool = False,
+            executor: Optional[Executor] = None,
+    ) -> None:
+        # With strict=True, calls without a recording fail instead of falling through.
+        self.strict = strict
+        self.executor = executor
+
+        self._files: List[Path] = []
+        self._index: Dict[Tuple[str, str], List[int]] = {}
+        self._served: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+        if isinstance(sources, (str, Path)):
+            sources = [sources]
+        for source in sources:
+            self.add(source)
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def add(
+            self,
+            source: Union[str, Path],
+    ) -> None:
+        
+        source = Path(source)
+        if not source.exists():
+            raise FileNotFoundError(f"Recordings not found: {source}")
+        
+        if source.is_file():
+            paths = [source]
+        else:
+            paths = sorted(source.glob("*.json")) + sorted(source.glob("*.jsonl"))
+        
+        for path in paths:
+            if path.suffix == ".jsonl":
+                self._add_log(path)
+            else:
+                self._add_file(path)
+    
+    def _add_entry(
+            self,
+            tool_name: str,
+            tool_id: str,
+            file_no: int,
+            offset: int,
+    ) -> None:
+        
+        key = (sys.intern(tool_name), tool_id)
+        self._index.setdefault(key, []).append(
+            file_no << _OFFSET_BITS | offset
+        )
+    
+    def _add_file(
+            self,
+            path: Path,
+    ) -> None:
+        
+        with path.open("r", encoding="utf-8") as f:
+            payload = json.load(f)
+        
+        self._files.append(path)
+        self._add_entry(
+            tool_name=payload["tool"],
+            tool_id=payload["id"],
+            file_no=len(self._files) - 1,
+            offset=0,
+        )
+    
+    def _add_log(
+            self,
+            path: Path,
+    ) -> None:
+        
+        self._files.append(path)
+        file_no = len(self._files) - 1
+
+        with path.open("rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    payload = json.loads(line)
+                    self._add_entry(
+                        tool_name=payload["tool"],
+                        tool_id=payload["id"],
+                        file_no=file_no,
+                        offset=offset,
+                    )
+                offset += len(line)
+    
+    def _read(
+            self,
+            position: int,
+    ) -> Recording:
+        
+        path = self._files[position >> _OFFSET_BITS]
+        offset = position & ((1 << _OFFSET_BITS) - 1)
+
+        with path.open("rb") as f:
+            if path.suffix == ".jsonl":
+                f.seek(offset)
+                payload = json.loads(f.readline())
+            else:
+                payload = json.load(f)
+        
+        return Recording.from_json(payload)
+    
+    def lookup(
+            self,
+            tool_name: str,
+            signature: str,
+    ) -> Optional[MockedResponse]:
+        
+        key = (tool_name, signature)
+        positions = self._index.get(key)
+        if not positions:
+            return None
+        
+        with self._lock:
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+        
+        return self._read(
+            positions[min(served, len(positions) - 1)]
+        ).response
+    
+    async def alookup(
+            self,
+            tool_name: str,
+            signature: str,
+    ) -> Optional[MockedResponse]:
+        
+        if (tool_name, signature) not in self._index:
+            return None
+        
+        return await run_blocking(
+            self.lookup,
+            tool_name=tool_name,
+            signature=signature,
+            executor=self.executor,
+        )
+    
+    def rewind(self) -> None:
+        """
+        Start serving every key from its first recording again.
+        """
+        
+        with self._lock:
+            self._served.clear()
@@ -1,23 +1,24 @@
 from __future__ import annotations
 
 from typing import Dict, Tuple, Any, Optional
-import time
 
 from type import (
     Policy,
     ToolCall,
     MockedResponse,
     FaultProfile,
+    FaultSample,
     Fixture,
     FixtureMetaData,
     )
-from utils import (
-    stable_hash
-    )
 from recorder import Recorder
-from fixtures import FixtureStore
+from fixtures import BaseFixtureStore, FixtureStore
 from api_ops_router import APIOperationsRouter
 from data_generator import DataGenerator
+from fixture_generator import DEFAULT_ERROR_TEMPLATES
+from clock import Clock, RealClock
+from replay import ReplayIndex
+from collection_store import CollectionStore
 
 class Sandbox:
     def __init__(
@@ -25,9 +26,12 @@ class Sandbox:
             policy: Policy,
             recorder: Recorder,
             fault: Optional[FaultProfile] = None,
-            fixtures: Optional[FixtureStore] = None,
+            fixtures: Optional[BaseFixtureStore] = None,
             api_ops_router: Optional[APIOperationsRouter] = None,
             data_generator: Optional[DataGenerator] = None,
+            clock: Optional[Clock] = None,
+            replay: Optional[ReplayIndex] = None,
+            collections: Optional[CollectionStore] = None,
     ):
         self.policy = policy
         self.recorder = recorder
@@ -35,121 +39,344 @@ class Sandbox:
         self.fixtures = fixtures or FixtureStore()
         self.api_ops_router = api_ops_router or APIOperationsRouter()
         self.data_generator = data_generator or DataGenerator()
+        self.clock = clock or RealClock()
+        self.replay = replay
+        self.collections = collections
 
     def invoke(
             self,
             tool_name: str,
             args: Dict[str, Any],
-            record: Optional[bool] = False
+            record: Optional[bool] = False,
+            agent_id: Optional[str] = None,
+    ) -> Tuple[ToolCall, MockedResponse]:
+        
+        tool_name, args = self.api_ops_router.route(tool_name, args)
+        invocation, fault = self._start(
+            tool_name=tool_name,
+            args=args,
+        )
+        
+        response = self._check_policy(tool_name, agent_id)
+        if response is None:
+            response = self._check_args(
+                invocation=invocation,
+                fault=fault,
+            )
+        if response is None and self.replay is not None:
+            response = self._replayed(
+                invocation=invocation,
+                fault=fault,
+                recorded=self.replay.lookup(
+                    tool_name=tool_name,
+                    signature=invocation.tool_id,
+                ),
+            )
+        
+        if response is None and self.collections:
+            response = self._from_collections(
+                invocation=invocation,
+                fault=fault,
+            )
+        
+        fixture = None
+        if response is None:
+            cached_fixture = self.fixtures.load(
+                tool_name=tool_name,
+                signature=invocation.tool_id,
+            )
+            response, fixture = self._respond(
+                invocation=invocation,
+                fault=fault,
+                cached_fixture=cached_fixture,
+            )
+
+        self.clock.sleep(response.latency_ms / 1000.0)
+
+        if fixture and not self.fixtures.read_only:
+            self.fixtures.save(
+                tool_name=tool_name,
+                signature=invocation.tool_id,
+                fixture=fixture
+            )
+        
+        if record and self.recorder:
+            self.recorder.record(
+                invocation=invocation,
+                response=response
+            )
+        
+        return (
+            invocation,
+            response
+        )
+    
+    async def ainvoke(
+            self,
+            tool_name: str,
+            args: Dict[str, Any],
+            record: Optional[bool] = False,
+            agent_id: Optional[str] = None,
     ) -> Tuple[ToolCall, MockedResponse]:
+        """
+        asyncio counterpart of `invoke`: same fixture and recording semantics,
+        but latency is spent in `asyncio.sleep` and file I/O runs on the
+        stores' bounded executors, so many calls can be in flight at once.
+        """
         
-        timestamp = time.time()
-        tool_id = stable_hash(tool_name, args)
-        latency = self.fault.sample_latency(
-            key=tool_id
+        tool_name, args = self.api_ops_router.route(tool_name, args)
+        invocation, fault = self._start(
+            tool_name=tool_name,
+            args=args,
         )
         
-        # Check policy compliance
+        response = self._check_policy(tool_name, agent_id)
+        if response is None:
+            response = self._check_args(
+                invocation=invocation,
+                fault=fault,
+            )
+        if response is None and self.replay is not None:
+            response = self._replayed(
+                invocation=invocation,
+                fault=fault,
+                recorded=await self.replay.alookup(
+                    tool_name=tool_name,
+                    signature=invocation.tool_id,
+                ),
+            )
+        
+        if response is None and self.collections:
+            response = self._from_collections(
+                invocation=invocation,
+                fault=fault,
+            )
+        
+        fixture = None
+        if response is None:
+            cached_fixture = await self.fixtures.aload(
+                tool_name=tool_name,
+                signature=invocation.tool_id,
+            )
+            response, fixture = self._respond(
+                invocation=invocation,
+                fault=fault,
+                cached_fixture=cached_fixture,
+            )
+
+        await self.clock.asleep(response.latency_ms / 1000.0)
+
+        if fixture and not self.fixtures.read_only:
+            await self.fixtures.asave(
+                tool_name=tool_name,
+                signature=invocation.tool_id,
+                fixture=fixture
+            )
+        
+        if record and self.recorder:
+            await self.recorder.arecord(
+                invocation=invocation,
+                response=response
+            )
+        
+        return (
+            invocation,
+            response
+        )
+    
+    def _start(
+            self,
+            tool_name: str,
+            args: Dict[str, Any],
+    ) -> Tuple[ToolCall, FaultSample]:
+        
+        timestamp = self.clock.now()
+        tool_id = self.api_ops_router.signature(tool_name, args)
+        fault = self.fault.sample(
+            key=tool_id,
+            now=timestamp,
+        )
+
+        invocation = ToolCall(
+            tool_name=tool_name,
+            args=args,
+            tool_id=tool_id,
+            timestamp=str(timestamp),
+        )
+
+        return (
+            invocation,
+            fault
+        )
+    
+    def _check_policy(
+            self,
+            tool_name: str,
+            agent_id: Optional[str] = None,
+    ) -> Optional[MockedResponse]:
+        
         allowed, reason = self.policy.is_allowed(tool_name)
         if not allowed:
-            response = MockedResponse(
+            return MockedResponse(
                 ok=False,
                 error=reason,
-                latency_ms=0
+                latency_ms=0,
+                status=403,
             )
-            invocation = ToolCall(
-                tool_name=tool_name,
-                args=args,
-                tool_id=tool_id,
-                timestamp=str(timestamp),
+        
+        retry_after = self.policy.acquire(
+            tool_name=tool_name,
+            now=self.clock.now(),
+            agent_id=agent_id,
+        )
+        if not retry_after:
+            return None
+        
+        return MockedResponse(
+            ok=False,
+            data={
+                **DEFAULT_ERROR_TEMPLATES[429],
+                "retry_after": round(retry_after, 3),
+            },
+            error=f"Rate limit exceeded for '{tool_name}'.",
+            latency_ms=0,
+            status=429,
+        )
+    
+    def _check_args(
+            self,
+            invocation: ToolCall,
+            fault: FaultSample,
+    ) -> Optional[MockedResponse]:
+        """
+        422 response if the args violate the operation's param schema, before
+        any fixture lookup, so malformed calls never become fixtures.
+        """
+        
+        try:
+            details = self.api_ops_router.validate(
+                name=invocation.tool_name,
+                args=invocation.args,
             )
-
-            if record and self.recorder:
-                self.recorder.record(
-                    invocation=invocation,
-                    response=response
-                )
-            
-            return (
-                invocation,
-                response
+        except KeyError:
+            return None # unknown operations are answered further down
+        
+        if not details:
+            return None
+        
+        return MockedResponse(
+            ok=False,
+            data={
+                **DEFAULT_ERROR_TEMPLATES[422],
+                "details": details,
+            },
+            error=f"Invalid arguments for '{invocation.tool_name}'.",
+            latency_ms=fault.latency_ms,
+            status=422,
+        )
+    
+    def _from_collections(
+            self,
+            invocation: ToolCall,
+            fault: FaultSample,
+    ) -> Optional[MockedResponse]:
+        """
+        Response served from collection state for CRUD-shaped operations; None
+        for other operations, and for injected failures, which fall through
+        to the usual fixture path.
+        """
+        
+        if fault.error:
+            return None
+        
+        try:
+            op = self.api_ops_router.get_op(name=invocation.tool_name)
+        except KeyError:
+            return None
+        
+        response = self.collections.handle(op, invocation.args)
+        if response is not None:
+            response.latency_ms = fault.latency_ms
+        
+        return response
+    
+    def _replayed(
+            self,
+            invocation: ToolCall,
+            fault: FaultSample,
+            recorded: Optional[MockedResponse],
+    ) -> Optional[MockedResponse]:
+        """
+        Response for a call in replay mode; None lets the call fall through to
+        fixtures and synthesis.
+        """
+        
+        if recorded is not None:
+            return recorded
+        
+        if self.replay.strict:
+            error = f"No recording for '{invocation.tool_name}' ({invocation.tool_id})."
+            return MockedResponse(
+                ok=False,
+                data={
+                    **DEFAULT_ERROR_TEMPLATES[404],
+                    "error": "replay_miss",
+                    "detail": error,
+                },
+                error=error,
+                latency_ms=fault.latency_ms,
+                status=404,
             )
         
+        return None
+    
+    def _respond(
+            self,
+            invocation: ToolCall,
+            fault: FaultSample,
+            cached_fixture: Optional[Fixture],
+    ) -> Tuple[MockedResponse, Optional[Fixture]]:
+        """
+        Build the response for a permitted call, plus the fixture to cache
+        for it (if any). Performs no I/O and no sleeping.
+        """
+        
         # Translate a cached fixture into a mocked tool response
-        cached_fixture = self.fixtures.load(
-                tool_name=tool_name,
-                signature=tool_id,
-            )
         if cached_fixture:
-
             response = MockedResponse(
                 ok=cached_fixture.ok,
                 data=cached_fixture.data,
                 error=cached_fixture.error,
-                latency_ms=cached_fixture.latency_ms or latency,
+                latency_ms=cached_fixture.latency_ms or fault.latency_ms,
             )
 
-            if not response.latency_ms:
-                response.latency_ms = latency
-            
-            time.sleep(response.latency_ms / 1000.0)
-            
-            invocation = ToolCall(
-                tool_name=tool_name,
-                args=args,
-                tool_id=tool_id,
-                timestamp=str(timestamp),
-            )
-            
-            if record and self.recorder:
-                self.recorder.record(
-                    invocation=invocation,
-                    response=response
-                )
-            
             return (
-                invocation,
-                response
+                response,
+                None
             )
         
         # Synthesize response from spec (no cached fixture for this tool)
         try:
-            op = self.api_ops_router.get_op(name=tool_name)
+            op = self.api_ops_router.get_op(name=invocation.tool_name)
         except KeyError as e:
-            
-            time.sleep(latency / 1000.0)
-
             response = MockedResponse(
                 ok=False,
                 error=str(e),
-                latency_ms=latency
-            )
-            invocation = ToolCall(
-                tool_name=tool_name,
-                args=args,
-                tool_id=tool_id,
-                timestamp=str(timestamp)
+                latency_ms=fault.latency_ms,
+                status=404,
             )
 
-            if record and self.recorder:
-                self.recorder.record(
-                    invocation=invocation,
-                    response=response
-                )
-            
             return (
-                invocation,
-                response
+                response,
+                None
             )
 
-        #TODO: Validate args against param schema
-        time.sleep(latency / 1000.0)
-
-        if self.fault.should_error(tool_id):
+        if fault.error:
             response = MockedResponse(
                 ok=False, 
                 error="Injected failure (simulated).", 
-                latency_ms=latency
+                latency_ms=fault.latency_ms,
+                status=500,
                 )
         else:
             data = self.data_generator.generate(
@@ -158,15 +385,8 @@ class Sandbox:
             response = MockedResponse(
                 ok=True,
                 data=data,
-                latency_ms=latency,
+                latency_ms=fault.latency_ms,
             )
-
-        invocation = ToolCall(
-            tool_name=tool_name,
-            args=args,
-            tool_id=tool_id,
-            timestamp=str(timestamp)
-        )
         
         # Cache the generated fixture
         fixture = Fixture(
@@ -175,30 +395,24 @@ class Sandbox:
             error=response.error,
             latency_ms=response.latency_ms,
             metadata=FixtureMetaData(
-                created_at=str(timestamp),
-                signature=tool_id,
+                created_at=invocation.timestamp,
+                signature=invocation.tool_id,
                 seed=str(
                     getattr(
                         self.fault,
                         "seed",
                         0
                     )
-                )
+                ),
+                truncation=None if fault.error else getattr(
+                    self.data_generator,
+                    "last_truncation",
+                    None
+                ),
             )
         )
-        self.fixtures.save(
-            tool_name=tool_name,
-            signature=tool_id,
-            fixture=fixture
-        )
 
-        if record and self.recorder:
-            self.recorder.record(
-                invocation=invocation,
-                response=response
-            )
-        
         return (
-            invocation,
-            response
-        )
\ No newline at end of file
+            response,
+            fixture
+        )
@@ -0,0 +1,205 @@
+from typing import Optional, Dict, Any, Callable, List, Tuple, Hashable
+
+from type import (
+    JSON,
+    SignatureSpec,
+)
+from utils import (
+    canonical_hash,
+    shape_key,
+    stable_hash,
+)
+
+# (tool_name, args) -> signature
+Signer = Callable[[str, Dict[str, Any]], str]
+
+def _or_raw(convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """
+    `convert`, but values it cannot convert are kept as they are.
+    """
+
+    def normalize(v: Any) -> Any:
+        try:
+            return convert(v)
+        except (TypeError, ValueError, OverflowError):
+            return v
+
+    return normalize
+
+NORMALIZERS: Dict[str, Callable[[Any], Any]] = {
+    "lower": lambda v: v.lower() if isinstance(v, str) else v,
+    "upper": lambda v: v.upper() if isinstance(v, str) else v,
+    "strip": lambda v: v.strip() if isinstance(v, str) else v,
+    "int": _or_raw(int),
+    "float": _or_raw(float),
+    "str": lambda v: str(v),
+    "bool": lambda v: v.lower() in ("1", "true", "yes") if isinstance(v, str) else bool(v),
+    "sorted": lambda v: sorted(v, key=str) if isinstance(v, list) else v,
+}
+
+# Distinct flat argument sets whose signature is remembered per signer.
+MAX_MEMOIZED_ARGS = 4096
+
+def _split(path: str) -> Tuple[str, ...]:
+    return tuple(path.split("."))
+
+def _matches(
+        node: Any,
+        tokens: Tuple[str, ...],
+) -> List[Tuple[Any, ...]]:
+    """
+    Concrete key paths in `node` matching `tokens` (with `*` wildcards).
+    """
+    
+    if not tokens:
+        return [()]
+    
+    head, rest = tokens[0], tokens[1:]
+    if isinstance(node, dict):
+        keys = list(node.keys()) if head == "*" else ([head] if head in node else [])
+    elif isinstance(node, list):
+        if head == "*":
+            keys = list(range(len(node)))
+        elif head.isdigit() and int(head) < len(node):
+            keys = [int(head)]
+        else:
+            keys = []
+    else:
+        return []
+    
+    return [
+        (key,) + match 
+        for key in keys 
+        for match in _matches(node[key], rest)
+    ]
+
+def _get(node: Any, path: Tuple[Any, ...]) -> Any:
+    for key in path:
+        node = node[key]
+    return node
+
+def _copy_container(node: Any) -> Any:
+    return list(node) if isinstance(node, list) else dict(node)
+
+def _replace(
+        node: Any,
+        path: Tuple[Any, ...],
+        update: Callable[[Any, Any], None],
+) -> Any:
+    """
+    Copy of `node` with only the containers along `path` copied, and `update`
+    applied to the last container with the last key.
+    """
+    
+    copied = _copy_container(node)
+    if len(path) == 1:
+        update(copied, path[0])
+    else:
+        copied[path[0]] = _replace(node[path[0]], path[1:], update)
+    
+    return copied
+
+def _set_nested(
+        target: Dict[str, Any],
+        path: Tuple[Any, ...],
+        value: Any,
+) -> None:
+    
+    for key in path[:-1]:
+        target = target.setdefault(key, {})
+    target[path[-1]] = value
+
+def compile_signer(spec: Optional[SignatureSpec]) -> Signer:
+    """
+    Compile a SignatureSpec into a signer. Without a spec the signature is the
+    historical `stable_hash(tool_name, args)`, so existing fixtures keep matching;
+    with one, the projected args are hashed with `canonical_hash`.
+    Flat argument sets are memoized, so repeated calls skip hashing entirely.
+    """
+    
+    if spec is None:
+        project = None
+        digest = stable_hash
+    else:
+        include = [_split(path) for path in spec.include] \
+            if spec.include is not None else None
+        ignore = [_split(path) for path in spec.ignore]
+        normalize = []
+        for path, name in spec.normalize.items():
+            if name not in NORMALIZERS:
+                raise ValueError(
+                    f"Unknown normalizer '{name}', expected one of {sorted(NORMALIZERS)}."
+                )
+            normalize.append((_split(path), NORMALIZERS[name]))
+
+        def project(args: Dict[str, Any]) -> Dict[str, Any]:
+            
+            if include is not None:
+                picked: Dict[str, Any] = {}
+                for tokens in include:
+                    for path in _matches(args, tokens):
+                        _set_nested(picked, path, _get(args, path))
+                args = picked
+            
+            for tokens in ignore:
+                # Deepest/last matches first so list indices stay valid.
+                for path in reversed(_matches(args, tokens)):
+                    args = _replace(
+                        args, 
+                        path, 
+                        lambda container, key: container.pop(key)
+                        )
+            
+            for tokens, fn in normalize:
+                for path in _matches(args, tokens):
+                    value = fn(_get(args, path))
+                    args = _replace(
+                        args,
+                        path,
+                        lambda container, key, value=value: container.__setitem__(key, value)
+                        )
+            
+            return args
+        
+        digest = canonical_hash
+    
+    memo: Dict[Tuple[str, Hashable], str] = {}
+
+    def sign(
+            tool_name: str,
+            args: Dict[str, Any],
+    ) -> str:
+        
+        shape = shape_key(args)
+        if shape is not None:
+            cached = memo.get((tool_name, shape))
+            if cached is not None:
+                return cached
+        
+        signature = digest(
+            tool_name, 
+            project(args) if project else args
+            )
+
+        if shape is not None:
+            if len(memo) >= MAX_MEMOIZED_ARGS:
+                memo.clear()
+            memo[(tool_name, shape)] = signature
+        
+        return signature
+    
+    return sign
+
+def signature_spec_from_json(payload: Optional[JSON]) -> Optional[SignatureSpec]:
+    """
+    SignatureSpec from a JSON object such as an `x-sandbox-signature` extension.
+    """
+    
+    if not payload:
+        return None
+    
+    return SignatureSpec(
+        include=payload.get("include"),
+        ignore=list(payload.get("ignore") or []),
+        normalize=dict(payload.get("normalize") or {}),
+    )
@@ -0,0 +1,98 @@
+from pathlib import Path
+from typing import Union, Optional, Any, Dict, Tuple
+import hashlib
+import json
+import pickle
+
+from utils import (
+    safe_mkdir,
+)
+
+# Bump when the cached representation changes.
+CACHE_VERSION = 1
+
+def _yaml() -> Tuple[Any, Any]:
+    
+    try:
+        import yaml  # type: ignore
+    except Exception as e:
+        raise RuntimeError(
+            "Spec is not valid JSON, and PyYAML is not installed. "
+            "Install with `pip install pyyaml` or provide JSON."
+        ) from e
+    
+    # libyaml's C loader is an order of magnitude faster when PyYAML was built with it.
+    return (
+        yaml,
+        getattr(yaml, "CSafeLoader", yaml.SafeLoader),
+    )
+
+def parse_spec(
+        raw: bytes,
+        source: Union[str, Path] = "<spec>",
+) -> Dict[str, Any]:
+    
+    text = raw.decode("utf-8").strip()
+    if not text:
+        raise ValueError(f"Spec file is empty: {source}")
+    
+    # Try JSON first, then YAML
+    if text[0] in "{[":
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+    
+    yaml, loader = _yaml()
+    try:
+        return yaml.load(text, Loader=loader) or {}
+    except Exception as e:
+        raise RuntimeError(f"Failed to parse YAML spec: {source}") from e
+
+def load_spec(
+        path: Union[str, Path],
+        cache_dir: Optional[Union[str, Path]] = ".spec_cache",
+) -> Dict[str, Any]:
+    """
+    Read and parse an OpenAPI spec (JSON or YAML).
+
+    Parsed specs are pickled under `cache_dir`, keyed by a hash of the file
+    contents, so later processes skip parsing entirely; pass cache_dir=None to
+    disable. Only point `cache_dir` at a directory you trust, since cache
+    entries are unpickled.
+    """
+    
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"Spec not found: {p}")
+    
+    raw = p.read_bytes()
+    if cache_dir is None:
+        return parse_spec(raw, source=p)
+    
+    digest = hashlib.blake2b(
+        raw,
+        digest_size=16,
+    ).hexdigest()
+    cache_path = Path(cache_dir) / f"{digest}.v{CACHE_VERSION}.pickle"
+
+    if cache_path.exists():
+        try:
+            with cache_path.open("rb") as f:
+                return pickle.load(f)
+        except Exception:
+            pass # corrupt or incompatible entry: re-parse and overwrite
+    
+    spec = parse_spec(raw, source=p)
+
+    safe_mkdir(cache_path.parent)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    with tmp_path.open("wb") as f:
+        pickle.dump(
+            spec,
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    tmp_path.replace(cache_path)
+    
+    return spec
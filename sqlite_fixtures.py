@@ -0,0 +1,221 @@
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Union, Optional, Tuple, Dict, Iterable, Iterator, List
+import argparse
+import json
+import sqlite3
+import threading
+
+from fixtures import (
+    BaseFixtureStore,
+    FixtureKey,
+    FixtureStore,
+    migrate_fixtures,
+)
+from type import (
+    Fixture,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fixtures (
+    tool_name TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (tool_name, signature)
+) WITHOUT ROWID
+"""
+
+# Keeps `IN (VALUES ...)` lookups under SQLite's bound-parameter limit.
+MAX_KEYS_PER_QUERY = 400
+
+class SQLiteFixtureStore(BaseFixtureStore):
+    """
+    Single-file fixture store: one row per (tool_name, signature) in a
+    WAL-mode SQLite database, instead of one JSON file per signature.
+
+    Each thread gets its own connection, so reads from the async executor
+    run concurrently.
+    """
+
+    def __init__(
+            self,
+            path: Union[str, Path] = "fixtures.sqlite",
+            executor: Optional[Executor] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(
+            parents=True,
+            exist_ok=True,
+        )
+        self.executor = executor
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        with self._connection() as conn:
+            conn.execute(SCHEMA)
+    
+    def _connection(self) -> sqlite3.Connection:
+        
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        
+        return conn
+    
+    @staticmethod
+    def _encode(fixture: Fixture) -> str:
+        return json.dumps(
+            fixture.to_json(),
+            separators=(",", ":"),
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+    
+    @staticmethod
+    def _decode(payload: str) -> Fixture:
+        return Fixture.load_from_json(
+            fixture=json.loads(payload)
+        )
+    
+    def load(
+            self,
+            tool_name: str,
+            signature: str
+    ) -> Optional[Fixture]:
+        
+        row = self._connection().execute(
+            "SELECT payload FROM fixtures WHERE tool_name = ? AND signature = ?",
+            (tool_name, signature),
+        ).fetchone()
+
+        return self._decode(row[0]) if row else None
+    
+    def save(
+            self,
+            tool_name: str,
+            signature: str,
+            fixture: Fixture,
+    ) -> Path:
+        
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fixtures (tool_name, signature, payload) VALUES (?, ?, ?)",
+                (tool_name, signature, self._encode(fixture)),
+            )
+        
+        return self.path
+    
+    def load_many(
+            self,
+            keys: Iterable[FixtureKey],
+    ) -> Dict[FixtureKey, Fixture]:
+        
+        keys = list(dict.fromkeys(keys))
+        conn = self._connection()
+
+        out: Dict[FixtureKey, Fixture] = {}
+        for start in range(0, len(keys), MAX_KEYS_PER_QUERY):
+            chunk = keys[start:start + MAX_KEYS_PER_QUERY]
+            values = ", ".join("(?, ?)" for _ in chunk)
+            params = [part for key in chunk for part in key]
+
+            rows = conn.execute(
+                "SELECT tool_name, signature, payload FROM fixtures "
+                f"WHERE (tool_name, signature) IN (VALUES {values})",
+                params,
+            )
+            for tool_name, signature, payload in rows:
+                out[(tool_name, signature)] = self._decode(payload)
+        
+        return out
+    
+    def save_many(
+            self,
+            fixtures: Iterable[Tuple[str, str, Fixture]],
+    ) -> int:
+        
+        rows = [
+            (tool_name, signature, self._encode(fixture))
+            for tool_name, signature, fixture in fixtures
+        ]
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO fixtures (tool_name, signature, payload) VALUES (?, ?, ?)",
+                rows,
+            )
+        
+        return len(rows)
+    
+    def iter_fixtures(self) -> Iterator[Tuple[str, str, Fixture]]:
+        
+        rows = self._connection().execute(
+            "SELECT tool_name, signature, payload FROM fixtures ORDER BY tool_name, signature"
+        )
+        for tool_name, signature, payload in rows:
+            yield (
+                tool_name,
+                signature,
+                self._decode(payload),
+            )
+    
+    def close(self) -> None:
+        
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        
+        self._local = threading.local()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Manage SQLite fixture stores."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser(
+        "migrate",
+        help="Copy a fixtures/{tool_name}/{signature}.json directory into a SQLite store.",
+    )
+    migrate.add_argument(
+        "--src",
+        type=str,
+        default="fixtures",
+        help="Root of the directory-layout fixture store.",
+    )
+    migrate.add_argument(
+        "--db",
+        type=str,
+        default="fixtures.sqlite",
+        help="SQLite database to write (created if missing).",
+    )
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        if not Path(args.src).is_dir():
+            raise FileNotFoundError(f"Fixture directory not found: {args.src}")
+        
+        destination = SQLiteFixtureStore(args.db)
+        try:
+            count = migrate_fixtures(
+                source=FixtureStore(args.src, cache_max_bytes=0),
+                destination=destination,
+            )
+        finally:
+            destination.close()
+        
+        print(f"Migrated {count} fixtures from {args.src} to {args.db}")
+
+if __name__ == "__main__":
+    main()
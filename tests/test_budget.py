@@ -0,0 +1,42 @@
+import copy
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_generator import DataGenerator
+from type import OpenAPINormalized, ResponseBudget
+
+
+def test_trimmed_generate_leaves_spec_unchanged():
+    spec = {
+        "openapi": "3.0.0",
+        "paths": {},
+        "components": {
+            "schemas": {
+                "Tagged": {
+                    "type": "object",
+                    "properties": {
+                        "tags": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "example": ["a" * 30, "b" * 30, "c" * 30],
+                        },
+                    },
+                },
+            },
+        },
+    }
+    before = copy.deepcopy(spec)
+    open_api_spec = OpenAPINormalized.from_dict(spec)
+    generator = DataGenerator(seed=1, budget=ResponseBudget(max_response_bytes=30))
+
+    first = generator.generate(open_api_spec, {"$ref": "#/components/schemas/Tagged"})
+    assert generator.last_truncation is not None
+
+    assert spec == before
+    assert generator.generate(open_api_spec, {"$ref": "#/components/schemas/Tagged"}) == first
+    assert DataGenerator(seed=1).generate(
+        open_api_spec,
+        {"$ref": "#/components/schemas/Tagged"},
+    ) == {"tags": ["a" * 30, "b" * 30, "c" * 30]}
@@ -0,0 +1,70 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from api_ops_router import APIOperationsRouter
+from type import Operation
+
+
+def _router(*routes):
+    router = APIOperationsRouter()
+    for name in routes:
+        router.register_op(
+            Operation(
+                name=name,
+                param_schema={
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer"},
+                        "limit": {"type": "integer"},
+                        "tags": {"type": "array", "items": {"type": "string"}},
+                    },
+                },
+                result_schema={"type": "object"},
+            )
+        )
+    return router
+
+
+def test_literal_segments_win_over_params():
+    router = _router("GET /users/{id}", "GET /users/me")
+
+    assert router.match("GET /users/me")[0].name == "GET /users/me"
+    op, params = router.match("GET /users/42")
+    assert (op.name, params) == ("GET /users/{id}", {"id": 42})
+
+
+def test_mixed_segments():
+    router = _router("GET /files/{id}.json", "GET /files/{name}")
+
+    assert router.match("GET /files/7.json") == (router.get_op("GET /files/{id}.json"), {"id": 7})
+    assert router.match("GET /files/readme")[1] == {"name": "readme"}
+
+
+def test_backtracks_out_of_dead_end_literal():
+    router = _router("GET /users/me/settings", "GET /users/{id}/posts")
+
+    op, params = router.match("GET /users/me/posts")
+    assert (op.name, params) == ("GET /users/{id}/posts", {"id": "me"})
+
+    with pytest.raises(KeyError):
+        router.match("GET /users/me/other")
+    with pytest.raises(KeyError):
+        router.match("POST /users/me/settings")
+
+
+def test_query_string_becomes_args():
+    router = _router("GET /users")
+
+    assert router.route("GET /users?limit=5&tags=a&tags=b", {}) == (
+        "GET /users",
+        {"limit": 5, "tags": ["a", "b"]},
+    )
+    assert router.route("GET /users?limit=5", {"limit": 7}) == ("GET /users", {"limit": 7})
+
+    first = router.signature(*router.route("GET /users?limit=5", {}))
+    second = router.signature(*router.route("GET /users?limit=50", {}))
+    assert first != second
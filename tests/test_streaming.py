@@ -0,0 +1,157 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_generator import DataGenerator
+from fixture_generator import FixtureGenerator
+from fixtures import FixtureStore
+from recorder import Recorder, SessionLogRecorder
+from replay import ReplayIndex
+from sqlite_fixtures import SQLiteFixtureStore
+from type import MockedResponse, OpenAPINormalized, Recording, ToolCall
+from validation import compile_validator
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "t", "version": "1"},
+    "paths": {
+        "/orders": {
+            "get": {
+                "responses": {
+                    "200": {
+                        "description": "ok",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/OrderPage"},
+                            },
+                        },
+                    },
+                },
+            },
+        },
+        "/health": {"get": {"responses": {"204": {"description": "empty"}}}},
+    },
+    "components": {
+        "schemas": {
+            "Order": {
+                "type": "object",
+                "required": ["id", "lines"],
+                "properties": {
+                    "id": {"type": "integer"},
+                    "note": {"type": "string", "maxLength": 20},
+                    "lines": {
+                        "type": "array",
+                        "minItems": 2,
+                        "maxItems": 4,
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "sku": {"type": "string"},
+                                "qty": {"type": "integer", "minimum": 1, "maximum": 9},
+                            },
+                        },
+                    },
+                },
+            },
+            "OrderPage": {
+                "type": "object",
+                "properties": {
+                    "data": {
+                        "type": "array",
+                        "minItems": 50,
+                        "maxItems": 50,
+                        "items": {"$ref": "#/components/schemas/Order"},
+                    },
+                    "has_more": {"type": "boolean"},
+                },
+            },
+        },
+    },
+}
+
+SCHEMA = {"$ref": "#/components/schemas/OrderPage"}
+
+
+def _stream():
+    return DataGenerator(seed=7).stream(
+        OpenAPINormalized.from_dict(SPEC),
+        SCHEMA,
+        chunk_bytes=256,
+    )
+
+
+def test_stream_is_valid_json_for_the_schema():
+    chunks = list(_stream())
+    assert len(chunks) > 1
+
+    value = json.loads("".join(chunks))
+    assert len(value["data"]) == 50
+    assert compile_validator(SCHEMA, OpenAPINormalized.from_dict(SPEC))(value) == []
+
+
+def test_fixture_stores_load_streamed_fixtures(tmp_path):
+    expected = json.loads("".join(_stream()))
+
+    for store in (FixtureStore(tmp_path / "fs"), SQLiteFixtureStore(tmp_path / "f.sqlite")):
+        store.save_stream("GET /orders", "sig", _stream(), latency_ms=12)
+        fixture = store.load("GET /orders", "sig")
+        assert fixture.ok and fixture.latency_ms == 12
+        assert fixture.data == expected
+
+
+def test_stream_to_store_writes_every_operation(tmp_path):
+    store = FixtureStore(tmp_path)
+    written = FixtureGenerator(DataGenerator(seed=3)).stream_to_store(SPEC, store)
+
+    assert written == 2
+    fixtures = {name: fixture for name, _, fixture in store.iter_fixtures()}
+    assert len(fixtures["GET /orders"].data["data"]) == 50
+    assert fixtures["GET /health"].ok
+
+
+def test_recorders_write_loadable_streamed_recordings(tmp_path):
+    expected = json.loads("".join(_stream()))
+    invocation = ToolCall(tool_name="GET /orders", args={"limit": 50}, tool_id="abc", timestamp="1")
+
+    path = Recorder(tmp_path / "files").record_stream(
+        invocation,
+        _stream(),
+        MockedResponse(ok=True, latency_ms=5),
+    )
+    recording = Recording.from_json(json.loads(path.read_text()))
+    assert recording.response.data == expected
+    assert recording.response.latency_ms == 5
+
+    with SessionLogRecorder(tmp_path / "log", session_id="s") as recorder:
+        recorder.record(invocation, MockedResponse(ok=True, data={"before": 1}))
+        recorder.record_stream(invocation, _stream())
+        recorder.record(invocation, MockedResponse(ok=True, data={"after": 1}))
+
+    lines = (tmp_path / "log" / "s-00000.jsonl").read_text().splitlines()
+    assert [Recording.from_json(json.loads(line)).response.data for line in lines] == [
+        {"before": 1},
+        expected,
+        {"after": 1},
+    ]
+    assert ReplayIndex(tmp_path / "log").lookup("GET /orders", "abc") is not None
+
+
+def test_session_log_drops_a_failed_stream(tmp_path):
+    def broken():
+        yield '{"partial":'
+        raise ValueError("boom")
+
+    invocation = ToolCall(tool_name="t", args={}, tool_id="x", timestamp="1")
+    with SessionLogRecorder(tmp_path, session_id="s") as recorder:
+        try:
+            recorder.record_stream(invocation, broken())
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected the chunk error")
+        recorder.record(invocation, MockedResponse(ok=True, data={"ok": 1}))
+
+    lines = (tmp_path / "s-00000.jsonl").read_text().splitlines()
+    assert [json.loads(line)["response"]["data"] for line in lines] == [{"ok": 1}]
@@ -0,0 +1,45 @@
+import os
+import sys
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_ops_router import APIOperationsRouter
+from type import Operation
+from validation import compile_validator
+
+
+def test_unsupported_pattern_is_skipped_not_raised():
+    schema = {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string", "pattern": r"^\p{L}+$", "maxLength": 5},
+            "code": {"type": "string", "pattern": "^[A-Z]+$"},
+        },
+    }
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        validate = compile_validator(schema)
+    assert any("\\p{L}" in str(w.message) for w in caught)
+
+    assert validate({"name": "héllo", "code": "ABC"}) == []
+    assert [e["path"] for e in validate({"name": "toolong", "code": "abc"})] == ["name", "code"]
+
+
+def test_router_registers_ops_with_unsupported_patterns():
+    router = APIOperationsRouter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        router.register_op(
+            Operation(
+                name="GET /users",
+                param_schema={
+                    "type": "object",
+                    "properties": {"q": {"type": "string", "pattern": r"\p{L}"}},
+                },
+                result_schema={"type": "object"},
+            )
+        )
+
+    assert router.validate("GET /users", {"q": "anything"}) == []
@@ -1,18 +1,37 @@
 from __future__ import annotations
 
 import dataclasses as dc
-from typing import Optional, Dict, List, Tuple, Any, Callable, Union
+import functools
+from typing import Optional, Dict, List, Tuple, Any, Callable, Union, Sequence
 from pathlib import Path
 import json
+import math
 import random
 import hashlib
+import statistics
+import threading
+import time
+import fnmatch
+import re
 
 from utils import (
     safe_mkdir,
+    resolve_pointer,
 )
 
 JSON = Dict[str, Any]
 
+HTTP_METHODS = {
+    "GET",
+    "POST",
+    "PUT", 
+    "PATCH", 
+    "DELETE",
+}
+
+# Tool names whose allow/deny decision a Policy remembers.
+MAX_POLICY_DECISIONS = 65536
+
 @dc.dataclass
 class ToolCall:
     tool_name: str
@@ -26,41 +45,223 @@ class MockedResponse:
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     latency_ms: int = 0
+    status: Optional[int] = None # HTTP-style status, when one applies
+    meta: Optional[Dict[str, Any]] = None # e.g. pagination of a list response
 
     def to_json(self) -> Dict[str, Any]:
         return dc.asdict(self)
 
+@dc.dataclass
+class TokenBucket:
+    """
+    Token bucket refilled at `rate_per_s` up to `capacity`. Each bucket has its
+    own lock, so callers only contend when they hit the same bucket.
+    """
+
+    rate_per_s: float
+    capacity: float
+    tokens: float = dc.field(default=0.0, init=False)
+    updated: Optional[float] = dc.field(default=None, init=False)
+
+    _lock: Any = dc.field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+        )
+    
+    def __post_init__(self) -> None:
+        self.tokens = self.capacity
+
+    def acquire(self, now: float) -> float:
+        """
+        Take one token; returns 0.0 on success, else seconds until one is available.
+        """
+        
+        with self._lock:
+            if self.updated is not None and now > self.updated:
+                self.tokens = min(
+                    self.capacity, 
+                    self.tokens + (now - self.updated) * self.rate_per_s
+                    )
+            if self.updated is None or now > self.updated:
+                self.updated = now
+            
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+            
+            return (1.0 - self.tokens) / self.rate_per_s
+    
+    def refund(self) -> None:
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1.0)
+
+def _compile_tool_patterns(
+        patterns: Optional[Sequence[str]],
+) -> Tuple[frozenset, Optional[re.Pattern]]:
+    """
+    Split tool patterns into exact names and one combined regex.
+        - `re:<regex>` is a regular expression (full match)
+        - names containing `*`, `?` or `[` are globs, e.g. `DELETE *`, `* /admin/*`
+        - anything else is an exact operation name
+    """
+    
+    exact = set()
+    alternatives = []
+    for pattern in patterns or []:
+        if pattern.startswith("re:"):
+            alternatives.append(f"(?:{pattern[3:]})")
+        elif any(ch in pattern for ch in "*?["):
+            alternatives.append(f"(?:{fnmatch.translate(pattern)})")
+        else:
+            exact.add(pattern)
+    
+    return (
+        frozenset(exact),
+        re.compile("|".join(alternatives)) if alternatives else None
+    )
+
 @dc.dataclass
 class Policy:
     """
     Minimal policy enforcement:
-        - maintains allowed/denied lists of tool names
+        - allowed/denied tool patterns: exact names, globs or `re:` regexes,
+          compiled into a single matcher with a per-name decision cache;
+          both are rebuilt whenever either list has changed (assigned or
+          edited in place) since they were last compiled
+        - token-bucket rate limits per tool and per agent, in calls per minute;
+          `burst` caps how many calls can go through back to back
     """
 
     allowed_tools: Optional[List[str]] = None
     unallowed_tools: Optional[List[str]] = None
     
-    # TODO: wire-up properly later
-    rate_limit_per_min: Optional[int] = None
+    rate_limit_per_min: Optional[int] = None # per tool
+    agent_rate_limit_per_min: Optional[int] = None # per agent
+    burst: Optional[int] = None # defaults to the per-minute rate
+
+    _allow: Tuple[frozenset, Any] = dc.field(
+        default=(frozenset(), None), init=False, repr=False, compare=False
+        )
+    _deny: Tuple[frozenset, Any] = dc.field(
+        default=(frozenset(), None), init=False, repr=False, compare=False
+        )
+    # The (allowed_tools, unallowed_tools) that `_allow`/`_deny` were built from.
+    _compiled_from: Any = dc.field(
+        default=None, init=False, repr=False, compare=False
+        )
+    _decisions: Dict[str, Tuple[bool, Optional[str]]] = dc.field(
+        default_factory=dict, init=False, repr=False, compare=False
+        )
+    _buckets: Dict[Tuple[str, str], TokenBucket] = dc.field(
+        default_factory=dict, init=False, repr=False, compare=False
+        )
+
+    def _refresh(self) -> None:
+        """
+        Recompile the tool patterns and drop cached decisions if either list
+        differs from the one they were compiled from.
+        """
+
+        current = (
+            tuple(self.allowed_tools) if self.allowed_tools is not None else None,
+            tuple(self.unallowed_tools) if self.unallowed_tools is not None else None,
+        )
+        if current == self._compiled_from:
+            return
+
+        self._allow = _compile_tool_patterns(current[0])
+        self._deny = _compile_tool_patterns(current[1])
+        self._decisions.clear()
+        self._compiled_from = current
+
+    @staticmethod
+    def _matches(
+            rules: Tuple[frozenset, Any],
+            tool_name: str,
+    ) -> bool:
+        
+        exact, pattern = rules
+        return tool_name in exact or (
+            pattern is not None and pattern.fullmatch(tool_name) is not None
+        )
 
     def is_allowed(self, tool_name: str) -> Tuple[bool, Optional[str]]:
 
-        if self.unallowed_tools and tool_name in self.unallowed_tools:
-            return (
+        self._refresh()
+        decision = self._decisions.get(tool_name)
+        if decision is not None:
+            return decision
+
+        if self.unallowed_tools and self._matches(self._deny, tool_name):
+            decision = (
                 False,
                 f"Tool '{tool_name}' is denied by policy."
             )
-        
-        if self.allowed_tools and tool_name not in self.allowed_tools:
-            return (
+        elif self.allowed_tools and not self._matches(self._allow, tool_name):
+            decision = (
                 False,
                 f"Tool '{tool_name}' is denied by policy."
             )
+        else:
+            decision = (
+                True,
+                None
+            ) # permitted to call this tool
         
-        return (
-            True,
-            None
-        ) # permitted to call this tool
+        if len(self._decisions) >= MAX_POLICY_DECISIONS:
+            self._decisions.clear()
+        self._decisions[tool_name] = decision
+
+        return decision
+    
+    def _bucket(
+            self,
+            scope: str,
+            key: str,
+            per_min: int,
+    ) -> TokenBucket:
+        
+        bucket = self._buckets.get((scope, key))
+        if bucket is None:
+            bucket = self._buckets.setdefault(
+                (scope, key),
+                TokenBucket(
+                    rate_per_s=per_min / 60.0,
+                    capacity=float(self.burst or per_min),
+                ),
+            )
+        
+        return bucket
+
+    def acquire(
+            self,
+            tool_name: str,
+            now: float,
+            agent_id: Optional[str] = None,
+    ) -> float:
+        """
+        Spend one call against the rate limits at time `now` (seconds).
+        Returns 0.0 if the call may proceed, else its retry-after in seconds.
+        """
+        
+        agent_bucket = self._bucket(
+            "agent", agent_id, self.agent_rate_limit_per_min
+        ) if self.agent_rate_limit_per_min and agent_id is not None else None
+
+        if agent_bucket is not None:
+            wait = agent_bucket.acquire(now)
+            if wait:
+                return wait
+        
+        if self.rate_limit_per_min:
+            wait = self._bucket(
+                "tool", tool_name, self.rate_limit_per_min
+            ).acquire(now)
+            if wait:
+                if agent_bucket is not None:
+                    agent_bucket.refund() # the call is not going through
+                return wait
+        
+        return 0.0
     
 @dc.dataclass
 class Recording:
@@ -70,6 +271,28 @@ class Recording:
     response: MockedResponse
     timestamp: Union[float, str]
 
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "id": self.tool_id,
+            "tool": self.tool_name,
+            "args": self.args,
+            "response": self.response.to_json(),
+            "time": self.timestamp,
+        }
+    
+    @staticmethod
+    def from_json(payload: Dict[str, Any]) -> "Recording":
+        
+        response = MockedResponse(**payload["response"])
+
+        return Recording(
+            tool_id=payload["id"],
+            tool_name=payload["tool"],
+            args=payload["args"],
+            response=response,
+            timestamp=payload["time"]
+        )
+
     def save(
             self,
             dir: Path
@@ -81,13 +304,7 @@ class Recording:
 
         with output_file_path.open("w", encoding="utf-8") as output_file:
             json.dump(
-                {
-                    "id": self.tool_id,
-                    "tool": self.tool_name,
-                    "args": self.args,
-                    "response": self.response.to_json(),
-                    "time": self.timestamp,
-                },
+                self.to_json(),
                 output_file,
                 indent=2,
                 ensure_ascii=False,
@@ -102,28 +319,94 @@ class Recording:
     ) -> "Recording":
         
         with path.open("r", encoding="utf-8") as f:
-            payload = json.load(f)
-        
-        response = MockedResponse(**payload["response"])
-
-        return Recording(
-            tool_id=payload["id"],
-            tool_name=payload["tool"],
-            args=payload["args"],
-            response=response,
-            timestamp=payload["time"]
-        )
+            return Recording.from_json(json.load(f))
     
+@dc.dataclass
+class FaultSample:
+    latency_ms: int
+    error: bool
+
 @dc.dataclass
 class FaultProfile:
     """
     Simulates deterministic, real API-chaos(latency, random failures, etc.)
+
+    Every key gets one 128-bit hash of (seed, key), split into the uniforms
+    that drive its latency and error draws, so results stay deterministic per
+    (seed, key). Latency is uniform over [min_latency_ms, max_latency_ms), or
+    lognormal when fitted from p50/p95 (see `from_profile`); lognormal draws
+    come from a precomputed quantile table of `table_size` entries.
+
+    With burst_rate > 0, time is cut into windows of `burst_window_s`
+    seconds, and each window is an outage with probability `burst_rate`,
+    decided by a hash of (seed, window). Errors inside an outage use
+    `burst_error_rate`. A sample is therefore deterministic per
+    (seed, key, window), whatever other calls were made.
     """
     seed: int = 42
     min_latency_ms: int = 10
     max_latency_ms: int = 120
     error_rate: float = 0.0 # set to 0.2 to see ~20% failures, etc.
 
+    latency_distribution: str = "uniform" # or "lognormal"
+    p50_latency_ms: Optional[float] = None
+    p95_latency_ms: Optional[float] = None
+    table_size: int = 4096
+
+    burst_rate: float = 0.0
+    burst_window_s: float = 10.0
+    burst_error_rate: float = 1.0
+
+    _latency_table: Optional[List[int]] = dc.field(
+        default=None, init=False, repr=False, compare=False
+        )
+    _burst_window: Tuple[int, bool] = dc.field(
+        default=(-1, False), init=False, repr=False, compare=False
+        )
+
+    def __post_init__(self) -> None:
+        
+        if self.latency_distribution not in ("uniform", "lognormal"):
+            raise ValueError(
+                f"Unknown latency distribution: {self.latency_distribution}"
+            )
+        
+        if self.latency_distribution == "lognormal" and not (
+            self.p50_latency_ms \
+                and self.p95_latency_ms \
+                    and 0 < self.p50_latency_ms <= self.p95_latency_ms
+        ):
+            raise ValueError(
+                "Lognormal latency needs 0 < p50_latency_ms <= p95_latency_ms."
+            )
+        
+        if self.burst_window_s <= 0:
+            raise ValueError("burst_window_s must be positive.")
+    
+    @classmethod
+    def from_profile(
+        cls,
+        profile: JSON,
+        seed: int = 42,
+        **overrides: Any,
+    ) -> "FaultProfile":
+        """
+        Build a lognormal profile from a FixtureBundle profile entry, e.g.
+        {"latency_ms": {"p50": 80, "p95": 250}, "flake_5xx_percent": 0.0}.
+        """
+        
+        latency = profile.get("latency_ms", {})
+        options: Dict[str, Any] = {
+            "seed": seed,
+            "latency_distribution": "lognormal",
+            "p50_latency_ms": float(latency["p50"]),
+            "p95_latency_ms": float(latency["p95"]),
+            "error_rate": float(profile.get("flake_5xx_percent", 0.0)) / 100.0,
+        }
+        options.update(overrides)
+
+        return cls(**options)
+
     def rng(self, key: str) -> random.Random:
        
         # Ensure determinism per (seed, key)
@@ -137,23 +420,131 @@ class FaultProfile:
         
         return random.Random(seed_int)
     
-    def sample_latency(self, key: str) -> int:
-        r = self.rng(key)
+    def _uniforms(self, key: str) -> Tuple[float, float]:
+        
+        h = hashlib.blake2b(
+            f"{self.seed}:{key}".encode("utf-8"),
+            digest_size=16,
+        ).digest()
 
-        return int(
-            r.uniform(
-                self.min_latency_ms, 
-                self.max_latency_ms)
+        return (
+            int.from_bytes(h[:8], "big") / 2.0**64,
+            int.from_bytes(h[8:], "big") / 2.0**64,
+        )
+    
+    @property
+    def latency_table(self) -> List[int]:
+        """
+        Latency quantiles at (i + 0.5) / table_size, built once.
+        """
+        
+        if self._latency_table is None:
+            n = self.table_size
+            if self.latency_distribution == "lognormal":
+                mu = math.log(self.p50_latency_ms)
+                sigma = (
+                    math.log(self.p95_latency_ms) - mu
+                    ) / statistics.NormalDist().inv_cdf(0.95)
+                if sigma <= 0:
+                    # p50 == p95: a constant latency
+                    self._latency_table = [int(self.p50_latency_ms)] * n
+                else:
+                    dist = statistics.NormalDist(mu, sigma)
+                    self._latency_table = [
+                        int(math.exp(dist.inv_cdf((i + 0.5) / n))) 
+                        for i in range(n)
+                        ]
+            else:
+                span = self.max_latency_ms - self.min_latency_ms
+                self._latency_table = [
+                    int(self.min_latency_ms + span * (i + 0.5) / n) 
+                    for i in range(n)
+                    ]
+        
+        return self._latency_table
+    
+    def _latency(self, u: float) -> int:
+        
+        if self.latency_distribution == "uniform":
+            return int(
+                self.min_latency_ms 
+                + (self.max_latency_ms - self.min_latency_ms) * u
                 )
+        
+        return self.latency_table[int(u * self.table_size)]
+    
+    def _in_outage(self, now: float) -> bool:
+        
+        window = int(now // self.burst_window_s)
+        cached_window, outage = self._burst_window
+        if cached_window != window:
+            outage = self._uniforms(f"burst:{window}")[0] < self.burst_rate
+            self._burst_window = (window, outage)
+        
+        return outage
+    
+    def sample(
+            self,
+            key: str,
+            now: Optional[float] = None,
+    ) -> FaultSample:
+        """
+        Latency and error decision for one call, from a single hash of the key;
+        `now` (default: wall-clock time) picks the burst window.
+        """
+        
+        u_latency, u_error = self._uniforms(key)
+
+        error_rate = self.error_rate
+        if self.burst_rate > 0 and self._in_outage(
+            time.time() if now is None else now
+        ):
+            error_rate = self.burst_error_rate
+        
+        return FaultSample(
+            latency_ms=self._latency(u_latency),
+            error=error_rate > 0 and u_error < error_rate,
+        )
+    
+    def sample_many(self, keys: List[str]) -> List[FaultSample]:
+        return [self.sample(key) for key in keys]
+    
+    def sample_latency(self, key: str) -> int:
+        return self._latency(self._uniforms(key)[0])
     
     def should_error(self, key: str) -> bool:
+        """
+        Baseline error decision for `key` (ignores outage bursts).
+        """
         if self.error_rate <= 0:
             return False
         
-        r = self.rng(key)
-
-        return r.random() < self.error_rate
+        return self._uniforms(key)[1] < self.error_rate
     
+@dc.dataclass
+class FixtureCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+@dc.dataclass
+class ResponseBudget:
+    """
+    Size limits for generated data, in bytes of compact JSON:
+        - max_field_bytes: cap on free-text strings, never below minLength
+        - max_response_bytes: cap on a whole response, met by trimming
+          strings toward minLength, then arrays toward minItems
+
+    `DataGenerator.stream` cannot revisit text it has already written, so it
+    only shortens what comes after the budget is spent and may overshoot it.
+    """
+
+    max_response_bytes: Optional[int] = None
+    max_field_bytes: Optional[int] = None
+
 @dc.dataclass
 class FixtureMetaData:
     created_at: str
@@ -162,6 +553,7 @@ class FixtureMetaData:
     profile: Optional[str] = None
     policy_hash: Optional[str] = None
     notes: Optional[str] = None
+    truncation: Optional[Dict[str, int]] = None # see budget.fit_to_budget
 
 @dc.dataclass
 class Fixture:
@@ -197,6 +589,21 @@ class Fixture:
             metadata=meta_obj,
         )
 
+@dc.dataclass
+class SignatureSpec:
+    """
+    Which args identify a call, i.e. decide its fixture signature.
+
+    Paths are dotted (`body.meta.request_id`); `*` matches any key or index.
+        - include: only these paths count (None means all args)
+        - ignore: paths dropped, e.g. request IDs, timestamps, tracing headers
+        - normalize: path -> normalizer name (see signatures.NORMALIZERS)
+    """
+
+    include: Optional[List[str]] = None
+    ignore: List[str] = dc.field(default_factory=list)
+    normalize: Dict[str, str] = dc.field(default_factory=dict)
+
 @dc.dataclass
 class Operation:
     name: str
@@ -204,6 +611,7 @@ class Operation:
     result_schema: Dict[str, Any]
     description: str = ""
     version: str = "v1"
+    signature: Optional[SignatureSpec] = None
 
 @dc.dataclass
 class FixtureBundle:
@@ -224,6 +632,14 @@ class FixtureBundle:
 
 @dc.dataclass
 class OpenAPINormalized:
+    """
+    Thin view over a parsed spec; derived indexes are built on first access.
+
+    `refs` maps every local $ref used in the spec to its final target (alias
+    chains followed), so `resolve` is a single dict lookup. Refs that are
+    missing, external or part of an alias cycle resolve to nothing and are
+    listed in `unresolved_refs`.
+    """
     raw: JSON
     components: JSON = dc.field(default_factory=dict)
     paths: JSON = dc.field(default_factory=dict)
@@ -243,8 +659,90 @@ class OpenAPINormalized:
             paths=spec.get("paths", {}),
             schemas=components.get("schemas", {})
         )
+    
+    @functools.cached_property
+    def operations(self) -> List[Tuple[str, str, str, JSON]]:
+        """
+        (name, path, method, operation) for every supported HTTP operation,
+        in spec order; name is e.g. "GET /users/{user_id}".
+        """
+        
+        out: List[Tuple[str, str, str, JSON]] = []
+        for path, methods in (self.paths or {}).items():
+            if not isinstance(methods, dict):
+                continue
+
+            for method, op in methods.items():
+                method_upper = str(method).upper()
+                if method_upper in HTTP_METHODS:
+                    out.append(
+                        (f"{method_upper} {path}", path, method, op)
+                    )
+        
+        return out
+    
+    @functools.cached_property
+    def refs(self) -> Dict[str, Any]:
+        
+        targets: Dict[str, Any] = {}
+        stack: List[Any] = [self.raw]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                ref = node.get("$ref")
+                if isinstance(ref, str) and ref not in targets:
+                    targets[ref] = self._follow(ref)
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+        
+        return targets
+    
+    @property
+    def unresolved_refs(self) -> List[str]:
+        return sorted(
+            ref for ref, target in self.refs.items() if target is None
+        )
+    
+    def _follow(self, ref: str) -> Any:
+        """
+        Target of `ref` after following $ref-only aliases; None on failure.
+        """
+        
+        seen = set()
+        while ref not in seen:
+            seen.add(ref)
+            try:
+                target = resolve_pointer(self.raw, ref)
+            except KeyError:
+                return None
+            
+            if isinstance(target, dict) and isinstance(target.get("$ref"), str):
+                ref = target["$ref"]
+                continue
+
+            return target
+        
+        return None # alias cycle
+    
+    def resolve(self, schema: Any) -> Any:
+        """
+        Replace a {"$ref": ...} node by its target; anything else is returned as is.
+        """
+        
+        if not isinstance(schema, dict):
+            return schema
+        
+        ref = schema.get("$ref")
+        if not isinstance(ref, str):
+            return schema
+        
+        refs = self.refs
+        if ref not in refs:
+            # e.g. schemas assembled outside the spec
+            refs[ref] = self._follow(ref)
+        
+        target = refs[ref]
 
-
-
-
+        return schema if target is None else target
 
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Union, Any, Dict, TYPE_CHECKING
+from typing import Union, Any, Dict, Optional, Callable, TypeVar, List, Hashable, Iterable, Iterator, TYPE_CHECKING
+import asyncio
+import functools
 import hashlib
 import json
-import re
+import threading
+from urllib.parse import parse_qsl
 
 JSON = Dict[str, Any]
+T = TypeVar("T")
 if TYPE_CHECKING:
     from type import OpenAPINormalized
 
@@ -37,25 +42,216 @@ def stable_hash(*parts: Any) -> str:
         payload.encode("utf-8")
         ).hexdigest()[:16]
 
+def canonical_hash(*parts: Any) -> str:
+    """
+    Like `stable_hash`, but blake2b over the compact canonical encoding:
+    same 16-hex-char width, cheaper digest.
+    """
+    
+    payload = json.dumps(
+        parts,
+        separators=(",", ":"),
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+
+    return hashlib.blake2b(
+        payload.encode("utf-8"),
+        digest_size=8,
+        ).hexdigest()
+
+def shape_key(args: Any) -> Optional[Hashable]:
+    """
+    Exact, hashable key for flat argument dicts; None when args are nested.
+    Value types are part of the key because 1 == 1.0 == True.
+    """
+    
+    if not isinstance(args, dict):
+        return None
+    
+    try:
+        return frozenset(
+            (name, type(value), value) for name, value in args.items()
+        )
+    except TypeError:
+        return None
+
+def stream_envelope(
+        fields: Dict[str, Any],
+        stream_key: str,
+        chunks: Iterable[str],
+) -> Iterator[str]:
+    """
+    JSON text of `fields` (keys sorted), with the value under `stream_key`
+    taken verbatim from `chunks`, so a large value is never held in memory.
+    """
+    
+    yield "{"
+    for i, key in enumerate(sorted(set(fields) | {stream_key})):
+        yield ("," if i else "") + json.dumps(key) + ":"
+        if key == stream_key:
+            yield from chunks
+        else:
+            yield json.dumps(fields[key], ensure_ascii=False, default=str)
+    yield "}"
+
+def write_chunks(
+        path: Path,
+        chunks: Iterable[str],
+) -> Path:
+    """
+    Write text chunks to `path` through a temp file, so readers never see a
+    partially written file.
+    """
+    
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    tmp_path.replace(path)
+
+    return path
+
+def coerce_param(
+        value: str,
+        schema: Optional[JSON],
+) -> Any:
+    """
+    Convert a raw path/query string to its schema type ("42" -> 42 for
+    integers); values that don't parse are returned unchanged for validation
+    to reject.
+    """
+    
+    kind = (schema or {}).get("type")
+    try:
+        if kind == "integer":
+            return int(value)
+        if kind == "number":
+            return float(value)
+    except ValueError:
+        return value
+    
+    if kind == "boolean" and value.lower() in ("true", "false", "1", "0"):
+        return value.lower() in ("true", "1")
+    
+    return value
+
+def query_args(
+        query: str,
+        properties: JSON,
+) -> Dict[str, Any]:
+    """
+    Args from a query string, coerced by their property schemas; repeated
+    keys of array params are collected into lists.
+    """
+    
+    args: Dict[str, Any] = {}
+    for name, value in parse_qsl(query, keep_blank_values=True):
+        schema = properties.get(name) or {}
+        if schema.get("type") == "array":
+            args.setdefault(name, []).append(
+                coerce_param(value, schema.get("items"))
+            )
+        else:
+            args[name] = coerce_param(value, schema)
+    
+    return args
+
 def resolve_schema(
             open_api_spec: "OpenAPINormalized",
             schema: JSON,
     ) -> JSON:
         
-        if "$ref" not in schema:
-            return schema
-        
-        ref = schema["$ref"]
-        
-        # Simple $ref resolver for #/components/schemas/*
-        # $ref is usually a JSON Pointer string: `/components/schemas/Issue`
-        # The regex #/components/schemas/(?P<name>.+) pulls out "Issue"
-        m = re.match(r"#/components/schemas/(?P<name>.+)", ref)
-        if not m:
-            return schema
-        
-        name = m.group("name")
-        resolved = open_api_spec.schemas.get(name)
-        
-        return resolved or schema # fall back to returning the original {"$ref": ...}
-        
+        # Any local JSON pointer, resolved through the spec's precomputed $ref table.
+        # Falls back to returning the original {"$ref": ...} if it cannot be resolved.
+        return open_api_spec.resolve(schema)
+
+def resolve_pointer(
+        document: Any,
+        ref: str,
+) -> Any:
+    """
+    Follow a local JSON pointer such as `#/components/schemas/User`.
+    Raises KeyError if `ref` is not local or does not resolve.
+    """
+    
+    if not ref.startswith("#"):
+        raise KeyError(f"Unsupported $ref: {ref}")
+    
+    node = document
+    for token in ref[1:].split("/")[1:]:
+        token = token.replace("~1", "/").replace("~0", "~")
+        if isinstance(node, list) and token.isdigit() and int(token) < len(node):
+            node = node[int(token)]
+        elif isinstance(node, dict) and token in node:
+            node = node[token]
+        else:
+            raise KeyError(f"Unresolvable $ref: {ref}")
+    
+    return node
+
+def ref_closure(
+        document: Any,
+        node: Any,
+        targets: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Every local $ref reachable from `node`, transitively, mapped to its target.
+    Unresolvable refs map to None. `targets` may supply already-resolved refs
+    (e.g. `OpenAPINormalized.refs`).
+    """
+    
+    closure: Dict[str, Any] = {}
+    stack: List[Any] = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get("$ref")
+            if isinstance(ref, str) and ref not in closure:
+                if targets is not None and ref in targets:
+                    target = targets[ref]
+                else:
+                    try:
+                        target = resolve_pointer(document, ref)
+                    except KeyError:
+                        target = None
+                closure[ref] = target
+                stack.append(target)
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    
+    return closure
+
+# Bounded pool shared by the async fixture/recording paths for blocking file I/O.
+IO_WORKERS = 8
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_executor_lock = threading.Lock()
+
+def io_executor() -> ThreadPoolExecutor:
+    
+    global _io_executor
+    if _io_executor is None:
+        with _io_executor_lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=IO_WORKERS,
+                    thread_name_prefix="sandbox-io",
+                )
+    
+    return _io_executor
+
+async def run_blocking(
+        fn: Callable[..., T],
+        *args: Any,
+        executor: Optional[Executor] = None,
+        **kwargs: Any,
+) -> T:
+    
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(
+        executor or io_executor(),
+        functools.partial(fn, *args, **kwargs),
+    )
@@ -0,0 +1,352 @@
+from typing import Optional, Dict, Any, Callable, List, Tuple
+import re
+import warnings
+
+from type import (
+    JSON,
+    OpenAPINormalized,
+)
+
+# A compiled validator: (value, path) -> list of error details.
+Validator = Callable[[Any, str], List[JSON]]
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: (
+        isinstance(v, int) and not isinstance(v, bool)
+        ) or (
+            isinstance(v, float) and v.is_integer()
+            ),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "null": lambda v: v is None,
+}
+
+def _error(
+        path: str,
+        message: str,
+) -> JSON:
+    
+    return {
+        "path": path or "$",
+        "message": message,
+    }
+
+def _compile_pattern(pattern: str) -> Optional[re.Pattern]:
+    """
+    Python regex for a schema pattern, or None when it uses ECMA-262 syntax
+    Python's `re` cannot compile (e.g. `\\p{L}`); that check is then skipped.
+    """
+    
+    try:
+        return re.compile(pattern)
+    except re.error as e:
+        warnings.warn(
+            f"Skipping unsupported schema pattern {pattern!r}: {e}",
+            stacklevel=2,
+        )
+        return None
+
+def _join(
+        path: str,
+        name: Any,
+) -> str:
+    
+    if isinstance(name, int):
+        return f"{path}[{name}]"
+    
+    return f"{path}.{name}" if path else str(name)
+
+class ValidatorCompiler:
+    """
+    Compiles a JSON Schema (the OpenAPI subset) into a tree of closures once,
+    so validating a value never re-interprets the schema.
+
+    Supported: $ref, type (incl. lists and `nullable`), enum, const,
+    properties/required/additionalProperties, items/minItems/maxItems,
+    minLength/maxLength/pattern, minimum/maximum (+ exclusive forms),
+    multipleOf, allOf/anyOf/oneOf. Other keywords are ignored.
+    """
+
+    def __init__(
+            self,
+            open_api_spec: Optional[OpenAPINormalized] = None,
+    ) -> None:
+        self.open_api_spec = open_api_spec
+
+        # id(schema) -> (schema, validator); recursive schemas reuse the entry.
+        self._compiled: Dict[int, Tuple[Any, Validator]] = {}
+    
+    def compile(self, schema: Any) -> Validator:
+        
+        if self.open_api_spec is not None:
+            schema = self.open_api_spec.resolve(schema)
+        
+        cached = self._compiled.get(id(schema))
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+        
+        # Placeholder so self-referencing schemas terminate while compiling.
+        cell: List[Validator] = []
+        self._compiled[id(schema)] = (
+            schema,
+            lambda value, path: cell[0](value, path),
+        )
+
+        validator = self._compile_node(schema)
+        cell.append(validator)
+        self._compiled[id(schema)] = (schema, validator)
+
+        return validator
+    
+    def _compile_node(self, schema: Any) -> Validator:
+        
+        if not isinstance(schema, dict) or not schema:
+            return lambda value, path: []
+        
+        checks: List[Validator] = []
+
+        types = schema.get("type")
+        if isinstance(types, str):
+            types = [types]
+        if types:
+            types = list(types)
+            if schema.get("nullable"):
+                types.append("null")
+            type_checks = [
+                _TYPE_CHECKS[t] for t in types if t in _TYPE_CHECKS
+            ]
+            expected = " or ".join(types)
+
+            def check_type(value: Any, path: str) -> List[JSON]:
+                if any(check(value) for check in type_checks):
+                    return []
+                return [_error(path, f"expected {expected}")]
+            
+            checks.append(check_type)
+        
+        if isinstance(schema.get("enum"), list):
+            allowed = schema["enum"]
+            nullable = bool(schema.get("nullable"))
+
+            def check_enum(value: Any, path: str) -> List[JSON]:
+                if value in allowed or (nullable and value is None):
+                    return []
+                return [_error(path, f"must be one of {allowed}")]
+            
+            checks.append(check_enum)
+        
+        if "const" in schema:
+            const = schema["const"]
+            checks.append(
+                lambda value, path: [] if value == const 
+                else [_error(path, f"must be {const!r}")]
+            )
+        
+        checks.extend(self._compile_object(schema))
+        checks.extend(self._compile_array(schema))
+        checks.extend(self._compile_string(schema))
+        checks.extend(self._compile_number(schema))
+        checks.extend(self._compile_combinators(schema))
+
+        if not checks:
+            return lambda value, path: []
+        if len(checks) == 1:
+            return checks[0]
+        
+        def check_all(value: Any, path: str) -> List[JSON]:
+            errors: List[JSON] = []
+            for check in checks:
+                errors.extend(check(value, path))
+                if errors and check is checks[0] and types:
+                    break # wrong type: the remaining checks would only add noise
+            return errors
+        
+        return check_all
+    
+    def _compile_object(self, schema: JSON) -> List[Validator]:
+        
+        properties = schema.get("properties") or {}
+        required = list(schema.get("required") or [])
+        additional = schema.get("additionalProperties", True)
+        if not properties and not required and additional is True:
+            return []
+        
+        property_checks = {
+            name: self.compile(sub_schema) 
+            for name, sub_schema in properties.items()
+        }
+        additional_check = self.compile(additional) \
+            if isinstance(additional, dict) else None
+
+        def check_object(value: Any, path: str) -> List[JSON]:
+            if not isinstance(value, dict):
+                return []
+            
+            errors: List[JSON] = []
+            for name in required:
+                if name not in value:
+                    errors.append(_error(_join(path, name), "field required"))
+            
+            for name, item in value.items():
+                check = property_checks.get(name)
+                if check is not None:
+                    errors.extend(check(item, _join(path, name)))
+                elif additional is False:
+                    errors.append(_error(_join(path, name), "unexpected field"))
+                elif additional_check is not None:
+                    errors.extend(additional_check(item, _join(path, name)))
+            
+            return errors
+        
+        return [check_object]
+    
+    def _compile_array(self, schema: JSON) -> List[Validator]:
+        
+        items = schema.get("items")
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+        if items is None and min_items is None and max_items is None:
+            return []
+        
+        item_check = self.compile(items) if items is not None else None
+
+        def check_array(value: Any, path: str) -> List[JSON]:
+            if not isinstance(value, list):
+                return []
+            
+            errors: List[JSON] = []
+            if min_items is not None and len(value) < min_items:
+                errors.append(_error(path, f"expected at least {min_items} items"))
+            if max_items is not None and len(value) > max_items:
+                errors.append(_error(path, f"expected at most {max_items} items"))
+            if item_check is not None:
+                for i, item in enumerate(value):
+                    errors.extend(item_check(item, _join(path, i)))
+            
+            return errors
+        
+        return [check_array]
+    
+    def _compile_string(self, schema: JSON) -> List[Validator]:
+        
+        min_length = schema.get("minLength")
+        max_length = schema.get("maxLength")
+        pattern = _compile_pattern(schema["pattern"]) \
+            if isinstance(schema.get("pattern"), str) else None
+        if min_length is None and max_length is None and pattern is None:
+            return []
+        
+        def check_string(value: Any, path: str) -> List[JSON]:
+            if not isinstance(value, str):
+                return []
+            
+            errors: List[JSON] = []
+            if min_length is not None and len(value) < min_length:
+                errors.append(_error(path, f"expected at least {min_length} characters"))
+            if max_length is not None and len(value) > max_length:
+                errors.append(_error(path, f"expected at most {max_length} characters"))
+            if pattern is not None and not pattern.search(value):
+                errors.append(_error(path, f"does not match pattern {pattern.pattern!r}"))
+            
+            return errors
+        
+        return [check_string]
+    
+    def _compile_number(self, schema: JSON) -> List[Validator]:
+        
+        bounds: List[Tuple[Callable[[Any], bool], str]] = []
+
+        minimum = schema.get("minimum")
+        maximum = schema.get("maximum")
+        exclusive_min = schema.get("exclusiveMinimum")
+        exclusive_max = schema.get("exclusiveMaximum")
+
+        # OpenAPI 3.0 uses booleans that modify minimum/maximum; 3.1 uses numbers.
+        if minimum is not None:
+            if exclusive_min is True:
+                bounds.append((lambda v: v > minimum, f"must be > {minimum}"))
+            else:
+                bounds.append((lambda v: v >= minimum, f"must be >= {minimum}"))
+        if maximum is not None:
+            if exclusive_max is True:
+                bounds.append((lambda v: v < maximum, f"must be < {maximum}"))
+            else:
+                bounds.append((lambda v: v <= maximum, f"must be <= {maximum}"))
+        if isinstance(exclusive_min, (int, float)) and not isinstance(exclusive_min, bool):
+            bounds.append((lambda v: v > exclusive_min, f"must be > {exclusive_min}"))
+        if isinstance(exclusive_max, (int, float)) and not isinstance(exclusive_max, bool):
+            bounds.append((lambda v: v < exclusive_max, f"must be < {exclusive_max}"))
+        
+        multiple_of = schema.get("multipleOf")
+        if multiple_of:
+            bounds.append((
+                lambda v: abs(v / multiple_of - round(v / multiple_of)) < 1e-9, 
+                f"must be a multiple of {multiple_of}"
+                ))
+        
+        if not bounds:
+            return []
+        
+        def check_number(value: Any, path: str) -> List[JSON]:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return []
+            
+            return [
+                _error(path, message) 
+                for check, message in bounds if not check(value)
+            ]
+        
+        return [check_number]
+    
+    def _compile_combinators(self, schema: JSON) -> List[Validator]:
+        
+        checks: List[Validator] = []
+
+        if isinstance(schema.get("allOf"), list):
+            parts = [self.compile(part) for part in schema["allOf"]]
+
+            def check_all_of(value: Any, path: str) -> List[JSON]:
+                errors: List[JSON] = []
+                for part in parts:
+                    errors.extend(part(value, path))
+                return errors
+            
+            checks.append(check_all_of)
+        
+        if isinstance(schema.get("anyOf"), list):
+            options = [self.compile(option) for option in schema["anyOf"]]
+
+            def check_any_of(value: Any, path: str) -> List[JSON]:
+                if any(not option(value, path) for option in options):
+                    return []
+                return [_error(path, "does not match any allowed schema")]
+            
+            checks.append(check_any_of)
+        
+        if isinstance(schema.get("oneOf"), list):
+            options = [self.compile(option) for option in schema["oneOf"]]
+
+            def check_one_of(value: Any, path: str) -> List[JSON]:
+                matches = sum(1 for option in options if not option(value, path))
+                if matches == 1:
+                    return []
+                return [_error(path, f"must match exactly one schema, matched {matches}")]
+            
+            checks.append(check_one_of)
+        
+        return checks
+
+def compile_validator(
+        schema: JSON,
+        open_api_spec: Optional[OpenAPINormalized] = None,
+) -> Callable[[Any], List[JSON]]:
+    """
+    Compile `schema` once; the returned function lists the errors for a value.
+    """
+    
+    validator = ValidatorCompiler(open_api_spec).compile(schema)
+
+    return lambda value: validator(value, "")